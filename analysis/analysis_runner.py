@@ -7,25 +7,36 @@ Main script to execute all job market analyses
 import sys
 import os
 import importlib.util
-import pymysql
+import time
 from datetime import datetime
+from multiprocessing import Pool
 import traceback
 
-# Database configuration
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'hrmoihtt_hrtoolusers', 
-    'password': 'FsPyjP6hPc6yReV11111111',
-    'database': 'hrmoihtt_hrtoolusers',
-    'cursorclass': pymysql.cursors.DictCursor,
-    'charset': 'utf8mb4',
-    'autocommit': True,
-    'port': 3306
-}
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.db_pool import DB_CONFIG, get_pool  # DB_CONFIG re-exported for modules importing it from here
+from analysis.scan_engine import ScanEngine, STREAM_CHUNK_SIZE
+from analysis.parsed_jobs import refresh_jobs_parsed
+from analysis.data_utils import SalaryParser
+from analysis.incremental import create_checkpoint_table, clear_checkpoint, restore_visitor, checkpoint_visitor
+from analysis.job_cube import CUBE_CHECKPOINT
+from analysis.skill_trends import STORE_CHECKPOINT
+from analysis.related_jobs import RelatedJobsResolver, JOB_CARDS_SCHEMA, RELATED_LINKS_SCHEMA, prune_job_cards
+from analysis.result_writer import restore_previous
+from analysis.scheduling import create_durations_table, load_durations, save_durations, longest_first
+from analysis.schema_migrations import add_column
 
 class AnalysisRunner:
-    def __init__(self):
+    def __init__(self, scan_mode='stream', chunk_size=STREAM_CHUNK_SIZE, use_parsed_table=True,
+                 incremental=False, publish='delete', jobs=1):
         self.connection = None
+        self.incremental = incremental
+        self.publish = publish  # 'shadow' builds analysis_<name>__new and swaps it in
+        self.scan_mode = scan_mode
+        self.chunk_size = chunk_size
+        self.use_parsed_table = use_parsed_table
+        self.jobs = jobs  # worker processes; 1 runs everything over one shared scan
+        self.related_jobs = RelatedJobsResolver()
         self.analyses = [
             'top_skills_by_job_type',
             'trending_skills_analysis', 
@@ -47,7 +58,7 @@ class AnalysisRunner:
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = pymysql.connect(**DB_CONFIG)
+            self.connection = get_pool().acquire()
             print("✓ Database connection established")
             return True
         except Exception as e:
@@ -57,7 +68,8 @@ class AnalysisRunner:
     def close_database(self):
         """Close database connection"""
         if self.connection:
-            self.connection.close()
+            get_pool().release(self.connection)
+            self.connection = None
             print("✓ Database connection closed")
 
     def create_analysis_tables(self):
@@ -70,7 +82,7 @@ class AnalysisRunner:
                     skill TEXT,
                     frequency INT,
                     percentage DECIMAL(5,2),
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -81,7 +93,7 @@ class AnalysisRunner:
                     current_frequency INT,
                     growth_rate DECIMAL(10,2),
                     trend_period VARCHAR(100),
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -93,7 +105,12 @@ class AnalysisRunner:
                     min_salary DECIMAL(12,2),
                     max_salary DECIMAL(12,2),
                     job_count INT,
-                    related_jobs TEXT,
+                    median_salary DECIMAL(12,2),
+                    p10_salary DECIMAL(12,2),
+                    p25_salary DECIMAL(12,2),
+                    p75_salary DECIMAL(12,2),
+                    p90_salary DECIMAL(12,2),
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -105,7 +122,9 @@ class AnalysisRunner:
                     total_openings INT,
                     demand_ratio DECIMAL(10,2),
                     avg_competition DECIMAL(10,2),
-                    related_jobs TEXT,
+                    distinct_companies INT,
+                    distinct_locations INT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -117,7 +136,8 @@ class AnalysisRunner:
                     job_count INT,
                     avg_salary DECIMAL(12,2),
                     total_openings INT,
-                    related_jobs TEXT,
+                    distinct_companies INT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -129,7 +149,7 @@ class AnalysisRunner:
                     percentage DECIMAL(5,2),
                     avg_salary DECIMAL(12,2),
                     top_skills TEXT,
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -142,7 +162,8 @@ class AnalysisRunner:
                     avg_salary DECIMAL(12,2),
                     top_job_types TEXT,
                     hiring_trend VARCHAR(100),
-                    related_jobs TEXT,
+                    distinct_locations INT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -154,7 +175,11 @@ class AnalysisRunner:
                     median_salary DECIMAL(12,2),
                     salary_growth_rate DECIMAL(5,2),
                     job_count INT,
-                    related_jobs TEXT,
+                    p10_salary DECIMAL(12,2),
+                    p25_salary DECIMAL(12,2),
+                    p75_salary DECIMAL(12,2),
+                    p90_salary DECIMAL(12,2),
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -166,7 +191,7 @@ class AnalysisRunner:
                     avg_salary DECIMAL(12,2),
                     top_job_types TEXT,
                     total_openings INT,
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -178,7 +203,7 @@ class AnalysisRunner:
                     percentage DECIMAL(5,2),
                     avg_salary DECIMAL(12,2),
                     popular_job_types TEXT,
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -190,7 +215,7 @@ class AnalysisRunner:
                     frequency INT,
                     job_count INT,
                     avg_salary DECIMAL(12,2),
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -202,7 +227,7 @@ class AnalysisRunner:
                     total_applications INT,
                     total_openings INT,
                     competition_level VARCHAR(100),
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -214,7 +239,7 @@ class AnalysisRunner:
                     growth_rate DECIMAL(10,2),
                     avg_salary DECIMAL(12,2),
                     key_skills TEXT,
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -226,7 +251,7 @@ class AnalysisRunner:
                     avg_max_experience DECIMAL(5,2),
                     experience_trend VARCHAR(100),
                     job_count INT,
-                    related_jobs TEXT,
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
 
@@ -238,11 +263,44 @@ class AnalysisRunner:
                     job_count INT,
                     avg_salary DECIMAL(12,2),
                     job_types TEXT,
-                    related_jobs TEXT,
+                    lift DECIMAL(12,4),
+                    pmi DECIMAL(8,4),
+                    jaccard DECIMAL(5,4),
+                    confidence_first DECIMAL(5,4),
+                    confidence_second DECIMAL(5,4),
+                    related_key CHAR(16),
                     analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;""",
+
+            # Related jobs of every result row, stored once (see related_jobs.store_related)
+            'analysis_job_cards': JOB_CARDS_SCHEMA,
+            'analysis_related_jobs': RELATED_LINKS_SCHEMA
         }
 
+        # Columns added after a table was first released, as (table, column, definition, after);
+        # tables created by older versions are altered to include them
+        added_columns = [
+            ('analysis_skills_correlation', 'lift', 'DECIMAL(12,4)', 'job_types'),
+            ('analysis_skills_correlation', 'pmi', 'DECIMAL(8,4)', 'lift'),
+            ('analysis_skills_correlation', 'jaccard', 'DECIMAL(5,4)', 'pmi'),
+            ('analysis_skills_correlation', 'confidence_first', 'DECIMAL(5,4)', 'jaccard'),
+            ('analysis_skills_correlation', 'confidence_second', 'DECIMAL(5,4)', 'confidence_first'),
+            ('analysis_top_paying_jobs', 'median_salary', 'DECIMAL(12,2)', 'job_count'),
+            ('analysis_top_paying_jobs', 'p10_salary', 'DECIMAL(12,2)', 'median_salary'),
+            ('analysis_top_paying_jobs', 'p25_salary', 'DECIMAL(12,2)', 'p10_salary'),
+            ('analysis_top_paying_jobs', 'p75_salary', 'DECIMAL(12,2)', 'p25_salary'),
+            ('analysis_top_paying_jobs', 'p90_salary', 'DECIMAL(12,2)', 'p75_salary'),
+            ('analysis_salary_experience_trends', 'p10_salary', 'DECIMAL(12,2)', 'job_count'),
+            ('analysis_salary_experience_trends', 'p25_salary', 'DECIMAL(12,2)', 'p10_salary'),
+            ('analysis_salary_experience_trends', 'p75_salary', 'DECIMAL(12,2)', 'p25_salary'),
+            ('analysis_salary_experience_trends', 'p90_salary', 'DECIMAL(12,2)', 'p75_salary'),
+            ('analysis_most_demanded_jobs', 'distinct_companies', 'INT', 'avg_competition'),
+            ('analysis_most_demanded_jobs', 'distinct_locations', 'INT', 'distinct_companies'),
+            ('analysis_best_locations', 'distinct_companies', 'INT', 'total_openings'),
+            ('analysis_company_hiring_trends', 'distinct_locations', 'INT', 'hiring_trend'),
+        ] + [(table_name, 'related_key', 'CHAR(16)', 'related_jobs') for table_name in table_schemas
+             if table_name not in ('analysis_job_cards', 'analysis_related_jobs')]
+
         cursor = self.connection.cursor()
         for table_name, schema in table_schemas.items():
             try:
@@ -251,6 +309,13 @@ class AnalysisRunner:
             except Exception as e:
                 print(f"✗ Error creating table {table_name}: {e}")
 
+        for table_name, column, definition, after in added_columns:
+            try:
+                if add_column(self.connection, table_name, column, definition, after):
+                    print(f"✓ Added column {table_name}.{column}")
+            except Exception as e:
+                print(f"✗ Error adding column {table_name}.{column}: {e}")
+
     def load_analysis_module(self, analysis_name):
         """Dynamically load analysis module"""
         try:
@@ -300,6 +365,123 @@ class AnalysisRunner:
             traceback.print_exc()
             return False
 
+    def worker_options(self):
+        """Constructor arguments that recreate this runner in a worker process"""
+        return {
+            'scan_mode': self.scan_mode,
+            'chunk_size': self.chunk_size,
+            'use_parsed_table': self.use_parsed_table,
+            'incremental': self.incremental,
+            'publish': self.publish
+        }
+
+    def refresh_parsed_table(self):
+        """Parse new jobs_complete rows once into jobs_parsed; returns the table name or None"""
+        if not self.use_parsed_table:
+            return None
+        if refresh_jobs_parsed(self.connection, chunk_size=self.chunk_size):
+            return 'jobs_parsed'
+        print("⚠️  Falling back to parsing rows during the scan")
+        return None
+
+    def run_shared_scan(self, analysis_names=None, refresh_parsed=True):
+        """Run analyses (all by default) from one scan of jobs_complete
+
+        Modules exposing create_visitor() are fed from a single shared read
+        joined with the pre-parsed jobs_parsed table; any module without it
+        falls back to its own run_analysis().
+
+        In incremental mode, analyses with mergeable state resume from their
+        checkpoint and only scan rows added since the last run; the others
+        still get a full scan of their own.
+        """
+        # Parse new jobs_complete rows once into jobs_parsed so analyses don't re-parse them
+        if refresh_parsed:
+            parsed_table = self.refresh_parsed_table()
+        else:
+            parsed_table = 'jobs_parsed' if self.use_parsed_table else None
+
+        create_checkpoint_table(self.connection)
+
+        # The runner's snapshot outlives a run (e.g. in pool workers); reload it when
+        # jobs_latest has changed so lookups don't answer from stale rows
+        try:
+            self.related_jobs.refresh(self.connection)
+        except Exception as e:
+            print(f"⚠️  Could not refresh the jobs_latest snapshot: {e}")
+
+        # One jobs_latest snapshot answers the related_jobs lookups of every analysis
+        engine = ScanEngine(mode=self.scan_mode, chunk_size=self.chunk_size, parsed_table=parsed_table,
+                            related_jobs=self.related_jobs, publish=self.publish)
+        delta_engine = ScanEngine(mode=self.scan_mode, chunk_size=self.chunk_size, parsed_table=parsed_table,
+                                  related_jobs=self.related_jobs, publish=self.publish)
+        standalone = []
+        results = {}
+
+        for analysis_name in analysis_names or self.analyses:
+            module = self.load_analysis_module(analysis_name)
+            if not module:
+                results[analysis_name] = False
+            elif hasattr(module, 'create_visitor'):
+                visitor = module.create_visitor()
+                if self.incremental and visitor.incremental and restore_visitor(self.connection, visitor):
+                    delta_engine.register(visitor)
+                else:
+                    engine.register(visitor)
+            else:
+                standalone.append(analysis_name)
+
+        for label, scan_engine in (('Shared scan', engine), ('Incremental scan', delta_engine)):
+            if not scan_engine.visitors:
+                continue
+            print(f"\n{'='*50}")
+            print(f"{label}: {', '.join(visitor.name for visitor in scan_engine.visitors)}")
+            print(f"{'='*50}")
+            scan_results = scan_engine.run(self.connection)
+            results.update(scan_results)
+
+            # Checkpoint mergeable state so the next incremental run can resume from here
+            for visitor in scan_engine.visitors:
+                if visitor.incremental and scan_results.get(visitor.name):
+                    checkpoint_visitor(self.connection, visitor, scan_engine.last_id)
+
+        if not self.use_parsed_table:
+            stats = SalaryParser.cache_stats()
+            print(f"💰 Salary parse cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1%} hit rate, {stats['size']}/{stats['max_size']} entries)")
+
+        for analysis_name in standalone:
+            results[analysis_name] = self.run_single_analysis(analysis_name)
+
+        return results
+
+    def run_parallel(self):
+        """Run each analysis in a pool of self.jobs worker processes
+
+        Every worker opens its own connection and runs the analyses it is handed
+        over their own scan. Analyses are queued longest first, using the
+        durations recorded by earlier parallel runs.
+        """
+        # Refresh jobs_parsed once here rather than in every worker
+        if self.use_parsed_table and not self.refresh_parsed_table():
+            self.use_parsed_table = False
+
+        create_checkpoint_table(self.connection)
+        create_durations_table(self.connection)
+        queue = longest_first(self.analyses, load_durations(self.connection))
+
+        print(f"\n🚀 Running {len(queue)} analyses on {self.jobs} workers (longest first)")
+        results = {}
+        durations = {}
+        with Pool(self.jobs, initializer=_init_worker, initargs=(self.worker_options(),)) as pool:
+            for analysis_name, success, duration in pool.imap_unordered(_run_in_worker, queue):
+                results[analysis_name] = success
+                durations[analysis_name] = duration
+                print(f"{'✓' if success else '✗'} {analysis_name} finished in {duration:.1f}s")
+
+        save_durations(self.connection, durations)
+        return results
+
     def run_all_analyses(self):
         """Run all analyses"""
         print("\n" + "="*60)
@@ -313,13 +495,35 @@ class AnalysisRunner:
         print("\nCreating analysis tables...")
         self.create_analysis_tables()
 
-        # Run each analysis
+        # job_cube and the skill trend store only append postings past their
+        # watermarks, so full runs rebuild them to drop counts of postings that
+        # were updated or deleted since
+        if not self.incremental:
+            try:
+                create_checkpoint_table(self.connection)
+                clear_checkpoint(self.connection, CUBE_CHECKPOINT)
+                clear_checkpoint(self.connection, STORE_CHECKPOINT)
+            except Exception as e:
+                print(f"⚠️  Could not reset the job_cube and skill_weekly_counts checkpoints: {e}")
+
+        # Run all analyses over a single shared scan, or spread them over worker processes
+        if self.jobs > 1:
+            results = self.run_parallel()
+        else:
+            results = self.run_shared_scan()
+
+        # Drop job cards that no analysis links to any more
+        try:
+            removed_cards = prune_job_cards(self.connection)
+            print(f"\n🗂️  Pruned {removed_cards} unreferenced job cards")
+        except Exception as e:
+            print(f"⚠️  Could not prune job cards: {e}")
+
         successful_analyses = 0
         failed_analyses = []
 
         for analysis in self.analyses:
-            success = self.run_single_analysis(analysis)
-            if success:
+            if results.get(analysis):
                 successful_analyses += 1
             else:
                 failed_analyses.append(analysis)
@@ -340,6 +544,30 @@ class AnalysisRunner:
         self.close_database()
         return len(failed_analyses) == 0
 
+# Runner owned by each worker process of run_parallel(), with its own connection
+_worker_runner = None
+
+def _init_worker(options):
+    """Pool initializer: open one database connection per worker process"""
+    global _worker_runner
+    _worker_runner = AnalysisRunner(**options)
+    if not _worker_runner.connect_database():
+        _worker_runner = None
+
+def _run_in_worker(analysis_name):
+    """Run one analysis in a worker, returning (name, success, seconds)"""
+    start = time.time()
+    if _worker_runner is None:
+        return analysis_name, False, 0.0
+    try:
+        results = _worker_runner.run_shared_scan([analysis_name], refresh_parsed=False)
+        success = bool(results.get(analysis_name))
+    except Exception as e:
+        print(f"✗ Error running analysis {analysis_name}: {e}")
+        traceback.print_exc()
+        success = False
+    return analysis_name, success, time.time() - start
+
 def main():
     """Main function"""
     if len(sys.argv) > 1 and sys.argv[1] == 'single':
@@ -357,9 +585,20 @@ def main():
             runner = AnalysisRunner()
             for analysis in runner.analyses:
                 print(f"  - {analysis}")
-    else:
-        # Run all analyses
+    elif len(sys.argv) > 2 and sys.argv[1] == 'rollback':
+        # Swap analysis_<name>__prev back in after a bad shadow publish
         runner = AnalysisRunner()
+        if runner.connect_database():
+            restore_previous(runner.connection, sys.argv[2])
+            runner.close_database()
+    else:
+        # Run all analyses; --incremental only folds in rows added since the last run
+        # (otherwise job_cube is rebuilt), --shadow publishes each result table with an
+        # atomic RENAME TABLE swap and --jobs N spreads the analyses over N worker processes
+        jobs = int(sys.argv[sys.argv.index('--jobs') + 1]) if '--jobs' in sys.argv else 1
+        runner = AnalysisRunner(incremental='--incremental' in sys.argv,
+                                publish='shadow' if '--shadow' in sys.argv else 'delete',
+                                jobs=jobs)
         runner.run_all_analyses()
 
 if __name__ == "__main__":
@@ -5,281 +5,173 @@ Analyzes the best locations for different types of jobs based on job count, sala
 """
 
 import pymysql
-import json
-import re
+import sys
+import os
 from collections import defaultdict
-from statistics import mean
-
-def extract_salary_value(salary_text):
-    """Extract numeric salary value from text"""
-    if not salary_text:
-        return None
-
-    salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
-    if not numbers:
-        return None
-
-    salary_value = float(numbers[0])
-
-    if 'lpa' in salary_str or 'per annum' in salary_str:
-        return salary_value * 100000
-    elif 'crore' in salary_str:
-        return salary_value * 10000000
-    elif 'lakh' in salary_str:
-        return salary_value * 100000
-    elif 'k' in salary_str and salary_value < 1000:
-        return salary_value * 1000
-    elif salary_value > 1000000:
-        return salary_value
-    else:
-        return salary_value * 100000
-
-def normalize_job_type(title):
-    """Normalize job titles into categories"""
-    if not title:
-        return "Unknown"
-
-    title_lower = title.lower()
-
-    if any(keyword in title_lower for keyword in ['software engineer', 'developer', 'programmer', 'backend', 'frontend']):
-        return 'Software Development'
-    elif any(keyword in title_lower for keyword in ['data engineer', 'data scientist', 'data analyst']):
-        return 'Data Science & Analytics'
-    elif any(keyword in title_lower for keyword in ['ai engineer', 'ml engineer', 'machine learning']):
-        return 'AI/Machine Learning'
-    elif any(keyword in title_lower for keyword in ['qa engineer', 'test engineer', 'quality']):
-        return 'Quality Assurance'
-    elif any(keyword in title_lower for keyword in ['manager', 'lead', 'head', 'director']):
-        return 'Management & Leadership'
-    elif any(keyword in title_lower for keyword in ['consultant', 'advisor']):
-        return 'Consulting'
-    elif any(keyword in title_lower for keyword in ['designer', 'ui', 'ux']):
-        return 'Design & UX'
-    elif any(keyword in title_lower for keyword in ['marketing', 'sales']):
-        return 'Marketing & Sales'
-    elif any(keyword in title_lower for keyword in ['intern', 'trainee']):
-        return 'Internships'
-    else:
-        return 'Other'
-
-def normalize_location(location):
-    """Normalize location names"""
-    if not location:
-        return "Unknown"
-
-    location_lower = location.lower().strip()
-
-    # Major city mappings
-    city_mappings = {
-        'bangalore': 'Bangalore',
-        'bengaluru': 'Bangalore', 
-        'mumbai': 'Mumbai',
-        'pune': 'Pune',
-        'delhi': 'Delhi',
-        'new delhi': 'Delhi',
-        'gurgaon': 'Gurgaon',
-        'gurugram': 'Gurgaon',
-        'hyderabad': 'Hyderabad',
-        'chennai': 'Chennai',
-        'kolkata': 'Kolkata',
-        'ahmedabad': 'Ahmedabad',
-        'noida': 'Noida',
-        'kochi': 'Kochi',
-        'cochin': 'Kochi',
-        'thiruvananthapuram': 'Thiruvananthapuram',
-        'coimbatore': 'Coimbatore',
-        'indore': 'Indore',
-        'jaipur': 'Jaipur',
-        'lucknow': 'Lucknow',
-        'chandigarh': 'Chandigarh'
-    }
-
-    for key, value in city_mappings.items():
-        if key in location_lower:
-            return value
-
-    # Return original if not found in mappings
-    return location.title()
-
-def get_related_jobs(connection, job_type, location, limit=5):
-    """Get related available jobs for this job type and location"""
-    try:
-        cursor = connection.cursor()
-
-        query = """
-        SELECT title, company, location, salary, job_id, openings
-        FROM jobs_latest 
-        WHERE title LIKE %s AND location LIKE %s
-        ORDER BY CAST(REGEXP_REPLACE(REGEXP_REPLACE(salary, '[^0-9.]', ''), '^0+', '') AS DECIMAL(15,2)) DESC
-        LIMIT %s
-        """
-
-        job_pattern = f"%{job_type.split()[0].lower()}%"
-        location_pattern = f"%{location}%"
-        cursor.execute(query, (job_pattern, location_pattern, limit))
-
-        jobs = cursor.fetchall()
-        related_jobs = []
-
-        for job in jobs:
-            job_info = {
-                'title': job['title'],
-                'company': job['company'], 
-                'location': job['location'],
-                'salary': job['salary'],
-                'job_id': job['job_id'],
-                'openings': job.get('openings', 1)
-            }
-            related_jobs.append(job_info)
-
-        return json.dumps(related_jobs)
-    except Exception as e:
-        print(f"Error getting related jobs: {e}")
-        return "[]"
 
-def run_analysis(connection):
-    """Main analysis function"""
-    try:
-        cursor = connection.cursor()
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.title_classifier import classify_title
+from analysis.related_jobs import RELATED_JOB_FIELDS
+from analysis.hyperloglog import DistinctCounter
 
-        print("🔍 Fetching job data for location analysis...")
+# Related job fields stored for each location (best paying first)
+LOCATION_JOB_FIELDS = RELATED_JOB_FIELDS + ('openings',)
 
-        # Fetch jobs with location and other relevant data
-        query = """
-        SELECT title, location, salary, openings, company
-        FROM jobs_complete 
-        WHERE location IS NOT NULL 
-        AND location != ''
-        """
-
-        cursor.execute(query)
-        jobs = cursor.fetchall()
-
-        if not jobs:
-            print("No jobs found with location data")
-            return False
+class BestLocationsVisitor(ScanVisitor):
+    """Groups jobs by job type and normalized location from the shared scan"""
 
-        print(f"📊 Processing {len(jobs)} jobs with location information...")
+    name = 'best_locations_by_job_type'
+    columns = ('title', 'location', 'openings', 'company', 'normalized_location', 'salary_value')
+    state_fields = ('location_job_data', 'processed_jobs', 'jobs_seen')
 
+    def __init__(self):
         # Group jobs by job type and location
-        location_job_data = defaultdict(lambda: defaultdict(lambda: {
+        self.location_job_data = defaultdict(lambda: defaultdict(lambda: {
             'job_count': 0,
             'total_openings': 0,
-            'salaries': [],
-            'companies': set()
+            'salary_sum': 0.0,
+            'salary_count': 0,
+            'companies': DistinctCounter()
         }))
+        self.processed_jobs = 0
+        self.jobs_seen = 0
 
-        processed_jobs = 0
+    def accepts(self, job):
+        return bool(job.get('location'))
 
-        for job in jobs:
-            job_type = normalize_job_type(job['title'])
-            location = normalize_location(job['location'])
+    def visit(self, job):
+        self.jobs_seen += 1
+        location_job_data = self.location_job_data
+        job_type = classify_title(job['title'], 'job_type')
+        location = job['normalized_location']
 
-            if job_type != "Unknown" and location != "Unknown":
-                location_job_data[job_type][location]['job_count'] += 1
+        if job_type != "Unknown" and location != "Unknown":
+            location_job_data[job_type][location]['job_count'] += 1
 
-                # Add openings
-                try:
-                    openings = int(job['openings']) if job['openings'] else 1
-                    location_job_data[job_type][location]['total_openings'] += openings
-                except (ValueError, TypeError):
-                    location_job_data[job_type][location]['total_openings'] += 1
+            # Add openings
+            try:
+                openings = int(job['openings']) if job['openings'] else 1
+                location_job_data[job_type][location]['total_openings'] += openings
+            except (ValueError, TypeError):
+                location_job_data[job_type][location]['total_openings'] += 1
 
-                # Add salary if available
-                salary_value = extract_salary_value(job['salary'])
-                if salary_value and salary_value > 0:
-                    location_job_data[job_type][location]['salaries'].append(salary_value)
+            # Add salary if available
+            salary_value = job['salary_value']
+            if salary_value and salary_value > 0:
+                location_job_data[job_type][location]['salary_sum'] += salary_value
+                location_job_data[job_type][location]['salary_count'] += 1
 
-                # Add company
-                if job['company']:
-                    location_job_data[job_type][location]['companies'].add(job['company'])
+            # Add company
+            if job['company']:
+                location_job_data[job_type][location]['companies'].add(job['company'])
 
-                processed_jobs += 1
+            self.processed_jobs += 1
 
-        print(f"✅ Successfully processed {processed_jobs} jobs")
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                print("No jobs found with location data")
+                return False
 
-        print("💾 Clearing previous analysis results...")
+            location_job_data = self.location_job_data
 
-        # Clear previous results
-        cursor.execute("DELETE FROM analysis_best_locations")
+            print(f"✅ Successfully processed {self.processed_jobs} jobs")
 
-        print("📈 Analyzing best locations for each job type...")
+            print("💾 Staging new analysis results...")
 
-        # Analyze and store results
-        results_stored = 0
+            writer = self.result_writer(connection, 'analysis_best_locations',
+                                        ('job_type', 'location', 'job_count', 'avg_salary', 'total_openings', 'distinct_companies',
+                                         'related_jobs'))
 
-        for job_type, locations in location_job_data.items():
-            # Filter locations with meaningful data (at least 3 jobs)
-            valid_locations = {loc: data for loc, data in locations.items() if data['job_count'] >= 3}
+            print("📈 Analyzing best locations for each job type...")
 
-            if not valid_locations:
-                continue
+            # Analyze results, then store them once related jobs are resolved
+            results_stored = 0
+            best_locations = []
 
-            # Sort locations by job count and average salary
-            location_scores = []
+            for job_type, locations in location_job_data.items():
+                # Filter locations with meaningful data (at least 3 jobs)
+                valid_locations = {loc: data for loc, data in locations.items() if data['job_count'] >= 3}
 
-            for location, data in valid_locations.items():
-                avg_salary = mean(data['salaries']) if data['salaries'] else 0
+                if not valid_locations:
+                    continue
 
-                # Calculate a composite score (weighted by job count and salary)
-                score = data['job_count'] * 0.6 + (avg_salary / 100000) * 0.4
+                # Sort locations by job count and average salary
+                location_scores = []
 
-                location_scores.append({
-                    'location': location,
-                    'job_count': data['job_count'],
-                    'total_openings': data['total_openings'],
-                    'avg_salary': avg_salary,
-                    'company_count': len(data['companies']),
-                    'score': score
-                })
+                for location, data in valid_locations.items():
+                    avg_salary = data['salary_sum'] / data['salary_count'] if data['salary_count'] else 0
 
-            # Sort by score (descending)
-            location_scores.sort(key=lambda x: x['score'], reverse=True)
+                    # Calculate a composite score (weighted by job count and salary)
+                    score = data['job_count'] * 0.6 + (avg_salary / 100000) * 0.4
 
-            # Store top locations for this job type
-            for location_data in location_scores[:10]:  # Top 10 locations per job type
-                related_jobs = get_related_jobs(connection, job_type, location_data['location'])
+                    location_scores.append({
+                        'location': location,
+                        'job_count': data['job_count'],
+                        'total_openings': data['total_openings'],
+                        'avg_salary': avg_salary,
+                        'distinct_companies': data['companies'].count(),
+                        'score': score
+                    })
 
-                insert_query = """
-                INSERT INTO analysis_best_locations 
-                (job_type, location, job_count, avg_salary, total_openings, related_jobs)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
+                # Sort by score (descending)
+                location_scores.sort(key=lambda x: x['score'], reverse=True)
 
-                cursor.execute(insert_query, (
+                # Keep top locations for this job type
+                for location_data in location_scores[:10]:  # Top 10 locations per job type
+                    related_key = self.related_jobs.request(title=job_type.split()[0], location=location_data['location'],
+                                                            order_by='salary', fields=LOCATION_JOB_FIELDS)
+                    best_locations.append((job_type, location_data, related_key))
+
+            # Resolve related jobs for all job type/location pairs in one pass over jobs_latest
+            self.related_jobs.resolve(connection)
+
+            for job_type, location_data, related_key in best_locations:
+                writer.add((
                     job_type,
                     location_data['location'],
                     location_data['job_count'],
                     round(location_data['avg_salary'], 2) if location_data['avg_salary'] > 0 else 0,
                     location_data['total_openings'],
-                    related_jobs
+                    location_data['distinct_companies'],
+                    self.related_jobs.get(related_key)
                 ))
 
                 results_stored += 1
 
-        print(f"✅ Analysis completed! Stored {results_stored} location-job type combinations")
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} location-job type combinations")
 
-        # Print summary
-        print("\n🌍 Top Locations by Job Type:")
+            # Print summary
+            print("\n🌍 Top Locations by Job Type:")
 
-        for job_type in ['Software Development', 'Data Science & Analytics', 'AI/Machine Learning']:
-            if job_type in location_job_data:
-                print(f"\n{job_type}:")
-                valid_locations = {loc: data for loc, data in location_job_data[job_type].items() if data['job_count'] >= 3}
-                sorted_locations = sorted(valid_locations.items(), key=lambda x: x[1]['job_count'], reverse=True)[:5]
+            for job_type in ['Software Development', 'Data Science & Analytics', 'AI/Machine Learning']:
+                if job_type in location_job_data:
+                    print(f"\n{job_type}:")
+                    valid_locations = {loc: data for loc, data in location_job_data[job_type].items() if data['job_count'] >= 3}
+                    sorted_locations = sorted(valid_locations.items(), key=lambda x: x[1]['job_count'], reverse=True)[:5]
 
-                for location, data in sorted_locations:
-                    avg_salary_lpa = mean(data['salaries']) / 100000 if data['salaries'] else 0
-                    print(f"  • {location}: {data['job_count']} jobs, {avg_salary_lpa:.1f} LPA avg")
+                    for location, data in sorted_locations:
+                        avg_salary_lpa = data['salary_sum'] / data['salary_count'] / 100000 if data['salary_count'] else 0
+                        print(f"  • {location}: {data['job_count']} jobs, {avg_salary_lpa:.1f} LPA avg")
 
-        return True
+            return True
+
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
 
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return BestLocationsVisitor()
+
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
 
 if __name__ == "__main__":
     import sys
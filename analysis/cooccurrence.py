@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Skill Co-occurrence Matrix
+Job x skill sparse matrices whose products give pair counts and pair-weighted sums,
+and association metrics of skill pairs computed from those counts
+"""
+
+import numpy as np
+from scipy import sparse
+
+class SkillCooccurrence:
+    """Sparse job x skill incidence matrix X over a set of skill IDs
+
+    Column i of X is skill_ids[i]. X.T @ X holds, for every skill pair, the
+    number of jobs listing both; X.T @ diag(w) @ X sums a per-job weight w
+    over those jobs. Pairs (i, j) with i < j follow the column order, so
+    callers pick the pair orientation by how they order skill_ids.
+    """
+
+    def __init__(self, jobs, skill_ids, vocabulary_size):
+        """Build X from an iterable of per-job int skill ID arrays
+
+        IDs not in skill_ids are ignored; rows are kept for every job so row
+        numbers line up with per-job weights.
+        """
+        self.skill_ids = np.asarray(skill_ids, dtype=np.int64)
+        column_of = np.full(vocabulary_size, -1, dtype=np.int64)
+        column_of[self.skill_ids] = np.arange(len(self.skill_ids))
+
+        indices = []
+        indptr = [0]
+        for job_skill_ids in jobs:
+            columns = column_of[job_skill_ids]
+            columns = columns[columns >= 0]
+            indices.append(columns)
+            indptr.append(indptr[-1] + len(columns))
+
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float64), indices, np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.skill_ids)))
+        self._counts = None
+
+    @property
+    def job_count(self):
+        return self.matrix.shape[0]
+
+    def counts(self):
+        """Pair co-occurrence counts X.T @ X (diagonal = jobs per skill)"""
+        if self._counts is None:
+            self._counts = (self.matrix.T @ self.matrix).tocsr()
+        return self._counts
+
+    def marginals(self):
+        """Jobs listing each skill (the diagonal of X.T @ X)"""
+        return self.counts().diagonal().astype(np.int64)
+
+    def weighted(self, weights):
+        """X.T @ diag(weights) @ X for one weight per job row"""
+        weights = np.asarray(weights, dtype=np.float64)
+        return (self.matrix.T @ sparse.diags(weights) @ self.matrix).tocsr()
+
+    def pairs(self, min_count=1):
+        """(rows, columns, counts) of every pair i < j seen in at least min_count jobs"""
+        upper = sparse.triu(self.counts(), k=1).tocoo()
+        keep = upper.data >= min_count
+        return upper.row[keep], upper.col[keep], upper.data[keep].astype(np.int64)
+
+    @staticmethod
+    def top_k_per_skill(rows, columns, scores, k):
+        """Indexes of pairs that rank in the top k (by score) for either of their skills"""
+        pair_index = np.arange(len(rows))
+        skill = np.concatenate([rows, columns])
+        pair = np.concatenate([pair_index, pair_index])
+        score = np.concatenate([scores, scores])
+
+        # Sort by skill, then score descending; rank = position within each skill's run
+        order = np.lexsort((pair, -score, skill))
+        sorted_skill = skill[order]
+        starts = np.flatnonzero(np.r_[True, sorted_skill[1:] != sorted_skill[:-1]])
+        run_lengths = np.diff(np.r_[starts, len(sorted_skill)])
+        rank = np.arange(len(sorted_skill)) - np.repeat(starts, run_lengths)
+        return np.unique(pair[order][rank < k])
+
+    @staticmethod
+    def values(matrix, rows, columns):
+        """Entries matrix[rows[n], columns[n]] as a flat array"""
+        if not len(rows):
+            return np.zeros(0)
+        return np.asarray(matrix[rows, columns]).ravel()
+
+def association_metrics(joint, first_counts, second_counts, total_jobs):
+    """Association metrics of skill pairs from joint and marginal job counts
+
+    joint[n] is the number of jobs listing both skills of pair n, and
+    first_counts[n] / second_counts[n] the jobs listing each skill alone, out
+    of total_jobs. Returns a dict of float arrays:
+      support            P(a, b)
+      confidence_first   P(b | a), the share of a's jobs that also list b
+      confidence_second  P(a | b)
+      lift               P(a, b) / (P(a) P(b)); 1 means independent
+      pmi                log2(lift)
+      jaccard            |a and b| / |a or b|
+    """
+    joint = np.asarray(joint, dtype=np.float64)
+    first_counts = np.asarray(first_counts, dtype=np.float64)
+    second_counts = np.asarray(second_counts, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = joint * total_jobs / (first_counts * second_counts)
+        metrics = {
+            'support': joint / total_jobs,
+            'confidence_first': joint / first_counts,
+            'confidence_second': joint / second_counts,
+            'lift': lift,
+            'pmi': np.log2(lift),
+            'jaccard': joint / (first_counts + second_counts - joint),
+        }
+    # Pairs with no jobs have no association rather than NaN/-inf
+    return {name: np.nan_to_num(values, nan=0.0, neginf=0.0, posinf=0.0)
+            for name, values in metrics.items()}
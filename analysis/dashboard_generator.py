@@ -4,7 +4,7 @@ Job Analysis Dashboard
 Creates visualizations and reports from analysis results
 """
 
-import pymysql
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -12,17 +12,9 @@ import json
 from datetime import datetime
 import os
 
-# Database configuration (same as analysis_runner.py)
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'hrmoihtt_hrtoolusers',
-    'password': 'FsPyjP6hPc6yReV11111111',
-    'database': 'hrmoihtt_hrtoolusers',
-    'cursorclass': pymysql.cursors.DictCursor,
-    'charset': 'utf8mb4',
-    'autocommit': True,
-    'port': 3306
-}
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.db_pool import get_pool
 
 class JobAnalysisDashboard:
     def __init__(self):
@@ -39,7 +31,7 @@ class JobAnalysisDashboard:
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = pymysql.connect(**DB_CONFIG)
+            self.connection = get_pool().acquire()
             print("✓ Database connection established")
             return True
         except Exception as e:
@@ -49,7 +41,8 @@ class JobAnalysisDashboard:
     def close_database(self):
         """Close database connection"""
         if self.connection:
-            self.connection.close()
+            get_pool().release(self.connection)
+            self.connection = None
             print("✓ Database connection closed")
 
     def generate_skills_report(self):
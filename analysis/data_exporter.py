@@ -4,23 +4,16 @@ Comprehensive Data Export Utility
 Exports all analysis results to various formats (JSON, CSV, Excel)
 """
 
-import pymysql
+import sys
 import json
 import pandas as pd
 from datetime import datetime
 import os
 
-# Database configuration
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'hrmoihtt_hrtoolusers',
-    'password': 'FsPyjP6hPc6yReV11111111',
-    'database': 'hrmoihtt_hrtoolusers',
-    'cursorclass': pymysql.cursors.DictCursor,
-    'charset': 'utf8mb4',
-    'autocommit': True,
-    'port': 3306
-}
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.db_pool import get_pool
+from analysis.related_jobs import hydrate_related_jobs
 
 class JobAnalysisExporter:
     def __init__(self):
@@ -53,7 +46,7 @@ class JobAnalysisExporter:
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = pymysql.connect(**DB_CONFIG)
+            self.connection = get_pool().acquire()
             print("✓ Database connection established")
             return True
         except Exception as e:
@@ -63,7 +56,8 @@ class JobAnalysisExporter:
     def close_database(self):
         """Close database connection"""
         if self.connection:
-            self.connection.close()
+            get_pool().release(self.connection)
+            self.connection = None
             print("✓ Database connection closed")
 
     def extract_analysis_data(self):
@@ -95,7 +89,8 @@ class JobAnalysisExporter:
                 """
 
                 cursor.execute(query)
-                results = cursor.fetchall()
+                # Attach each row's related job cards in one batched lookup
+                results = hydrate_related_jobs(self.connection, table_name, [dict(row) for row in cursor.fetchall()])
 
                 if results:
                     # Clean and process the data
@@ -104,18 +99,13 @@ class JobAnalysisExporter:
                         # Convert to regular dict and handle JSON fields
                         processed_row = dict(row)
 
-                        # Parse related_jobs JSON if present
-                        if 'related_jobs' in processed_row and processed_row['related_jobs']:
-                            try:
-                                related_jobs = json.loads(processed_row['related_jobs'])
-                                processed_row['related_jobs_count'] = len(related_jobs) if related_jobs else 0
-                                processed_row['related_jobs_summary'] = '; '.join([
-                                    f"{job.get('title', 'N/A')} at {job.get('company', 'N/A')}" 
-                                    for job in related_jobs[:3]
-                                ]) if related_jobs else 'None'
-                            except:
-                                processed_row['related_jobs_count'] = 0
-                                processed_row['related_jobs_summary'] = 'None'
+                        # Summarize related jobs
+                        related_jobs = processed_row['related_jobs']
+                        processed_row['related_jobs_count'] = len(related_jobs)
+                        processed_row['related_jobs_summary'] = '; '.join([
+                            f"{job.get('title', 'N/A')} at {job.get('company', 'N/A')}" 
+                            for job in related_jobs[:3]
+                        ]) if related_jobs else 'None'
 
                         # Parse other JSON fields
                         for field in ['top_skills', 'key_skills', 'top_job_types', 'job_types']:
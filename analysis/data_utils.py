@@ -6,10 +6,169 @@ Handles proper extraction and normalization of salary and other data fields
 
 import re
 import json
+import sys
+import os
+import math
+from functools import lru_cache
 from typing import Optional, Dict, Any
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.title_classifier import classify_title
+from analysis.location_normalizer import get_location_engine
+
+SALARY_NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+# First two numbers of a salary string, as re.findall(SALARY_NUMBER_PATTERN) finds them
+SALARY_FIRST_NUMBERS_PATTERN = r'(\d+(?:\.\d+)?)(?:.*?(\d+(?:\.\d+)?))?'
+
+# Salary texts that never carry an amount
+UNDISCLOSED_SALARIES = frozenset(['not disclosed', 'as per market standards', 'unpaid'])
+
+# Distinct (salary, salary_detail) pairs kept by the parse cache; a few
+# thousand variants cover nearly every row, so this rarely evicts
+SALARY_CACHE_SIZE = 16384
+
+# t-digest compression of SalarySketch (more = finer centroids); groups up to
+# SKETCH_BUFFER_SIZE values are kept raw, so their quantiles are exact
+SKETCH_COMPRESSION = 100
+SKETCH_BUFFER_SIZE = 500
+
+# Salary percentiles reported for each group
+SALARY_PERCENTILES = {'p10': 0.10, 'p25': 0.25, 'median': 0.50, 'p75': 0.75, 'p90': 0.90}
 
 class SalaryParser:
-    """Handles parsing salary from both salary and salary_detail fields"""
+    """Handles parsing salary from both salary and salary_detail fields
+
+    parse() is the cached entry point: salary strings repeat heavily ("Not
+    Disclosed", "3-6 Lacs PA", ...), so results are memoized in a bounded LRU
+    keyed on the raw (salary, salary_detail) pair. cache_stats() reports the
+    hits and misses for tuning SALARY_CACHE_SIZE.
+    """
+
+    @staticmethod
+    def parse(salary_text=None, salary_detail=None) -> Optional[float]:
+        """Cached extract_salary_value()"""
+        try:
+            return _cached_salary_value(salary_text, salary_detail)
+        except TypeError:
+            # Unhashable input (salary_detail already decoded to a dict)
+            return SalaryParser.extract_salary_value(salary_text, salary_detail)
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Hit/miss counters of the parse cache"""
+        info = _cached_salary_value.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def clear_cache():
+        """Empty the parse cache and reset its counters"""
+        _cached_salary_value.cache_clear()
+
+    @staticmethod
+    def salary_from_detail(salary_detail=None) -> Optional[float]:
+        """Salary from the salary_detail JSON, or None if it has no usable amount"""
+        if not salary_detail:
+            return None
+        try:
+            if isinstance(salary_detail, str):
+                salary_json = json.loads(salary_detail)
+            else:
+                salary_json = salary_detail
+
+            min_salary = salary_json.get('minimumSalary', 0)
+            max_salary = salary_json.get('maximumSalary', 0)
+
+            # If both are valid, take average
+            if min_salary > 0 and max_salary > 0:
+                return (min_salary + max_salary) / 2
+            elif min_salary > 0:
+                return min_salary
+            elif max_salary > 0:
+                return max_salary
+        except (json.JSONDecodeError, TypeError, AttributeError):
+            pass
+        return None
+
+    @staticmethod
+    def extract_salary_values(salary_texts, salary_details=None) -> np.ndarray:
+        """
+        Batch version of extract_salary_value over whole columns
+        Takes arrays/Series of salary and salary_detail values and returns a
+        float64 array of annual INR, with NaN where extract_salary_value
+        returns None
+        """
+        texts = pd.Series(salary_texts, dtype=object).reset_index(drop=True)
+        if salary_details is None:
+            details = pd.Series([None] * len(texts), dtype=object)
+        else:
+            details = pd.Series(salary_details, dtype=object).reset_index(drop=True)
+        if len(details) != len(texts):
+            raise ValueError("salary and salary_detail columns must have the same length")
+
+        # Columns hold a few thousand distinct values, so each is parsed once
+        text_codes, unique_texts = _factorize(texts)
+        values = _take(SalaryParser._salary_text_values(pd.Series(unique_texts, dtype=object)), text_codes)
+
+        detail_codes, unique_details = _factorize(details)
+        detail_values = np.array([SalaryParser.salary_from_detail(detail) for detail in unique_details],
+                                 dtype=np.float64)
+        detail_values = _take(detail_values, detail_codes)
+
+        return np.where(np.isnan(detail_values), values, detail_values)
+
+    @staticmethod
+    def _salary_text_values(texts: pd.Series) -> np.ndarray:
+        """Vectorized salary-text branch of extract_salary_value"""
+        present = texts.notna() & texts.astype(bool)
+        lower = texts.where(present, '').astype(str).str.lower()
+        present &= ~lower.isin(UNDISCLOSED_SALARIES)
+        salary_str = lower.str.replace(',', '', regex=False).str.replace(' ', '', regex=False)
+
+        numbers = salary_str.str.extract(SALARY_FIRST_NUMBERS_PATTERN, flags=re.DOTALL)
+        first = numbers[0].astype(np.float64).to_numpy()
+        second = numbers[1].astype(np.float64).to_numpy()
+        present &= numbers[0].notna()
+
+        def contains(*units):
+            found = np.zeros(len(salary_str), dtype=bool)
+            for unit in units:
+                found |= salary_str.str.contains(unit, regex=False).to_numpy()
+            return found
+
+        # Handle ranges (e.g., "7-17 Lacs PA")
+        is_range = ~np.isnan(second) & contains('-', 'to')
+        salary_value = np.where(is_range, (first + second) / 2, first)
+
+        # Convert based on units, in the same order as extract_salary_value
+        result = np.select(
+            [contains('lpa', 'per annum', 'pa', 'annually'),
+             contains('crore'),
+             contains('lakh', 'lac'),
+             contains('/month', 'per month'),
+             contains('k') & (salary_value < 1000),
+             salary_value > 100000,
+             salary_value > 1000],
+            [salary_value * 100000,
+             salary_value * 10000000,
+             salary_value * 100000,
+             salary_value * 12,
+             salary_value * 1000,
+             salary_value,
+             salary_value * 1000],
+            default=salary_value * 100000)
+
+        return np.where(present.to_numpy(), result, np.nan)
 
     @staticmethod
     def extract_salary_value(salary_text: str = None, salary_detail: str = None) -> Optional[float]:
@@ -18,34 +177,21 @@ class SalaryParser:
         Returns salary in INR (actual amount, not LPA)
         """
         # First try salary_detail JSON if available
-        if salary_detail:
-            try:
-                if isinstance(salary_detail, str):
-                    salary_json = json.loads(salary_detail)
-                else:
-                    salary_json = salary_detail
-
-                min_salary = salary_json.get('minimumSalary', 0)
-                max_salary = salary_json.get('maximumSalary', 0)
-
-                # If both are valid, take average
-                if min_salary > 0 and max_salary > 0:
-                    return (min_salary + max_salary) / 2
-                elif min_salary > 0:
-                    return min_salary
-                elif max_salary > 0:
-                    return max_salary
-            except (json.JSONDecodeError, TypeError, AttributeError):
-                pass
+        detail_value = SalaryParser.salary_from_detail(salary_detail)
+        if detail_value is not None:
+            return detail_value
 
         # Fall back to parsing salary text
-        if not salary_text or str(salary_text).lower() in ['not disclosed', 'as per market standards', 'unpaid']:
+        if not salary_text:
+            return None
+        salary_lower = str(salary_text).lower()
+        if salary_lower in UNDISCLOSED_SALARIES:
             return None
 
-        salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
+        salary_str = salary_lower.replace(',', '').replace(' ', '')
 
         # Extract numbers
-        numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
+        numbers = SALARY_NUMBER_PATTERN.findall(salary_str)
         if not numbers:
             return None
 
@@ -74,6 +220,22 @@ class SalaryParser:
             # For small numbers, assume LPA
             return salary_value * 100000
 
+def _factorize(values: pd.Series):
+    """Codes and unique values of a column; None/NaN get code -1"""
+    try:
+        return pd.factorize(values)
+    except TypeError:
+        # Unhashable values (salary_detail already decoded to dicts)
+        return np.arange(len(values)), values.to_numpy()
+
+def _take(unique_values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Expand per-unique float values back to rows; code -1 becomes NaN"""
+    return np.append(unique_values, np.nan)[codes]
+
+@lru_cache(maxsize=SALARY_CACHE_SIZE, typed=True)
+def _cached_salary_value(salary_text, salary_detail):
+    return SalaryParser.extract_salary_value(salary_text, salary_detail)
+
 class SkillsExtractor:
     """Handles extraction and cleaning of skills from text"""
 
@@ -179,66 +341,158 @@ class LocationNormalizer:
     @staticmethod
     def normalize_location(location: str) -> str:
         """Normalize location names to standard city names"""
-        if not location:
-            return "Unknown"
-
-        location_str = str(location).strip()
-
-        # Handle hybrid/remote locations
-        if 'hybrid' in location_str.lower():
-            # Extract city from "Hybrid - Bengaluru"
-            match = re.search(r'hybrid\s*-\s*([^,()]+)', location_str, re.IGNORECASE)
-            if match:
-                location_str = match.group(1).strip()
-
-        # Handle multiple locations - take the first one
-        if ',' in location_str:
-            location_str = location_str.split(',')[0].strip()
-
-        # Handle locations with additional info in parentheses
-        location_str = re.sub(r'\([^)]*\)', '', location_str).strip()
-
-        # City mappings for consistency
-        city_mappings = {
-            'bengaluru': 'Bangalore',
-            'bangalore': 'Bangalore',
-            'mumbai': 'Mumbai',
-            'pune': 'Pune',
-            'delhi': 'Delhi',
-            'new delhi': 'Delhi',
-            'gurgaon': 'Gurgaon',
-            'gurugram': 'Gurgaon',
-            'hyderabad': 'Hyderabad',
-            'chennai': 'Chennai',
-            'kolkata': 'Kolkata',
-            'ahmedabad': 'Ahmedabad',
-            'noida': 'Noida',
-            'kochi': 'Kochi',
-            'cochin': 'Kochi',
-            'thiruvananthapuram': 'Thiruvananthapuram',
-            'coimbatore': 'Coimbatore',
-            'indore': 'Indore',
-            'jaipur': 'Jaipur',
-            'lucknow': 'Lucknow',
-            'chandigarh': 'Chandigarh',
-            'bhubaneswar': 'Bhubaneswar',
-            'patna': 'Patna',
-            'surat': 'Surat',
-            'vadodara': 'Vadodara'
-        }
+        return get_location_engine().normalize(location)
 
-        location_lower = location_str.lower()
-        for key, value in city_mappings.items():
-            if key in location_lower:
-                return value
+class JobTitleCategorizer:
+    """Maps raw job titles to broad job categories"""
 
-        # Return title case if not found in mappings
-        return location_str.title() if len(location_str) > 2 else "Unknown"
+    @staticmethod
+    def categorize(title: str) -> str:
+        """Normalize job titles to group similar ones"""
+        return classify_title(title, 'category')
+
+class SalarySketch:
+    """Mergeable quantile sketch (merging t-digest) of one group's salaries
+
+    Holds a bounded list of weighted centroids instead of every value, so
+    memory is O(compression) per group however many rows it sees. Count,
+    sum, min and max are kept exactly. Sketches merge with merge(), and
+    to_state()/merge_state() round-trip them through checkpoint JSON, so
+    partial results of incremental or parallel runs combine.
+    """
+
+    def __init__(self, compression=SKETCH_COMPRESSION):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.buffer = []  # values not yet folded into centroids
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        value = float(value)
+        self.buffer.append(value)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.buffer) >= SKETCH_BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        self.means = np.concatenate([self.means, other.means])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self.buffer.extend(other.buffer)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.means) or len(self.buffer) >= SKETCH_BUFFER_SIZE:
+            self._compress()
+        return self
+
+    def _scale(self, q):
+        """t-digest k1 scale function; one centroid spans at most 1 unit of k"""
+        return self.compression / (2 * math.pi) * math.asin(min(1.0, max(-1.0, 2 * q - 1)))
+
+    def _compress(self):
+        """Fold the buffer into the centroids, merging neighbours within the size bound"""
+        means = np.concatenate([self.means, np.asarray(self.buffer, dtype=np.float64)])
+        weights = np.concatenate([self.weights, np.ones(len(self.buffer))])
+        self.buffer = []
+        if not len(means):
+            return
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order].tolist(), weights[order].tolist()
+        total_weight = sum(weights)
+
+        merged_means, merged_weights = [means[0]], [weights[0]]
+        weight_before = 0.0
+        k_lower = self._scale(0.0)
+        for mean, weight in zip(means[1:], weights[1:]):
+            current_weight = merged_weights[-1]
+            if self._scale((weight_before + current_weight + weight) / total_weight) - k_lower <= 1:
+                merged_weights[-1] = current_weight + weight
+                merged_means[-1] += (mean - merged_means[-1]) * weight / merged_weights[-1]
+            else:
+                weight_before += current_weight
+                k_lower = self._scale(weight_before / total_weight)
+                merged_means.append(mean)
+                merged_weights.append(weight)
+
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def quantile(self, q):
+        """Estimated q-quantile (exact, with linear interpolation, while values are buffered)"""
+        if not self.count:
+            return None
+        if len(self.means) and self.buffer:
+            self._compress()
+        if len(self.means):
+            means, weights = self.means, self.weights
+        else:
+            means = np.sort(np.asarray(self.buffer, dtype=np.float64))
+            weights = np.ones(len(means))
+
+        # Rank (0..count-1) at each centroid's centre, pinned to the exact min and max
+        centres = np.cumsum(weights) - (weights + 1) / 2
+        ranks = np.concatenate([[0.0], centres, [self.count - 1.0]])
+        values = np.concatenate([[self.min], means, [self.max]])
+        return float(np.interp(q * (self.count - 1), ranks, values))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentiles(self):
+        """{'p10', 'p25', 'median', 'p75', 'p90'} estimates"""
+        return {name: self.quantile(q) for name, q in SALARY_PERCENTILES.items()}
+
+    def to_state(self):
+        """JSON-serializable state"""
+        return {
+            'centroids': [[mean, weight] for mean, weight in zip(self.means.tolist(), self.weights.tolist())],
+            'values': list(self.buffer),
+            'count': self.count,
+            'total': self.total,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_state(cls, state, compression=SKETCH_COMPRESSION):
+        sketch = cls(compression)
+        if state['centroids']:
+            sketch.means, sketch.weights = (np.array(column, dtype=np.float64)
+                                            for column in zip(*state['centroids']))
+        sketch.buffer = list(state['values'])
+        sketch.count = state['count']
+        sketch.total = state['total']
+        if sketch.count:
+            sketch.min, sketch.max = state['min'], state['max']
+        return sketch
+
+    def merge_state(self, state):
+        """Fold a state produced by to_state() into this sketch"""
+        return self.merge(SalarySketch.from_state(state, self.compression))
 
 # Convenience functions
 def parse_salary(salary_text=None, salary_detail=None):
-    """Convenience function for salary parsing"""
-    return SalaryParser.extract_salary_value(salary_text, salary_detail)
+    """Convenience function for salary parsing (cached)"""
+    return SalaryParser.parse(salary_text, salary_detail)
+
+def parse_salaries(salary_texts, salary_details=None):
+    """Convenience function for batch salary parsing (float64 array, NaN if unknown)"""
+    return SalaryParser.extract_salary_values(salary_texts, salary_details)
 
 def extract_skills(text):
     """Convenience function for skills extraction"""
@@ -251,3 +505,7 @@ def parse_experience(min_exp=None, max_exp=None, exp_text=None):
 def normalize_location(location):
     """Convenience function for location normalization"""
     return LocationNormalizer.normalize_location(location)
+
+def categorize_job_title(title):
+    """Convenience function for job title categorization"""
+    return JobTitleCategorizer.categorize(title)
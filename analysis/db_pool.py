@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Database Connection Pool
+Shared pymysql connections for the runner, exporter and dashboard generators
+"""
+
+import os
+import time
+import atexit
+import threading
+import pymysql
+
+# Database configuration
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'hrmoihtt_hrtoolusers',
+    'password': 'FsPyjP6hPc6yReV11111111',
+    'database': 'hrmoihtt_hrtoolusers',
+    'cursorclass': pymysql.cursors.DictCursor,
+    'charset': 'utf8mb4',
+    'autocommit': True,
+    'local_infile': True,  # lets ResultWriter bulk load large outputs with LOAD DATA LOCAL INFILE
+    'port': 3306
+}
+
+POOL_SIZE = 4
+
+# Idle connections older than this are pinged before being handed out again
+HEALTH_CHECK_INTERVAL = 30
+
+class ConnectionPool:
+    """Fixed-size pool of pymysql connections
+
+    Connections are opened lazily up to `size`; acquire() blocks once all of
+    them are in use. Idle connections are health-checked with ping() before
+    reuse, and broken ones are replaced.
+    """
+
+    def __init__(self, config=None, size=POOL_SIZE, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.config = dict(config or DB_CONFIG)
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.idle = []  # (connection, released_at)
+        self.opened = 0
+        self.lock = threading.Condition()
+
+    def _open(self):
+        return pymysql.connect(**self.config)
+
+    def _healthy(self, connection, released_at):
+        if time.time() - released_at < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=True)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """Take a connection from the pool, opening one if the pool is not full"""
+        with self.lock:
+            while True:
+                while self.idle:
+                    connection, released_at = self.idle.pop()
+                    if self._healthy(connection, released_at):
+                        return connection
+                    self._discard(connection)
+
+                if self.opened < self.size:
+                    self.opened += 1
+                    break
+
+                if not self.lock.wait(timeout):
+                    raise TimeoutError(f"No database connection available after {timeout}s")
+
+        try:
+            return self._open()
+        except Exception:
+            with self.lock:
+                self.opened -= 1
+                self.lock.notify()
+            raise
+
+    def release(self, connection):
+        """Return a connection to the pool"""
+        try:
+            # Drop anything a failed caller left uncommitted
+            connection.rollback()
+        except Exception:
+            with self.lock:
+                self._discard(connection)
+                self.lock.notify()
+            return
+
+        with self.lock:
+            self.idle.append((connection, time.time()))
+            self.lock.notify()
+
+    def _discard(self, connection):
+        self.opened -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self.lock:
+            while self.idle:
+                connection, released_at = self.idle.pop()
+                self._discard(connection)
+
+_pools = {}
+
+def get_pool(config=None, size=POOL_SIZE):
+    """Process-wide pool for `config` (DB_CONFIG by default)
+
+    Pools are kept per process id, so worker processes forked by the runner
+    open their own connections instead of sharing the parent's sockets.
+    """
+    key = (os.getpid(), tuple(sorted((name, repr(value)) for name, value in (config or DB_CONFIG).items())))
+    if key not in _pools:
+        _pools[key] = ConnectionPool(config, size=size)
+    return _pools[key]
+
+@atexit.register
+def _close_pools():
+    for (pid, config_key), pool in list(_pools.items()):
+        if pid == os.getpid():
+            pool.close_all()
@@ -7,32 +7,16 @@ Analyzes new and trending job titles that are gaining popularity
 import pymysql
 import json
 import re
+import sys
+import os
 from collections import defaultdict, Counter
 from datetime import datetime, timedelta
 from statistics import mean
 
-def extract_salary_value(salary_text):
-    if not salary_text:
-        return None
-    salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
-    if not numbers:
-        return None
-    salary_value = float(numbers[0])
-    if 'lpa' in salary_str:
-        return salary_value * 100000
-    return salary_value * 100000 if salary_value < 1000 else salary_value
-
-def extract_skills_from_text(text):
-    if not text:
-        return []
-    skills = []
-    parts = re.split(r'[,;|]', str(text))
-    for part in parts:
-        skill = part.strip()
-        if skill and len(skill) > 1:
-            skills.append(skill.title())
-    return skills
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.skill_vocabulary import SkillCounter, get_skill_vocabulary
 
 def clean_job_title(title):
     """Clean and normalize job titles"""
@@ -45,118 +29,116 @@ def clean_job_title(title):
 
     return title_clean.strip().title() if len(title_clean) > 3 else None
 
-def get_related_jobs(connection, job_title, limit=5):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, company, location, salary, job_id FROM jobs_latest 
-                   WHERE title LIKE %s LIMIT %s"""
-        search_pattern = f"%{job_title.split()[0].lower()}%"
-        cursor.execute(query, (search_pattern, limit))
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id']} for job in jobs]
-        return json.dumps(related_jobs)
-    except:
-        return "[]"
+class EmergingJobTitlesVisitor(ScanVisitor):
+    """Counts cleaned titles in the recent and older windows from the shared scan"""
 
-def run_analysis(connection):
-    try:
-        cursor = connection.cursor()
-
-        # Get current date and calculate 6 months ago
-        now = datetime.now()
-        six_months_ago = now - timedelta(days=180)
-
-        # Fetch recent jobs
-        recent_query = """SELECT title, tags_and_skills, salary, created_at FROM jobs_complete 
-                         WHERE created_at >= %s AND title IS NOT NULL"""
-        cursor.execute(recent_query, (six_months_ago.strftime('%Y-%m-%d'),))
-        recent_jobs = cursor.fetchall()
-
-        # Fetch older jobs for comparison
-        older_query = """SELECT title, tags_and_skills, salary, created_at FROM jobs_complete 
-                        WHERE created_at < %s AND title IS NOT NULL"""
-        cursor.execute(older_query, (six_months_ago.strftime('%Y-%m-%d'),))
-        older_jobs = cursor.fetchall()
-
-        if not recent_jobs:
-            print("No recent jobs found")
-            return False
+    name = 'emerging_job_titles'
+    columns = ('title', 'created_at', 'salary_value', 'skills')
+
+    def __init__(self, now=None):
+        # Get current date and calculate 6 months ago (day granularity like the old SQL filter)
+        now = now or datetime.now()
+        self.six_months_ago = datetime.combine((now - timedelta(days=180)).date(), datetime.min.time())
 
         # Count job titles in each period
-        recent_titles = Counter()
-        older_titles = Counter()
-        title_salaries = defaultdict(list)
-        title_skills = defaultdict(list)
+        self.recent_titles = Counter()
+        self.older_titles = Counter()
+        self.title_salaries = defaultdict(list)
+        self.title_skills = defaultdict(SkillCounter)
+        self.vocabulary = get_skill_vocabulary()
+        self.recent_jobs = 0
 
-        for job in recent_jobs:
-            clean_title = clean_job_title(job['title'])
+    def accepts(self, job):
+        return job.get('created_at') is not None and job.get('title') is not None
+
+    def visit(self, job):
+        clean_title = clean_job_title(job['title'])
+
+        if job['created_at'] >= self.six_months_ago:
+            self.recent_jobs += 1
             if clean_title:
-                recent_titles[clean_title] += 1
+                self.recent_titles[clean_title] += 1
 
-                salary_value = extract_salary_value(job.get('salary'))
+                salary_value = job['salary_value']
                 if salary_value:
-                    title_salaries[clean_title].append(salary_value)
+                    self.title_salaries[clean_title].append(salary_value)
+
+                self.title_skills[clean_title].update(self.vocabulary.encode(job['skills']))
+        elif clean_title:
+            self.older_titles[clean_title] += 1
+
+    def finish(self, connection):
+        try:
+            if not self.recent_jobs:
+                print("No recent jobs found")
+                return False
+
+            recent_titles = self.recent_titles
+            older_titles = self.older_titles
+            title_salaries = self.title_salaries
+            title_skills = self.title_skills
+
+            writer = self.result_writer(connection, 'analysis_emerging_job_titles',
+                                        ('job_title', 'recent_count', 'growth_rate', 'avg_salary', 'key_skills', 'related_jobs'))
+            results_stored = 0
+
+            # Identify emerging titles
+            emerging_titles = []
+
+            for title, recent_count in recent_titles.items():
+                if recent_count >= 5:  # Only consider titles with meaningful recent activity
+                    older_count = older_titles.get(title, 0)
+
+                    # Calculate growth rate
+                    if older_count == 0:
+                        growth_rate = 100.0 if recent_count > 0 else 0.0
+                    else:
+                        growth_rate = ((recent_count - older_count) / older_count) * 100
+
+                    # Focus on titles with high growth or completely new titles
+                    if growth_rate >= 50 or older_count == 0:
+                        avg_salary = mean(title_salaries[title]) if title_salaries[title] else 0
+                        top_skills = [skill for skill, count in title_skills[title].most_common(5)]
+
+                        emerging_titles.append({
+                            'title': title,
+                            'recent_count': recent_count,
+                            'growth_rate': growth_rate,
+                            'avg_salary': avg_salary,
+                            'key_skills': top_skills
+                        })
+
+            # Sort by growth rate and recent count
+            emerging_titles.sort(key=lambda x: (x['growth_rate'], x['recent_count']), reverse=True)
+
+            # Store results
+            # Resolve related jobs for all stored titles in one pass over jobs_latest
+            related_keys = [self.related_jobs.request(title=title_data['title'].split()[0])
+                            for title_data in emerging_titles[:30]]
+            self.related_jobs.resolve(connection)
+
+            for title_data, related_key in zip(emerging_titles[:30], related_keys):  # Top 30 emerging titles
+                related_jobs = self.related_jobs.get(related_key)
+
+                writer.add((
+                    title_data['title'], title_data['recent_count'],
+                    round(title_data['growth_rate'], 2), round(title_data['avg_salary'], 2),
+                    json.dumps(title_data['key_skills']), related_jobs
+                ))
+                results_stored += 1
+
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} emerging job title records")
+            return True
+
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            return False
 
-                skills = extract_skills_from_text(job.get('tags_and_skills'))
-                title_skills[clean_title].extend(skills)
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return EmergingJobTitlesVisitor()
 
-        for job in older_jobs:
-            clean_title = clean_job_title(job['title'])
-            if clean_title:
-                older_titles[clean_title] += 1
-
-        cursor.execute("DELETE FROM analysis_emerging_job_titles")
-        results_stored = 0
-
-        # Identify emerging titles
-        emerging_titles = []
-
-        for title, recent_count in recent_titles.items():
-            if recent_count >= 5:  # Only consider titles with meaningful recent activity
-                older_count = older_titles.get(title, 0)
-
-                # Calculate growth rate
-                if older_count == 0:
-                    growth_rate = 100.0 if recent_count > 0 else 0.0
-                else:
-                    growth_rate = ((recent_count - older_count) / older_count) * 100
-
-                # Focus on titles with high growth or completely new titles
-                if growth_rate >= 50 or older_count == 0:
-                    avg_salary = mean(title_salaries[title]) if title_salaries[title] else 0
-                    top_skills = [skill for skill, count in Counter(title_skills[title]).most_common(5)]
-
-                    emerging_titles.append({
-                        'title': title,
-                        'recent_count': recent_count,
-                        'growth_rate': growth_rate,
-                        'avg_salary': avg_salary,
-                        'key_skills': top_skills
-                    })
-
-        # Sort by growth rate and recent count
-        emerging_titles.sort(key=lambda x: (x['growth_rate'], x['recent_count']), reverse=True)
-
-        # Store results
-        for title_data in emerging_titles[:30]:  # Top 30 emerging titles
-            related_jobs = get_related_jobs(connection, title_data['title'])
-
-            insert_query = """
-            INSERT INTO analysis_emerging_job_titles 
-            (job_title, recent_count, growth_rate, avg_salary, key_skills, related_jobs)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(insert_query, (
-                title_data['title'], title_data['recent_count'],
-                round(title_data['growth_rate'], 2), round(title_data['avg_salary'], 2),
-                json.dumps(title_data['key_skills']), related_jobs
-            ))
-            results_stored += 1
-
-        print(f"✅ Analysis completed! Stored {results_stored} emerging job title records")
-        return True
-
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        return False
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
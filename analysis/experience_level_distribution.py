@@ -6,9 +6,14 @@ Analyzes job distribution across different experience levels
 
 import pymysql
 import json
-import re
-from collections import defaultdict, Counter
-from statistics import mean
+import sys
+import os
+from collections import defaultdict
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.skill_vocabulary import SkillCounter, get_skill_vocabulary
 
 def categorize_experience(min_exp, max_exp, experience_text):
     """Categorize experience level"""
@@ -39,125 +44,87 @@ def categorize_experience(min_exp, max_exp, experience_text):
                 return 'Senior Level (7-12 years)'
         return 'Unknown'
 
-def extract_salary_value(salary_text):
-    if not salary_text:
-        return None
-    salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
-    if not numbers:
-        return None
-    salary_value = float(numbers[0])
-    if 'lpa' in salary_str:
-        return salary_value * 100000
-    return salary_value * 100000 if salary_value < 1000 else salary_value
-
-def extract_skills_from_text(text):
-    if not text:
-        return []
-    skills = []
-    parts = re.split(r'[,;|]', str(text))
-    for part in parts:
-        skill = part.strip()
-        if skill and len(skill) > 1:
-            skills.append(skill.title())
-    return skills
-
-def get_related_jobs(connection, experience_level, limit=5):
-    try:
-        cursor = connection.cursor()
-        if 'Entry' in experience_level:
-            query = """
-            SELECT title, company, location, salary, job_id
-            FROM jobs_latest 
-            WHERE (minimum_experience = 0 OR minimum_experience IS NULL OR experience LIKE '%fresher%')
-            LIMIT %s
-            """
-            cursor.execute(query, (limit,))
-        else:
-            query = """
-            SELECT title, company, location, salary, job_id
-            FROM jobs_latest 
-            LIMIT %s
-            """
-            cursor.execute(query, (limit,))
-
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id']} for job in jobs]
-        return json.dumps(related_jobs)
-    except Exception as e:
-        print(f"Error getting related jobs: {e}")
-        return "[]"
-
-def run_analysis(connection):
-    try:
-        cursor = connection.cursor()
-        print("🔍 Fetching job data for experience level analysis...")
-
-        query = """
-        SELECT title, minimum_experience, maximum_experience, experience, salary, tags_and_skills
-        FROM jobs_complete 
-        """
-
-        cursor.execute(query)
-        jobs = cursor.fetchall()
-
-        if not jobs:
-            print("No jobs found")
+class ExperienceLevelDistributionVisitor(ScanVisitor):
+    """Buckets jobs by experience level from the shared scan"""
+
+    name = 'experience_level_distribution'
+    columns = ('title', 'experience', 'min_experience', 'max_experience', 'salary_value', 'skills')
+    state_fields = ('experience_data', 'jobs_seen')
+
+    def __init__(self):
+        self.experience_data = defaultdict(lambda: {'job_count': 0, 'salary_sum': 0.0, 'salary_count': 0, 'skill_counts': SkillCounter()})
+        self.vocabulary = get_skill_vocabulary()
+        self.jobs_seen = 0
+
+    def visit(self, job):
+        self.jobs_seen += 1
+        exp_category = categorize_experience(
+            job['min_experience'],
+            job['max_experience'],
+            job.get('experience')
+        )
+
+        self.experience_data[exp_category]['job_count'] += 1
+
+        salary_value = job['salary_value']
+        if salary_value and salary_value > 0:
+            self.experience_data[exp_category]['salary_sum'] += salary_value
+            self.experience_data[exp_category]['salary_count'] += 1
+
+        self.experience_data[exp_category]['skill_counts'].update(self.vocabulary.encode(job['skills']))
+
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                print("No jobs found")
+                return False
+
+            experience_data = self.experience_data
+
+            print(f"📊 Processed {self.jobs_seen} jobs...")
+
+            writer = self.result_writer(connection, 'analysis_experience_distribution',
+                                        ('experience_level', 'job_count', 'percentage', 'avg_salary', 'top_skills', 'related_jobs'))
+
+            total_jobs = sum(data['job_count'] for data in experience_data.values())
+            results_stored = 0
+
+            # Entry level jobs link to fresher openings; other levels to any open jobs
+            related_keys = {exp_level: self.related_jobs.request(entry_level='Entry' in exp_level or None)
+                            for exp_level in experience_data}
+            self.related_jobs.resolve(connection)
+
+            for exp_level, data in experience_data.items():
+                if exp_level != 'Unknown' and data['job_count'] > 0:
+                    percentage = (data['job_count'] / total_jobs) * 100
+                    avg_salary = data['salary_sum'] / data['salary_count'] if data['salary_count'] else 0
+                    top_skills = [skill for skill, count in data['skill_counts'].most_common(5)]
+                    related_jobs = self.related_jobs.get(related_keys[exp_level])
+
+                    writer.add((
+                        exp_level,
+                        data['job_count'],
+                        round(percentage, 2),
+                        round(avg_salary, 2),
+                        json.dumps(top_skills),
+                        related_jobs
+                    ))
+                    results_stored += 1
+
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} experience level records")
+            return True
+
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            import traceback
+            traceback.print_exc()
             return False
 
-        print(f"📊 Processing {len(jobs)} jobs...")
-
-        experience_data = defaultdict(lambda: {'job_count': 0, 'salaries': [], 'all_skills': []})
-
-        for job in jobs:
-            exp_category = categorize_experience(
-                job.get('minimum_experience'),
-                job.get('maximum_experience'),
-                job.get('experience')
-            )
-
-            experience_data[exp_category]['job_count'] += 1
-
-            salary_value = extract_salary_value(job.get('salary'))
-            if salary_value and salary_value > 0:
-                experience_data[exp_category]['salaries'].append(salary_value)
-
-            skills = extract_skills_from_text(job.get('tags_and_skills'))
-            experience_data[exp_category]['all_skills'].extend(skills)
-
-        cursor.execute("DELETE FROM analysis_experience_distribution")
-
-        total_jobs = sum(data['job_count'] for data in experience_data.values())
-        results_stored = 0
-
-        for exp_level, data in experience_data.items():
-            if exp_level != 'Unknown' and data['job_count'] > 0:
-                percentage = (data['job_count'] / total_jobs) * 100
-                avg_salary = mean(data['salaries']) if data['salaries'] else 0
-                top_skills = [skill for skill, count in Counter(data['all_skills']).most_common(5)]
-                related_jobs = get_related_jobs(connection, exp_level)
-
-                insert_query = """
-                INSERT INTO analysis_experience_distribution 
-                (experience_level, job_count, percentage, avg_salary, top_skills, related_jobs)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-
-                cursor.execute(insert_query, (
-                    exp_level,
-                    data['job_count'],
-                    round(percentage, 2),
-                    round(avg_salary, 2),
-                    json.dumps(top_skills),
-                    related_jobs
-                ))
-                results_stored += 1
-
-        print(f"✅ Analysis completed! Stored {results_stored} experience level records")
-        return True
-
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return ExperienceLevelDistributionVisitor()
+
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
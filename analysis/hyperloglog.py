@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Distinct Counting
+HyperLogLog counters with mergeable registers for per-group cardinalities
+"""
+
+import base64
+import hashlib
+import math
+import numpy as np
+
+# Register index bits: 2^12 one-byte registers (4 KB) per counter, ~1.6% standard error
+HLL_PRECISION = 12
+
+# Counters hold exact value hashes until they pass this many, then switch to registers
+DISTINCT_EXACT_LIMIT = 256
+
+def value_hash(value):
+    """Stable 64-bit hash of a value (Python's hash() differs between processes)"""
+    return int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+class DistinctCounter:
+    """Approximate count of distinct values (HyperLogLog)
+
+    Small groups keep the set of 64-bit value hashes, so their counts are
+    exact; past DISTINCT_EXACT_LIMIT values the hashes are folded into
+    2^precision registers and memory stays fixed. Counters merge by union or
+    register-wise max, and to_state()/merge_state() round-trip them through
+    checkpoint JSON.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.hashes = set()
+        self.registers = None  # bytearray once the counter is dense
+
+    def add(self, value):
+        if self.registers is None:
+            self.hashes.add(value_hash(value))
+            if len(self.hashes) > DISTINCT_EXACT_LIMIT:
+                self._densify()
+        else:
+            self._add_hash(value_hash(value))
+
+    def _add_hash(self, value_hash):
+        index = value_hash >> (64 - self.precision)
+        remainder = value_hash & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1 bit in the remaining 64 - precision bits
+        rank = 64 - self.precision - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def _densify(self):
+        self.registers = bytearray(1 << self.precision)
+        for hashed in self.hashes:
+            self._add_hash(hashed)
+        self.hashes = set()
+
+    def merge(self, other):
+        """Fold another counter (same precision) into this one"""
+        if other.registers is None:
+            if self.registers is None:
+                self.hashes |= other.hashes
+                if len(self.hashes) > DISTINCT_EXACT_LIMIT:
+                    self._densify()
+            else:
+                for hashed in other.hashes:
+                    self._add_hash(hashed)
+        else:
+            if self.registers is None:
+                self._densify()
+            self.registers = bytearray(np.maximum(np.frombuffer(self.registers, dtype=np.uint8),
+                                                  np.frombuffer(other.registers, dtype=np.uint8)).tobytes())
+        return self
+
+    def count(self):
+        """Estimated number of distinct values"""
+        if self.registers is None:
+            return len(self.hashes)
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        size = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / np.sum(np.ldexp(1.0, -registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    def to_state(self):
+        """JSON-serializable state"""
+        if self.registers is None:
+            return {'precision': self.precision, 'hashes': sorted(self.hashes)}
+        return {'precision': self.precision, 'registers': base64.b64encode(bytes(self.registers)).decode('ascii')}
+
+    @classmethod
+    def from_state(cls, state):
+        counter = cls(state['precision'])
+        if 'registers' in state:
+            counter.registers = bytearray(base64.b64decode(state['registers']))
+        else:
+            counter.hashes = set(state['hashes'])
+        return counter
+
+    def merge_state(self, state):
+        """Fold a state produced by to_state() into this counter
+
+        Checkpoints written before counters were used hold a plain list of
+        values, which are added one by one.
+        """
+        if isinstance(state, list):
+            for value in state:
+                self.add(value)
+            return self
+        return self.merge(DistinctCounter.from_state(state))
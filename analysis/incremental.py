@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Incremental Analysis Checkpoints
+Persists a per-analysis jobs_complete.id watermark and mergeable aggregate state
+"""
+
+import json
+from collections.abc import Mapping
+
+CHECKPOINT_SCHEMA = """CREATE TABLE IF NOT EXISTS analysis_checkpoints (
+    analysis_name VARCHAR(100) PRIMARY KEY,
+    last_id BIGINT,
+    state LONGTEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+def plain_state(value):
+    """Convert nested defaultdicts, Counters, SkillCounters, sketches and sets into JSON-serializable values"""
+    if hasattr(value, 'to_state'):
+        return value.to_state()
+    if isinstance(value, Mapping):
+        return {key: plain_state(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (list, tuple)):
+        return [plain_state(item) for item in value]
+    return value
+
+def merge_into(target, state):
+    """Fold a plain state into a live structure
+
+    Numbers are added, sets and lists are extended, dicts are merged
+    recursively and sketches merge their own state, so counts and sums from
+    two runs combine exactly.
+    """
+    for key, value in state.items():
+        current = target[key] if key in target or hasattr(target, 'default_factory') else None
+        if hasattr(current, 'merge_state'):
+            current.merge_state(value)
+        elif isinstance(value, dict):
+            merge_into(current, value)
+        elif isinstance(current, set):
+            current.update(value)
+        elif isinstance(current, list):
+            current.extend(value)
+        else:
+            target[key] = (current or 0) + value
+
+def create_checkpoint_table(connection):
+    """Create the analysis_checkpoints table if needed"""
+    cursor = connection.cursor()
+    cursor.execute(CHECKPOINT_SCHEMA)
+
+def load_checkpoint(connection, analysis_name):
+    """Return (last_id, state) for an analysis, or (None, None) if it has no checkpoint"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT last_id, state FROM analysis_checkpoints WHERE analysis_name = %s",
+                   (analysis_name,))
+    row = cursor.fetchone()
+    if not row or row['last_id'] is None or not row['state']:
+        return None, None
+    return row['last_id'], json.loads(row['state'])
+
+def save_checkpoint(connection, analysis_name, last_id, state):
+    """Store the watermark and aggregate state reached by an analysis"""
+    cursor = connection.cursor()
+    cursor.execute("""
+    REPLACE INTO analysis_checkpoints (analysis_name, last_id, state)
+    VALUES (%s, %s, %s)
+    """, (analysis_name, last_id, json.dumps(state)))
+
+def clear_checkpoint(connection, analysis_name):
+    """Forget one checkpoint so that analysis (or store) rebuilds from scratch on its next run"""
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM analysis_checkpoints WHERE analysis_name = %s", (analysis_name,))
+
+def clear_checkpoints(connection):
+    """Forget all checkpoints so the next run rebuilds from scratch"""
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM analysis_checkpoints")
+
+def restore_visitor(connection, visitor):
+    """Load a visitor's checkpoint into it; returns True if one was found"""
+    last_id, state = load_checkpoint(connection, visitor.name)
+    if state is None:
+        return False
+
+    # Checkpoints name their skills and merging interns them; load the stored
+    # vocabulary first, since load() renumbers skills interned before it
+    vocabulary = getattr(visitor, 'vocabulary', None)
+    if vocabulary is not None and not vocabulary.loaded:
+        vocabulary.load(connection)
+
+    try:
+        visitor.merge_state(state)
+    except Exception as e:
+        # State written by an older version of the analysis; start it over from a full scan
+        print(f"⚠️  Ignoring incompatible checkpoint of {visitor.name}: {e}")
+        visitor.__dict__.update(type(visitor)().__dict__)
+        return False
+    visitor.watermark = last_id
+    return True
+
+def checkpoint_visitor(connection, visitor, last_id):
+    """Persist a visitor's state after a successful run"""
+    if last_id is None:
+        last_id = visitor.watermark
+    elif visitor.watermark is not None:
+        last_id = max(last_id, visitor.watermark)
+    if last_id is not None:
+        save_checkpoint(connection, visitor.name, last_id, visitor.get_state())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Job Cube
+Persisted job category x location x experience x sector x month cube of additive measures,
+built from the shared scan and rolled up with SQL instead of rescanning jobs_complete
+"""
+
+import sys
+import os
+from collections import defaultdict
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor
+from analysis.title_classifier import classify_title
+from analysis.incremental import load_checkpoint, save_checkpoint
+from analysis.experience_level_distribution import categorize_experience
+
+CUBE_SCHEMA = """CREATE TABLE IF NOT EXISTS job_cube (
+    job_category VARCHAR(200) NOT NULL,
+    title_family VARCHAR(100) NOT NULL,
+    location VARCHAR(255) NOT NULL,
+    experience_level VARCHAR(100) NOT NULL,
+    sector VARCHAR(20) NOT NULL,
+    month CHAR(7) NOT NULL,
+    job_count INT NOT NULL,
+    total_openings BIGINT NOT NULL,
+    total_applications BIGINT NOT NULL,
+    salary_sum DECIMAL(20,2) NOT NULL,
+    salary_count INT NOT NULL,
+    PRIMARY KEY (job_category, title_family, location, experience_level, sector, month),
+    KEY idx_month (month)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# Dimensions of a cube cell, in primary key order
+CUBE_DIMENSIONS = ('job_category', 'title_family', 'location', 'experience_level', 'sector', 'month')
+
+# Additive measures; averages are rolled up as sum / count
+CUBE_MEASURES = ('job_count', 'total_openings', 'total_applications', 'salary_sum', 'salary_count')
+
+# analysis_checkpoints entry holding the highest jobs_complete.id already in the cube
+CUBE_CHECKPOINT = 'job_cube'
+
+# Rows per executemany() call when appending cells
+CUBE_BATCH_SIZE = 1000
+
+def _count(value, default):
+    """Integer openings/applications, as the analyses read them (default when empty or invalid)"""
+    try:
+        return int(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+class JobCubeBuilder(ScanVisitor):
+    """Folds scanned rows into job_cube cells
+
+    Only rows past the cube's own watermark are counted, so each run appends
+    just the postings added since the last one. This assumes postings are
+    append-only: a row updated or deleted after it was counted stays in the
+    cube as it was. When the checkpoint is missing the cube is rebuilt from
+    scratch, replacing the old cells in the same transaction; full (non
+    --incremental) runs of the analysis runner clear the checkpoint first so
+    they always rebuild. Analyses that roll the cube up list this class in
+    `requires`, so the engine registers it ahead of them.
+    """
+
+    name = 'job_cube'
+    columns = ('title', 'job_category', 'normalized_location', 'experience', 'min_experience',
+               'max_experience', 'is_govt', 'created_at', 'openings', 'apply_count', 'salary_value')
+
+    def __init__(self):
+        self.cells = defaultdict(lambda: [0, 0, 0, 0.0, 0])
+        self.last_id = None
+        self.start_id = None
+        self.rebuild = False
+
+    def prepare(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute(CUBE_SCHEMA)
+            last_id, state = load_checkpoint(connection, CUBE_CHECKPOINT)
+            self.rebuild = state is None
+            if self.rebuild:
+                print("🧊 Rebuilding job_cube from all postings")
+            self.watermark = self.start_id = last_id
+        except Exception as e:
+            print(f"⚠️  Could not prepare job_cube: {e}")
+
+    def accepts(self, job):
+        if self.last_id is None or job['id'] > self.last_id:
+            self.last_id = job['id']
+        return True
+
+    def visit(self, job):
+        created_at = job.get('created_at')
+        key = (
+            job['job_category'] or 'Unknown',
+            classify_title(job.get('title'), 'family_consulting'),
+            (job['normalized_location'] or 'Unknown')[:255],
+            categorize_experience(job['min_experience'], job['max_experience'], job.get('experience')),
+            'Government' if str(job.get('is_govt')) == '1' else 'Private',
+            created_at.strftime('%Y-%m') if created_at else 'Unknown',
+        )
+        cell = self.cells[key]
+        cell[0] += 1
+        cell[1] += _count(job['openings'], 1)
+        cell[2] += _count(job['apply_count'], 0)
+        salary_value = job['salary_value']
+        if salary_value and salary_value > 0:
+            cell[3] += float(salary_value)
+            cell[4] += 1
+
+    def finish(self, connection):
+        try:
+            cursor = connection.cursor()
+            # Another worker may have appended the same rows since prepare(); the
+            # locked checkpoint row tells (a missing row means a first build)
+            cursor.execute("SELECT last_id FROM analysis_checkpoints WHERE analysis_name = %s FOR UPDATE",
+                           (CUBE_CHECKPOINT,))
+            row = cursor.fetchone()
+            if (row['last_id'] if row else None) != self.start_id:
+                print("🧊 job_cube was updated by another run, skipping append")
+                return True
+
+            # Rebuilds replace the old cells only when this transaction commits
+            if self.rebuild:
+                cursor.execute("DELETE FROM job_cube")
+
+            rows = [key + (cell[0], cell[1], cell[2], round(cell[3], 2), cell[4]) for key, cell in self.cells.items()]
+            updates = ', '.join(f"{measure} = {measure} + VALUES({measure})" for measure in CUBE_MEASURES)
+            query = f"""INSERT INTO job_cube ({', '.join(CUBE_DIMENSIONS + CUBE_MEASURES)})
+            VALUES ({', '.join(['%s'] * (len(CUBE_DIMENSIONS) + len(CUBE_MEASURES)))})
+            ON DUPLICATE KEY UPDATE {updates}"""
+            for start in range(0, len(rows), CUBE_BATCH_SIZE):
+                cursor.executemany(query, rows[start:start + CUBE_BATCH_SIZE])
+
+            if self.last_id is not None:
+                save_checkpoint(connection, CUBE_CHECKPOINT, self.last_id, {'cells_added': len(rows)})
+            if self.rebuild:
+                print(f"🧊 Rebuilt job_cube with {len(rows)} cells")
+            else:
+                print(f"🧊 Appended {len(rows)} cells to job_cube")
+            self.cells.clear()
+            return True
+
+        except Exception as e:
+            print(f"❌ job_cube update failed: {e}")
+            return False
+
+def rollup(connection, dimensions=(), filters=None):
+    """Sum the cube's measures grouped by some of its dimensions
+
+    filters maps a dimension to a value, or to a (low, high) tuple for an
+    inclusive range (e.g. {'month': ('2024-01', '2024-06')}). Returns one dict
+    per group with the dimensions, the summed measures and avg_salary,
+    largest job_count first (ties by dimension values).
+    """
+    for dimension in list(dimensions) + list(filters or {}):
+        if dimension not in CUBE_DIMENSIONS:
+            raise ValueError(f"Unknown cube dimension: {dimension}")
+
+    conditions = []
+    params = []
+    for dimension, value in (filters or {}).items():
+        if isinstance(value, tuple):
+            conditions.append(f"{dimension} BETWEEN %s AND %s")
+            params.extend(value)
+        else:
+            conditions.append(f"{dimension} = %s")
+            params.append(value)
+
+    select = list(dimensions) + [f"SUM({measure}) AS {measure}" for measure in CUBE_MEASURES]
+    query = f"SELECT {', '.join(select)} FROM job_cube"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if dimensions:
+        query += f" GROUP BY {', '.join(dimensions)}"
+    query += " ORDER BY " + ", ".join(["job_count DESC"] + list(dimensions))
+
+    cursor = connection.cursor()
+    cursor.execute(query, params or None)
+    groups = []
+    for row in cursor.fetchall():
+        if not row['job_count']:
+            continue
+        group = {dimension: row[dimension] for dimension in dimensions}
+        for measure in CUBE_MEASURES:
+            group[measure] = float(row[measure]) if measure == 'salary_sum' else int(row[measure])
+        group['avg_salary'] = group['salary_sum'] / group['salary_count'] if group['salary_count'] else 0
+        groups.append(group)
+    return groups
+
+class CubeRollupVisitor(ScanVisitor):
+    """Base class for analyses computed from job_cube roll-ups rather than scanned rows"""
+
+    columns = ()
+    requires = (JobCubeBuilder,)
+
+    def accepts(self, job):
+        return False
+
+if __name__ == "__main__":
+    # Roll the cube up by the dimensions given on the command line, e.g.
+    #   python job_cube.py location sector
+    sys.path.append('..')
+    from analysis.db_pool import get_pool
+
+    pool = get_pool()
+    connection = pool.acquire()
+    try:
+        for group in rollup(connection, sys.argv[1:]):
+            labels = ', '.join(str(group[dimension]) for dimension in sys.argv[1:]) or 'All jobs'
+            print(f"  • {labels}: {group['job_count']} jobs, {group['total_openings']} openings, "
+                  f"{group['avg_salary'] / 100000:.1f} LPA avg")
+    finally:
+        pool.release(connection)
@@ -6,21 +6,14 @@ Analyzes job opportunities by contract duration
 
 import pymysql
 import json
-import re
+import sys
+import os
 from collections import defaultdict, Counter
-from statistics import mean
-
-def extract_salary_value(salary_text):
-    if not salary_text:
-        return None
-    salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
-    if not numbers:
-        return None
-    salary_value = float(numbers[0])
-    if 'lpa' in salary_str:
-        return salary_value * 100000
-    return salary_value * 100000 if salary_value < 1000 else salary_value
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.title_classifier import classify_title
 
 def categorize_duration(duration_text, position_type):
     if not duration_text and not position_type:
@@ -44,80 +37,72 @@ def categorize_duration(duration_text, position_type):
     else:
         return 'Permanent'
 
-def normalize_job_title(title):
-    if not title:
-        return "Other"
-    title_lower = title.lower()
-    if 'engineer' in title_lower or 'developer' in title_lower:
-        return 'Engineering'
-    elif 'analyst' in title_lower:
-        return 'Analytics'
-    elif 'manager' in title_lower:
-        return 'Management'
-    else:
-        return 'Other'
-
-def get_related_jobs(connection, duration_category, limit=5):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, company, location, salary, job_id FROM jobs_latest LIMIT %s"""
-        cursor.execute(query, (limit,))
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id']} for job in jobs]
-        return json.dumps(related_jobs)
-    except:
-        return "[]"
+class JobDurationVisitor(ScanVisitor):
+    """Buckets jobs by contract duration from the shared scan"""
 
-def run_analysis(connection):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, duration, position_type, salary FROM jobs_complete"""
-        cursor.execute(query)
-        jobs = cursor.fetchall()
+    name = 'job_duration_analysis'
+    columns = ('title', 'duration', 'position_type', 'salary_value')
+    state_fields = ('duration_data', 'jobs_seen')
 
-        if not jobs:
-            return False
+    def __init__(self):
+        self.duration_data = defaultdict(lambda: {'job_count': 0, 'salary_sum': 0.0, 'salary_count': 0, 'job_types': Counter()})
+        self.jobs_seen = 0
+
+    def visit(self, job):
+        self.jobs_seen += 1
+        duration_category = categorize_duration(job.get('duration'), job.get('position_type'))
+        self.duration_data[duration_category]['job_count'] += 1
 
-        duration_data = defaultdict(lambda: {'job_count': 0, 'salaries': [], 'job_types': []})
+        salary_value = job['salary_value']
+        if salary_value:
+            self.duration_data[duration_category]['salary_sum'] += salary_value
+            self.duration_data[duration_category]['salary_count'] += 1
 
-        for job in jobs:
-            duration_category = categorize_duration(job.get('duration'), job.get('position_type'))
-            duration_data[duration_category]['job_count'] += 1
+        job_type = classify_title(job.get('title'), 'family')
+        self.duration_data[duration_category]['job_types'][job_type] += 1
 
-            salary_value = extract_salary_value(job.get('salary'))
-            if salary_value:
-                duration_data[duration_category]['salaries'].append(salary_value)
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                return False
 
-            job_type = normalize_job_title(job.get('title'))
-            duration_data[duration_category]['job_types'].append(job_type)
+            duration_data = self.duration_data
 
-        cursor.execute("DELETE FROM analysis_job_duration")
+            writer = self.result_writer(connection, 'analysis_job_duration',
+                                        ('duration_category', 'job_count', 'percentage', 'avg_salary', 'popular_job_types', 'related_jobs'))
 
-        total_jobs = sum(data['job_count'] for data in duration_data.values())
-        results_stored = 0
+            total_jobs = sum(data['job_count'] for data in duration_data.values())
+            results_stored = 0
 
-        for duration_category, data in duration_data.items():
-            if data['job_count'] > 0:
-                percentage = (data['job_count'] / total_jobs) * 100
-                avg_salary = mean(data['salaries']) if data['salaries'] else 0
-                popular_job_types = [jt for jt, count in Counter(data['job_types']).most_common(3)]
-                related_jobs = get_related_jobs(connection, duration_category)
+            # Every row links to the same open jobs, so one lookup serves them all
+            related_key = self.related_jobs.request()
+            self.related_jobs.resolve(connection)
 
-                insert_query = """
-                INSERT INTO analysis_job_duration 
-                (duration_category, job_count, percentage, avg_salary, popular_job_types, related_jobs)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
+            for duration_category, data in duration_data.items():
+                if data['job_count'] > 0:
+                    percentage = (data['job_count'] / total_jobs) * 100
+                    avg_salary = data['salary_sum'] / data['salary_count'] if data['salary_count'] else 0
+                    popular_job_types = [jt for jt, count in data['job_types'].most_common(3)]
+                    related_jobs = self.related_jobs.get(related_key)
 
-                cursor.execute(insert_query, (
-                    duration_category, data['job_count'], round(percentage, 2),
-                    round(avg_salary, 2), json.dumps(popular_job_types), related_jobs
-                ))
-                results_stored += 1
+                    writer.add((
+                        duration_category, data['job_count'], round(percentage, 2),
+                        round(avg_salary, 2), json.dumps(popular_job_types), related_jobs
+                    ))
+                    results_stored += 1
 
-        print(f"✅ Analysis completed! Stored {results_stored} duration category records")
-        return True
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} duration category records")
+            return True
 
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        return False
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            return False
+
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return JobDurationVisitor()
+
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
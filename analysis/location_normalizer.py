@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Location Normalizer
+Maps raw job locations to canonical city names with a precomputed lookup and a keyword automaton
+"""
+
+import re
+import csv
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.title_classifier import KeywordAutomaton
+
+# Built-in city names, matched as substrings in this order (first match wins)
+CITY_MAPPINGS = {
+    'bengaluru': 'Bangalore',
+    'bangalore': 'Bangalore',
+    'mumbai': 'Mumbai',
+    'pune': 'Pune',
+    'delhi': 'Delhi',
+    'new delhi': 'Delhi',
+    'gurgaon': 'Gurgaon',
+    'gurugram': 'Gurgaon',
+    'hyderabad': 'Hyderabad',
+    'chennai': 'Chennai',
+    'kolkata': 'Kolkata',
+    'ahmedabad': 'Ahmedabad',
+    'noida': 'Noida',
+    'kochi': 'Kochi',
+    'cochin': 'Kochi',
+    'thiruvananthapuram': 'Thiruvananthapuram',
+    'coimbatore': 'Coimbatore',
+    'indore': 'Indore',
+    'jaipur': 'Jaipur',
+    'lucknow': 'Lucknow',
+    'chandigarh': 'Chandigarh',
+    'bhubaneswar': 'Bhubaneswar',
+    'patna': 'Patna',
+    'surat': 'Surat',
+    'vadodara': 'Vadodara'
+}
+
+# Extra city names and aliases (alias,city per line), matched as whole words
+# after the built-in mappings
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'city_gazetteer.csv')
+
+# Raw location strings remembered by the exact lookup
+LOCATION_CACHE_SIZE = 200000
+
+HYBRID_PATTERN = re.compile(r'hybrid\s*-\s*([^,()]+)', re.IGNORECASE)
+PARENTHESES_PATTERN = re.compile(r'\([^)]*\)')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Read {alias: city} from a gazetteer CSV file with alias,city columns"""
+    gazetteer = {}
+    with open(path, newline='', encoding='utf-8') as gazetteer_file:
+        for row in csv.DictReader(gazetteer_file):
+            alias = (row.get('alias') or '').strip().lower()
+            city = (row.get('city') or '').strip()
+            if alias and city and alias not in gazetteer:
+                gazetteer[alias] = city
+    return gazetteer
+
+def clean_location(location):
+    """Strip hybrid prefixes, extra locations and parenthesized notes from a raw location"""
+    location_str = str(location).strip()
+
+    # Handle hybrid/remote locations
+    if 'hybrid' in location_str.lower():
+        # Extract city from "Hybrid - Bengaluru"
+        match = HYBRID_PATTERN.search(location_str)
+        if match:
+            location_str = match.group(1).strip()
+
+    # Handle multiple locations - take the first one
+    if ',' in location_str:
+        location_str = location_str.split(',')[0].strip()
+
+    # Handle locations with additional info in parentheses
+    return PARENTHESES_PATTERN.sub('', location_str).strip()
+
+class LocationEngine:
+    """Normalizes raw locations to canonical city names
+
+    Raw strings seen before are answered from an exact dict lookup, which
+    warm() fills from the distinct locations of jobs_complete. Unseen strings
+    are cleaned and scanned once by a KeywordAutomaton holding every city
+    name: the built-in CITY_MAPPINGS as substrings, then the gazetteer
+    aliases as whole words. Locations matching no city are title-cased.
+    """
+
+    def __init__(self, mappings=CITY_MAPPINGS, gazetteer=None, cache_size=LOCATION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.lookup = {}
+
+        # Keywords in priority order; gazetteer aliases are padded with spaces
+        # so they only match whole words of the padded location text
+        self.cities = {}
+        self.priority = {}
+        for alias, city in mappings.items():
+            self._add_keyword(alias.lower(), city)
+        for alias, city in (gazetteer or {}).items():
+            self._add_keyword(f" {PUNCTUATION_PATTERN.sub(' ', alias.lower())} ", city)
+        self.automaton = KeywordAutomaton(self.cities)
+        self.decisions = {}
+
+    def _add_keyword(self, keyword, city):
+        if keyword.strip() and keyword not in self.cities:
+            self.cities[keyword] = city
+            self.priority[keyword] = len(self.priority)
+
+    def normalize(self, location):
+        """Canonical city for a raw location ("Unknown" if it is empty)"""
+        if not location:
+            return "Unknown"
+        city = self.lookup.get(location)
+        if city is None:
+            if len(self.lookup) >= self.cache_size:
+                self.lookup.clear()
+            city = self.lookup[location] = self._normalize(location)
+        return city
+
+    def _normalize(self, location):
+        location_str = clean_location(location)
+
+        text = f" {PUNCTUATION_PATTERN.sub(' ', location_str.lower())} "
+        found = self.automaton.scan(text)
+        if found:
+            if found not in self.decisions:
+                self.decisions[found] = self._decide(found)
+            return self.decisions[found]
+
+        # Return title case if not found in mappings
+        return location_str.title() if len(location_str) > 2 else "Unknown"
+
+    def _decide(self, found):
+        """City of the highest-priority keyword in a match mask"""
+        matched = [keyword for keyword, bit in self.automaton.bits.items() if found & bit]
+        return self.cities[min(matched, key=self.priority.get)]
+
+    def warm(self, connection, table='jobs_complete'):
+        """Precompute the lookup for every distinct location of `table`"""
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT DISTINCT location FROM {table} WHERE location IS NOT NULL")
+            locations = [row['location'] for row in cursor.fetchall()]
+            for location in locations[:self.cache_size]:
+                self.normalize(location)
+            print(f"📍 Location lookup warmed with {len(locations)} distinct {table} locations")
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not warm the location lookup: {e}")
+            return False
+
+_engine = None
+
+def get_location_engine():
+    """Shared LocationEngine, with the gazetteer file loaded if present"""
+    global _engine
+    if _engine is None:
+        gazetteer = load_gazetteer() if os.path.exists(GAZETTEER_PATH) else None
+        _engine = LocationEngine(gazetteer=gazetteer)
+    return _engine
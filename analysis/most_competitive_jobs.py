@@ -5,30 +5,19 @@ Analyzes jobs with highest competition ratios (applications per opening)
 """
 
 import pymysql
-import json
+import sys
+import os
 from collections import defaultdict
 
-def normalize_job_title(title):
-    if not title:
-        return "Unknown"
-    title_lower = title.lower()
-    if any(keyword in title_lower for keyword in ['engineer', 'developer']):
-        if 'data' in title_lower:
-            return 'Data Engineer/Developer'
-        elif 'software' in title_lower:
-            return 'Software Engineer/Developer'
-        elif 'ai' in title_lower or 'ml' in title_lower:
-            return 'AI/ML Engineer'
-        else:
-            return 'Engineer/Developer'
-    elif 'analyst' in title_lower:
-        return 'Data Analyst' if 'data' in title_lower else 'Business Analyst'
-    elif 'manager' in title_lower:
-        return 'Management'
-    elif 'scientist' in title_lower:
-        return 'Data Scientist'
-    else:
-        return title.title()
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor, is_positive
+from analysis.title_classifier import classify_title
+from analysis.related_jobs import RELATED_JOB_FIELDS
+from analysis.pushdown import PushdownVisitor, grouped_totals, AGGREGATION_PUSHDOWN
+
+# Related job fields stored for each title (most applied first)
+COMPETITIVE_JOB_FIELDS = RELATED_JOB_FIELDS + ('apply_count', 'openings')
 
 def get_competition_level(ratio):
     if ratio >= 100:
@@ -42,84 +31,107 @@ def get_competition_level(ratio):
     else:
         return 'Low'
 
-def get_related_jobs(connection, job_title, limit=5):
-    try:
-        cursor = connection.cursor()
-        search_pattern = f"%{job_title.split('/')[0].lower()}%"
-        query = """SELECT title, company, location, salary, job_id, apply_count, openings FROM jobs_latest 
-                   WHERE title LIKE %s ORDER BY CAST(apply_count AS UNSIGNED) DESC LIMIT %s"""
-        cursor.execute(query, (search_pattern, limit))
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id'], 'apply_count': job.get('apply_count', 0), 'openings': job.get('openings', 1)} for job in jobs]
-        return json.dumps(related_jobs)
-    except:
-        return "[]"
+class MostCompetitiveJobsVisitor(ScanVisitor):
+    """Aggregates applications per opening for each normalized title from the shared scan"""
+
+    name = 'most_competitive_jobs'
+    columns = ('title', 'apply_count', 'openings')
+    state_fields = ('job_competition_data', 'jobs_seen')
+
+    def __init__(self):
+        self.job_competition_data = defaultdict(lambda: {'total_applications': 0, 'total_openings': 0, 'job_count': 0})
+        self.jobs_seen = 0
+
+    def accepts(self, job):
+        return is_positive(job.get('apply_count')) and is_positive(job.get('openings'))
+
+    def visit(self, job):
+        self.jobs_seen += 1
+        try:
+            apply_count = int(job['apply_count'])
+            openings = int(job['openings'])
+
+            if apply_count > 0 and openings > 0:
+                normalized_title = classify_title(job['title'], 'competitive_title')
+                self.job_competition_data[normalized_title]['total_applications'] += apply_count
+                self.job_competition_data[normalized_title]['total_openings'] += openings
+                self.job_competition_data[normalized_title]['job_count'] += 1
+        except:
+            pass
+
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                return False
+
+            job_competition_data = self.job_competition_data
+
+            writer = self.result_writer(connection, 'analysis_competitive_jobs',
+                                        ('job_title', 'avg_applications_per_opening', 'total_applications', 'total_openings', 'competition_level', 'related_jobs'))
+            results_stored = 0
+
+            competition_analysis = []
+            for job_title, data in job_competition_data.items():
+                if data['job_count'] >= 3:  # Only meaningful data
+                    avg_applications_per_opening = data['total_applications'] / data['total_openings']
+                    competition_level = get_competition_level(avg_applications_per_opening)
+
+                    competition_analysis.append({
+                        'job_title': job_title,
+                        'avg_applications_per_opening': avg_applications_per_opening,
+                        'total_applications': data['total_applications'],
+                        'total_openings': data['total_openings'],
+                        'competition_level': competition_level
+                    })
+
+            # Sort by competition ratio
+            competition_analysis.sort(key=lambda x: x['avg_applications_per_opening'], reverse=True)
+
+            # Resolve related jobs for all job titles in one pass over jobs_latest
+            related_keys = [self.related_jobs.request(title=comp_data['job_title'].split('/')[0],
+                                                      order_by='apply_count', fields=COMPETITIVE_JOB_FIELDS)
+                            for comp_data in competition_analysis]
+            self.related_jobs.resolve(connection)
+
+            for comp_data, related_key in zip(competition_analysis, related_keys):
+                related_jobs = self.related_jobs.get(related_key)
+
+                writer.add((
+                    comp_data['job_title'], round(comp_data['avg_applications_per_opening'], 2),
+                    comp_data['total_applications'], comp_data['total_openings'],
+                    comp_data['competition_level'], related_jobs
+                ))
+                results_stored += 1
+
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} competitive job records")
+            return True
+
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            return False
 
-def run_analysis(connection):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, apply_count, openings FROM jobs_complete 
-                   WHERE apply_count IS NOT NULL AND apply_count > 0 AND openings IS NOT NULL AND openings > 0"""
-        cursor.execute(query)
-        jobs = cursor.fetchall()
-
-        if not jobs:
+class MostCompetitiveJobsPushdown(PushdownVisitor, MostCompetitiveJobsVisitor):
+    """Same analysis with the per-title sums computed by a GROUP BY in the database"""
+
+    def finish(self, connection):
+        try:
+            self.job_competition_data = grouped_totals(
+                connection, self.source_table, 'competitive_title',
+                sums={'total_applications': 'apply_count', 'total_openings': 'openings'},
+                where="apply_count > 0 AND openings > 0")
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
             return False
+        self.jobs_seen = sum(data['job_count'] for data in self.job_competition_data.values())
+        return super().finish(connection)
+
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    if AGGREGATION_PUSHDOWN:
+        return MostCompetitiveJobsPushdown()
+    return MostCompetitiveJobsVisitor()
 
-        job_competition_data = defaultdict(lambda: {'total_applications': 0, 'total_openings': 0, 'job_count': 0})
-
-        for job in jobs:
-            try:
-                apply_count = int(job['apply_count'])
-                openings = int(job['openings'])
-
-                if apply_count > 0 and openings > 0:
-                    normalized_title = normalize_job_title(job['title'])
-                    job_competition_data[normalized_title]['total_applications'] += apply_count
-                    job_competition_data[normalized_title]['total_openings'] += openings
-                    job_competition_data[normalized_title]['job_count'] += 1
-            except:
-                continue
-
-        cursor.execute("DELETE FROM analysis_competitive_jobs")
-        results_stored = 0
-
-        competition_analysis = []
-        for job_title, data in job_competition_data.items():
-            if data['job_count'] >= 3:  # Only meaningful data
-                avg_applications_per_opening = data['total_applications'] / data['total_openings']
-                competition_level = get_competition_level(avg_applications_per_opening)
-
-                competition_analysis.append({
-                    'job_title': job_title,
-                    'avg_applications_per_opening': avg_applications_per_opening,
-                    'total_applications': data['total_applications'],
-                    'total_openings': data['total_openings'],
-                    'competition_level': competition_level
-                })
-
-        # Sort by competition ratio
-        competition_analysis.sort(key=lambda x: x['avg_applications_per_opening'], reverse=True)
-
-        for comp_data in competition_analysis:
-            related_jobs = get_related_jobs(connection, comp_data['job_title'])
-
-            insert_query = """
-            INSERT INTO analysis_competitive_jobs 
-            (job_title, avg_applications_per_opening, total_applications, total_openings, competition_level, related_jobs)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(insert_query, (
-                comp_data['job_title'], round(comp_data['avg_applications_per_opening'], 2),
-                comp_data['total_applications'], comp_data['total_openings'],
-                comp_data['competition_level'], related_jobs
-            ))
-            results_stored += 1
-
-        print(f"✅ Analysis completed! Stored {results_stored} competitive job records")
-        return True
-
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        return False
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
@@ -5,200 +5,186 @@ Analyzes jobs with highest application counts and demand ratios
 """
 
 import pymysql
-import json
+import sys
+import os
 from collections import defaultdict
 
-def normalize_job_title(title):
-    """Normalize job titles for grouping"""
-    if not title:
-        return "Unknown"
-
-    title_lower = title.lower()
-
-    if any(keyword in title_lower for keyword in ['engineer', 'developer', 'programmer']):
-        if 'data' in title_lower:
-            return 'Data Engineer/Developer'
-        elif any(keyword in title_lower for keyword in ['software', 'backend', 'frontend']):
-            return 'Software Engineer/Developer'
-        elif 'ai' in title_lower or 'ml' in title_lower:
-            return 'AI/ML Engineer'
-        elif 'qa' in title_lower or 'test' in title_lower:
-            return 'QA/Test Engineer'
-        else:
-            return 'Engineer/Developer'
-    elif 'analyst' in title_lower:
-        return 'Data Analyst' if 'data' in title_lower else 'Business Analyst'
-    elif any(keyword in title_lower for keyword in ['manager', 'lead']):
-        return 'Management/Leadership'
-    elif 'scientist' in title_lower:
-        return 'Data Scientist'
-    elif any(keyword in title_lower for keyword in ['intern', 'trainee']):
-        return 'Internship/Trainee'
-    else:
-        return title.title()
-
-def get_related_jobs(connection, job_title_pattern, limit=5):
-    """Get related available jobs"""
-    try:
-        cursor = connection.cursor()
-
-        query = """
-        SELECT title, company, location, salary, job_id, apply_count, openings
-        FROM jobs_latest 
-        WHERE title LIKE %s 
-        ORDER BY CAST(apply_count AS UNSIGNED) DESC
-        LIMIT %s
-        """
-
-        search_pattern = f"%{job_title_pattern.split('/')[0].lower()}%"
-        cursor.execute(query, (search_pattern, limit))
-
-        jobs = cursor.fetchall()
-        related_jobs = []
-
-        for job in jobs:
-            job_info = {
-                'title': job['title'],
-                'company': job['company'], 
-                'location': job['location'],
-                'salary': job['salary'],
-                'job_id': job['job_id'],
-                'apply_count': job.get('apply_count', 0),
-                'openings': job.get('openings', 1)
-            }
-            related_jobs.append(job_info)
-
-        return json.dumps(related_jobs)
-    except Exception as e:
-        print(f"Error getting related jobs: {e}")
-        return "[]"
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor, is_positive
+from analysis.title_classifier import classify_title
+from analysis.related_jobs import RELATED_JOB_FIELDS
+from analysis.hyperloglog import DistinctCounter
+from analysis.pushdown import PushdownVisitor, grouped_totals, AGGREGATION_PUSHDOWN
 
-def run_analysis(connection):
-    """Main analysis function"""
-    try:
-        cursor = connection.cursor()
-
-        print("🔍 Fetching job data for demand analysis...")
-
-        # Fetch jobs with application and opening data
-        query = """
-        SELECT title, apply_count, openings, company, location
-        FROM jobs_complete 
-        WHERE apply_count IS NOT NULL 
-        AND apply_count > 0
-        AND openings IS NOT NULL
-        AND openings > 0
-        """
-
-        cursor.execute(query)
-        jobs = cursor.fetchall()
-
-        if not jobs:
-            print("No jobs found with application/opening data")
-            return False
+# Related job fields stored for each title (most applied first)
+DEMAND_JOB_FIELDS = RELATED_JOB_FIELDS + ('apply_count', 'openings')
+
+class MostDemandedJobsVisitor(ScanVisitor):
+    """Aggregates applications and openings per normalized title from the shared scan"""
 
-        print(f"📊 Processing {len(jobs)} jobs with demand data...")
+    name = 'most_demanded_jobs'
+    columns = ('title', 'apply_count', 'openings', 'company', 'location')
+    state_fields = ('job_demand_data', 'jobs_seen')
 
+    def __init__(self):
         # Group by job title and aggregate data
-        job_demand_data = defaultdict(lambda: {
+        self.job_demand_data = defaultdict(lambda: {
             'total_applications': 0,
             'total_openings': 0,
             'job_count': 0,
-            'companies': set(),
-            'locations': set()
+            'companies': DistinctCounter(),
+            'locations': DistinctCounter()
         })
+        self.jobs_seen = 0
+
+    def accepts(self, job):
+        return is_positive(job.get('apply_count')) and is_positive(job.get('openings'))
+
+    def visit(self, job):
+        self.jobs_seen += 1
+        job_demand_data = self.job_demand_data
+        try:
+            apply_count = int(job['apply_count']) if job['apply_count'] else 0
+            openings = int(job['openings']) if job['openings'] else 1
+
+            if apply_count > 0 and openings > 0:
+                normalized_title = classify_title(job['title'], 'demand_title')
+
+                job_demand_data[normalized_title]['total_applications'] += apply_count
+                job_demand_data[normalized_title]['total_openings'] += openings
+                job_demand_data[normalized_title]['job_count'] += 1
+
+                if job['company']:
+                    job_demand_data[normalized_title]['companies'].add(job['company'])
+                if job['location']:
+                    job_demand_data[normalized_title]['locations'].add(job['location'])
+
+        except (ValueError, TypeError):
+            pass
+
+    def group_totals(self):
+        """Totals per normalized title, with distinct company and location counts"""
+        return {job_title: dict(data, companies=data['companies'].count(), locations=data['locations'].count())
+                for job_title, data in self.job_demand_data.items()}
+
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                print("No jobs found with application/opening data")
+                return False
+
+            job_demand_data = self.group_totals()
+
+            print(f"📊 Processed {self.jobs_seen} jobs with demand data...")
+
+            # Calculate demand metrics
+            demand_analysis = []
+
+            for job_title, data in job_demand_data.items():
+                if data['job_count'] >= 3:  # Only consider jobs with meaningful data
+                    demand_ratio = data['total_applications'] / data['total_openings']
+                    avg_competition = data['total_applications'] / data['job_count']
+
+                    demand_analysis.append({
+                        'job_title': job_title,
+                        'total_applications': data['total_applications'],
+                        'total_openings': data['total_openings'],
+                        'demand_ratio': demand_ratio,
+                        'avg_competition': avg_competition,
+                        'job_count': data['job_count'],
+                        'distinct_companies': data['companies'],
+                        'distinct_locations': data['locations']
+                    })
+
+            # Sort by total applications (most demanded)
+            demand_analysis.sort(key=lambda x: x['total_applications'], reverse=True)
+
+            print("💾 Staging new analysis results...")
+
+            writer = self.result_writer(connection, 'analysis_most_demanded_jobs',
+                                        ('job_title', 'total_applications', 'total_openings', 'demand_ratio', 'avg_competition',
+                                         'distinct_companies', 'distinct_locations', 'related_jobs'))
+
+            print("📈 Storing demand analysis results...")
+
+            # Store results
+            results_stored = 0
+
+            # Resolve related jobs for all job titles in one pass over jobs_latest
+            related_keys = [self.related_jobs.request(title=demand_data['job_title'].split('/')[0],
+                                                      order_by='apply_count', fields=DEMAND_JOB_FIELDS)
+                            for demand_data in demand_analysis]
+            self.related_jobs.resolve(connection)
+
+            for demand_data, related_key in zip(demand_analysis, related_keys):
+                related_jobs = self.related_jobs.get(related_key)
+
+                writer.add((
+                    demand_data['job_title'],
+                    demand_data['total_applications'],
+                    demand_data['total_openings'],
+                    round(demand_data['demand_ratio'], 2),
+                    round(demand_data['avg_competition'], 2),
+                    demand_data['distinct_companies'],
+                    demand_data['distinct_locations'],
+                    related_jobs
+                ))
+
+                results_stored += 1
+
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} job demand records")
+
+            # Print summary
+            print("\n🔥 Top 10 Most Demanded Jobs (by applications):")
+            for i, demand_data in enumerate(demand_analysis[:10], 1):
+                print(f"  {i}. {demand_data['job_title']}: {demand_data['total_applications']:,} applications")
+                print(f"      Demand ratio: {demand_data['demand_ratio']:.1f} applications per opening")
+
+            # Print highest competition jobs
+            high_competition = sorted(demand_analysis, key=lambda x: x['demand_ratio'], reverse=True)[:5]
+            print("\n🥵 Most Competitive Jobs (highest demand ratio):")
+            for i, demand_data in enumerate(high_competition, 1):
+                print(f"  {i}. {demand_data['job_title']}: {demand_data['demand_ratio']:.1f} applications per opening")
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
 
-        for job in jobs:
-            try:
-                apply_count = int(job['apply_count']) if job['apply_count'] else 0
-                openings = int(job['openings']) if job['openings'] else 1
-
-                if apply_count > 0 and openings > 0:
-                    normalized_title = normalize_job_title(job['title'])
-
-                    job_demand_data[normalized_title]['total_applications'] += apply_count
-                    job_demand_data[normalized_title]['total_openings'] += openings
-                    job_demand_data[normalized_title]['job_count'] += 1
-
-                    if job['company']:
-                        job_demand_data[normalized_title]['companies'].add(job['company'])
-                    if job['location']:
-                        job_demand_data[normalized_title]['locations'].add(job['location'])
-
-            except (ValueError, TypeError):
-                continue
-
-        # Calculate demand metrics
-        demand_analysis = []
-
-        for job_title, data in job_demand_data.items():
-            if data['job_count'] >= 3:  # Only consider jobs with meaningful data
-                demand_ratio = data['total_applications'] / data['total_openings']
-                avg_competition = data['total_applications'] / data['job_count']
-
-                demand_analysis.append({
-                    'job_title': job_title,
-                    'total_applications': data['total_applications'],
-                    'total_openings': data['total_openings'],
-                    'demand_ratio': demand_ratio,
-                    'avg_competition': avg_competition,
-                    'job_count': data['job_count']
-                })
-
-        # Sort by total applications (most demanded)
-        demand_analysis.sort(key=lambda x: x['total_applications'], reverse=True)
-
-        print("💾 Clearing previous analysis results...")
-
-        # Clear previous results
-        cursor.execute("DELETE FROM analysis_most_demanded_jobs")
-
-        print("📈 Storing demand analysis results...")
-
-        # Store results
-        results_stored = 0
-
-        for demand_data in demand_analysis:
-            related_jobs = get_related_jobs(connection, demand_data['job_title'])
-
-            insert_query = """
-            INSERT INTO analysis_most_demanded_jobs 
-            (job_title, total_applications, total_openings, demand_ratio, avg_competition, related_jobs)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-
-            cursor.execute(insert_query, (
-                demand_data['job_title'],
-                demand_data['total_applications'],
-                demand_data['total_openings'],
-                round(demand_data['demand_ratio'], 2),
-                round(demand_data['avg_competition'], 2),
-                related_jobs
-            ))
-
-            results_stored += 1
-
-        print(f"✅ Analysis completed! Stored {results_stored} job demand records")
-
-        # Print summary
-        print("\n🔥 Top 10 Most Demanded Jobs (by applications):")
-        for i, demand_data in enumerate(demand_analysis[:10], 1):
-            print(f"  {i}. {demand_data['job_title']}: {demand_data['total_applications']:,} applications")
-            print(f"      Demand ratio: {demand_data['demand_ratio']:.1f} applications per opening")
-
-        # Print highest competition jobs
-        high_competition = sorted(demand_analysis, key=lambda x: x['demand_ratio'], reverse=True)[:5]
-        print("\n🥵 Most Competitive Jobs (highest demand ratio):")
-        for i, demand_data in enumerate(high_competition, 1):
-            print(f"  {i}. {demand_data['job_title']}: {demand_data['demand_ratio']:.1f} applications per opening")
-
-        return True
-
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+class MostDemandedJobsPushdown(PushdownVisitor, MostDemandedJobsVisitor):
+    """Same analysis with the per-title sums and distinct counts computed by a GROUP BY in the database"""
+
+    def finish(self, connection):
+        try:
+            self.pushed_totals = grouped_totals(
+                connection, self.source_table, 'demand_title',
+                sums={'total_applications': 'apply_count', 'total_openings': 'openings'},
+                distinct={'companies': 'company', 'locations': 'location'},
+                where="apply_count > 0 AND openings > 0")
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            return False
+        self.jobs_seen = sum(data['job_count'] for data in self.pushed_totals.values())
+        return super().finish(connection)
+
+    def group_totals(self):
+        # Distinct counts come exact from COUNT(DISTINCT)
+        return self.pushed_totals
+
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    if AGGREGATION_PUSHDOWN:
+        return MostDemandedJobsPushdown()
+    return MostDemandedJobsVisitor()
+
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Parsed Jobs Materialization
+Runs the data_utils parsers once per jobs_complete row and stores the results in jobs_parsed
+"""
+
+import json
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.data_utils import (parse_salary, parse_salaries, parse_experience,
+                                 normalize_location, categorize_job_title, extract_skills)
+from analysis.location_normalizer import get_location_engine
+from analysis.streaming import keyset_rows, STREAM_CHUNK_SIZE
+from analysis.schema_migrations import add_column
+
+JOBS_PARSED_SCHEMA = """CREATE TABLE IF NOT EXISTS jobs_parsed (
+    jobs_complete_id INT PRIMARY KEY,
+    salary_value DECIMAL(15,2),
+    min_experience DECIMAL(5,2),
+    max_experience DECIMAL(5,2),
+    normalized_location VARCHAR(500),
+    job_category VARCHAR(200),
+    skills TEXT,
+    description_skills TEXT,
+    has_description TINYINT(1) NOT NULL DEFAULT 0,
+    parsed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# Raw jobs_complete columns each parsed field is derived from
+PARSED_FIELD_SOURCES = {
+    'salary_value': ('salary', 'salary_detail'),
+    'min_experience': ('minimum_experience', 'maximum_experience', 'experience'),
+    'max_experience': ('minimum_experience', 'maximum_experience', 'experience'),
+    'normalized_location': ('location',),
+    'job_category': ('title',),
+    'skills': ('tags_and_skills',),
+    'description_skills': ('tags_and_skills', 'job_description'),
+    'has_description': ('job_description',),
+}
+
+PARSED_COLUMNS = tuple(PARSED_FIELD_SOURCES)
+
+# Parsed columns stored as JSON lists
+JSON_COLUMNS = ('skills', 'description_skills')
+
+def source_columns(fields=PARSED_COLUMNS):
+    """Raw columns needed to compute the given parsed fields"""
+    columns = []
+    for field in fields:
+        for column in PARSED_FIELD_SOURCES[field]:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+def _clean_skills(skills, seen):
+    """Drop overly long skills and case-insensitive duplicates of `seen`"""
+    unique_skills = []
+    for skill in skills:
+        if skill.lower() not in seen and len(skill) <= 100:
+            unique_skills.append(skill)
+            seen.add(skill.lower())
+    return unique_skills
+
+def parse_job(job, fields=PARSED_COLUMNS):
+    """Parse the requested fields from a raw jobs_complete row
+
+    `skills` comes from tags_and_skills; `description_skills` holds only the
+    additional skills found in job_description. `has_description` lets filters
+    test for a description without reading the text.
+    """
+    parsed = {}
+
+    if 'salary_value' in fields:
+        parsed['salary_value'] = parse_salary(job.get('salary'), job.get('salary_detail'))
+
+    if 'min_experience' in fields or 'max_experience' in fields:
+        experience = parse_experience(job.get('minimum_experience'), job.get('maximum_experience'),
+                                      job.get('experience'))
+        parsed['min_experience'] = experience['min_experience']
+        parsed['max_experience'] = experience['max_experience']
+
+    if 'normalized_location' in fields:
+        parsed['normalized_location'] = normalize_location(job.get('location'))
+
+    if 'job_category' in fields:
+        parsed['job_category'] = categorize_job_title(job.get('title'))
+
+    if 'skills' in fields or 'description_skills' in fields:
+        seen = set()
+        parsed['skills'] = _clean_skills(extract_skills(job.get('tags_and_skills')), seen)
+        if 'description_skills' in fields:
+            parsed['description_skills'] = _clean_skills(extract_skills(job.get('job_description')), seen)
+
+    if 'has_description' in fields:
+        parsed['has_description'] = bool(job.get('job_description'))
+
+    return parsed
+
+def decode_parsed_row(job):
+    """Convert jobs_parsed column values read from the database into Python values"""
+    for column in JSON_COLUMNS:
+        if column in job:
+            job[column] = json.loads(job[column]) if job[column] else []
+    for column in ('salary_value', 'min_experience', 'max_experience'):
+        if job.get(column) is not None:
+            job[column] = float(job[column])
+    return job
+
+def create_jobs_parsed_table(connection):
+    """Create the jobs_parsed table if needed"""
+    cursor = connection.cursor()
+    cursor.execute(JOBS_PARSED_SCHEMA)
+
+    # Tables created before has_description existed get it filled in from jobs_complete
+    if add_column(connection, 'jobs_parsed', 'has_description', 'TINYINT(1) NOT NULL DEFAULT 0',
+                  after='description_skills'):
+        cursor.execute("""
+        UPDATE jobs_parsed p JOIN jobs_complete c ON c.id = p.jobs_complete_id
+        SET p.has_description = (c.job_description IS NOT NULL AND c.job_description != '')
+        """)
+
+def _store_parsed(cursor, rows):
+    insert_query = """
+    REPLACE INTO jobs_parsed
+    (jobs_complete_id, salary_value, min_experience, max_experience, normalized_location,
+     job_category, skills, description_skills, has_description)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+
+    # Salaries are parsed column-wise for the whole batch
+    salary_values = parse_salaries([job.get('salary') for job in rows], [job.get('salary_detail') for job in rows])
+    other_fields = tuple(field for field in PARSED_COLUMNS if field != 'salary_value')
+
+    values = []
+    for job, salary_value in zip(rows, salary_values):
+        parsed = parse_job(job, other_fields)
+        values.append((
+            job['id'],
+            round(float(salary_value), 2) if salary_value > 0 else None,
+            parsed['min_experience'],
+            parsed['max_experience'],
+            parsed['normalized_location'][:500],
+            parsed['job_category'],
+            json.dumps(parsed['skills']),
+            json.dumps(parsed['description_skills']),
+            int(parsed['has_description'])
+        ))
+
+    cursor.executemany(insert_query, values)
+
+def refresh_jobs_parsed(connection, full=False, chunk_size=STREAM_CHUNK_SIZE):
+    """Parse jobs_complete rows that are not yet in jobs_parsed
+
+    Rows are read in primary-key order, so a normal refresh only parses rows
+    added since the last one. Use full=True to re-parse everything (e.g. after
+    changing a parser).
+    """
+    try:
+        create_jobs_parsed_table(connection)
+        cursor = connection.cursor()
+
+        if full:
+            print("💾 Clearing jobs_parsed for a full rebuild...")
+            cursor.execute("TRUNCATE TABLE jobs_parsed")
+            start_after = None
+            get_location_engine().warm(connection)
+        else:
+            cursor.execute("SELECT MAX(jobs_complete_id) AS last_id FROM jobs_parsed")
+            start_after = cursor.fetchone()['last_id']
+
+        print(f"🔍 Parsing jobs_complete rows after id {start_after or 0}...")
+
+        parsed_rows = 0
+        batch = []
+        for job in keyset_rows(connection, 'jobs_complete', source_columns(), chunk_size=chunk_size,
+                               start_after=start_after):
+            batch.append(job)
+            if len(batch) >= chunk_size:
+                _store_parsed(cursor, batch)
+                parsed_rows += len(batch)
+                batch = []
+
+        if batch:
+            _store_parsed(cursor, batch)
+            parsed_rows += len(batch)
+
+        print(f"✅ jobs_parsed refreshed ({parsed_rows} rows parsed)")
+        return True
+
+    except Exception as e:
+        print(f"❌ jobs_parsed refresh failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    import pymysql
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from analysis_runner import DB_CONFIG
+
+    connection = pymysql.connect(**DB_CONFIG)
+    success = refresh_jobs_parsed(connection, full='--full' in sys.argv)
+    connection.close()
+
+    if not success:
+        sys.exit(1)
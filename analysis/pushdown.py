@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Aggregation Pushdown
+Compiles title classification rules into SQL so count/sum analyses are grouped by
+the database and only one row per group is read
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor
+from analysis.title_classifier import TITLE_LEVELS, classify_title
+
+# Group count/sum analyses in SQL; False feeds them from the shared scan instead
+AGGREGATION_PUSHDOWN = True
+
+def title_case_sql(level_name, column='title'):
+    """(SQL expression, params) giving a title's category at a TITLE_LEVELS level
+
+    Each rule becomes a CASE branch of LOCATE() tests on the lowered title,
+    compared as bytes so matches are plain substring matches like the
+    Python classifier's. Titles no rule matches give the level's fallback,
+    or the lowered title itself for levels that keep unmatched titles; the
+    result is binary, so grouping on it is case-sensitive.
+    """
+    title_level = TITLE_LEVELS[level_name]
+    lowered = f"CAST(LOWER({column}) AS BINARY)"
+    branches = [f"WHEN {column} IS NULL OR CHAR_LENGTH({column}) = 0 THEN %s"]
+    params = [title_level.empty]
+    for title_rule in title_level.rules:
+        tests = []
+        for group in title_rule.all_of:
+            tests.append('(' + ' OR '.join([f"LOCATE(%s, {lowered}) > 0"] * len(group)) + ')')
+            params.extend(group)
+        for keyword in title_rule.none_of:
+            tests.append(f"LOCATE(%s, {lowered}) = 0")
+            params.append(keyword)
+        branches.append(f"WHEN {' AND '.join(tests)} THEN %s")
+        params.append(title_rule.category)
+
+    if title_level.fallback is None:
+        otherwise = lowered
+    else:
+        otherwise = "%s"
+        params.append(title_level.fallback)
+    return f"CAST(CASE {' '.join(branches)} ELSE {otherwise} END AS BINARY)", params
+
+def grouped_totals(connection, table, level_name, sums=None, distinct=None, where=None, column='title'):
+    """Per-category job counts, sums and distinct counts, grouped by the database
+
+    sums and distinct map an output name to a source column; empty values are
+    not counted as distinct. Returns {category: {'job_count': n, name: total}}
+    keyed like classify_title(title, level_name). Lowered titles kept by the
+    level are title-cased here, and groups that meet on the same title are
+    added together.
+    """
+    sums = sums or {}
+    distinct = distinct or {}
+    case_sql, params = title_case_sql(level_name, column)
+    select = [f"{case_sql} AS group_key", "COUNT(*) AS job_count"]
+    select += [f"SUM({source}) AS {name}" for name, source in sums.items()]
+    select += [f"COUNT(DISTINCT CASE WHEN CHAR_LENGTH({source}) > 0 THEN CAST({source} AS BINARY) END) AS {name}"
+               for name, source in distinct.items()]
+    query = f"SELECT {', '.join(select)} FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    query += " GROUP BY group_key"
+
+    title_level = TITLE_LEVELS[level_name]
+    categories = {title_rule.category for title_rule in title_level.rules}
+    categories.update(value for value in (title_level.empty, title_level.fallback) if value is not None)
+
+    cursor = connection.cursor()
+    cursor.execute(query, params)
+    totals = {}
+    for row in cursor.fetchall():
+        key = row['group_key']
+        if isinstance(key, (bytes, bytearray)):
+            key = key.decode('utf-8')
+        if key not in categories:
+            key = classify_title(key, level_name)
+        group = totals.setdefault(key, dict.fromkeys(['job_count'] + list(sums) + list(distinct), 0))
+        for name in group:
+            group[name] += int(row[name] or 0)
+    return totals
+
+class PushdownVisitor(ScanVisitor):
+    """Base class for analyses whose grouping runs as SQL instead of over scanned rows
+
+    Subclasses load their totals with grouped_totals() in finish(); they read
+    no rows from the shared scan and keep no checkpointed state.
+    """
+
+    columns = ()
+    state_fields = ()
+
+    # Table the totals are grouped from
+    source_table = 'jobs_complete'
+
+    def accepts(self, job):
+        return False
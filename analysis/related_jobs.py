@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Related Jobs Resolver
+Answers the related_jobs lookups of a run from an indexed in-memory snapshot of jobs_latest,
+and stores the answers once as job cards linked to analysis results
+"""
+
+import json
+import re
+import heapq
+import hashlib
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.streaming import stream_rows
+from analysis.token_index import TokenIndex, intersect, union
+
+# Fields returned for each related job unless a lookup asks for others
+RELATED_JOB_FIELDS = ('title', 'company', 'location', 'salary', 'job_id')
+
+SNAPSHOT_COLUMNS = ('title', 'company', 'location', 'salary', 'job_id', 'apply_count', 'openings',
+                    'tags_and_skills', 'job_description', 'is_govt', 'minimum_experience', 'experience')
+
+RELATED_JOBS_LIMIT = 5
+
+# Snapshot text fields covered by the token index
+INDEXED_FIELDS = ('title', 'company', 'location', 'skills', 'description')
+
+# Job fields kept once per job in analysis_job_cards (every field a lookup can ask for)
+CARD_FIELDS = ('job_id', 'title', 'company', 'location', 'salary', 'apply_count', 'openings')
+
+JOB_CARDS_SCHEMA = """CREATE TABLE IF NOT EXISTS analysis_job_cards (
+    job_id VARCHAR(100) PRIMARY KEY,
+    title VARCHAR(500),
+    company VARCHAR(500),
+    location VARCHAR(500),
+    salary VARCHAR(255),
+    apply_count INT,
+    openings INT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# Ranked job IDs of each related jobs list, per analysis table; result rows hold the
+# list's related_key, which is derived from the job IDs, so equal lists share one key
+RELATED_LINKS_SCHEMA = """CREATE TABLE IF NOT EXISTS analysis_related_jobs (
+    analysis_table VARCHAR(100) NOT NULL,
+    related_key CHAR(16) NOT NULL,
+    job_rank TINYINT NOT NULL,
+    job_id VARCHAR(100) NOT NULL,
+    PRIMARY KEY (analysis_table, related_key, job_rank),
+    KEY idx_job_id (job_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# Rows per executemany() call, and keys per IN (...) when hydrating
+LINK_BATCH_SIZE = 1000
+
+def _lower(value):
+    return str(value).lower() if value is not None else ''
+
+def _salary_sort_value(salary):
+    """Python equivalent of ORDER BY CAST(REGEXP_REPLACE(COALESCE(salary, '0'), '[^0-9.]', '') AS DECIMAL)"""
+    if salary is None:
+        return 0.0
+    match = re.match(r'\d*\.?\d*', re.sub(r'[^0-9.]', '', str(salary)))
+    try:
+        return float(match.group(0))
+    except ValueError:
+        return 0.0
+
+def _count_sort_value(value):
+    """Python equivalent of ORDER BY CAST(value AS UNSIGNED)"""
+    try:
+        return max(int(float(value)), 0)
+    except (ValueError, TypeError):
+        return 0
+
+def _is_zero(value):
+    """Python equivalent of `value = 0 OR value IS NULL` for a VARCHAR column"""
+    if value is None:
+        return True
+    try:
+        return float(value) == 0
+    except (ValueError, TypeError):
+        return not str(value).strip()
+
+def _card_count(value):
+    """apply_count/openings as stored in a job card (None when empty or invalid)"""
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return None
+
+def related_key(job_ids):
+    """Key of a ranked list of job IDs (None for an empty list)"""
+    if not job_ids:
+        return None
+    return hashlib.blake2b('\x1f'.join(job_ids).encode('utf-8'), digest_size=8).hexdigest()
+
+class RelatedJobList(list):
+    """Related jobs of one lookup (dicts of the requested fields) with their job cards
+
+    It is what RelatedJobsResolver.get() returns and what analyses put in their
+    related_jobs column; ResultWriter stores its key and cards instead of JSON.
+    Jobs without a job_id are listed but cannot be linked.
+    """
+
+    def __init__(self, jobs=(), cards=()):
+        super().__init__(jobs)
+        self.cards = [card for card in cards if card.get('job_id') is not None]
+        self.key = related_key([str(card['job_id']) for card in self.cards])
+
+class _SnapshotJob:
+    """A jobs_latest row with the lower-cased text the lookups match against"""
+
+    __slots__ = ('row', 'title', 'company', 'location', 'skills', 'description',
+                 'salary_order', 'apply_count_order')
+
+    def __init__(self, row):
+        self.row = row
+        self.title = _lower(row.get('title'))
+        self.company = _lower(row.get('company'))
+        self.location = _lower(row.get('location'))
+        self.skills = _lower(row.get('tags_and_skills'))
+        self.description = _lower(row.get('job_description'))
+        self.salary_order = _salary_sort_value(row.get('salary'))
+        self.apply_count_order = _count_sort_value(row.get('apply_count'))
+
+class RelatedJobsResolver:
+    """Collects related-jobs lookups and answers them from an indexed jobs_latest snapshot
+
+    Analyses call request() with the criteria of their old LIKE queries and get
+    back a key; resolve() answers every pending key and get() returns the JSON
+    stored in related_jobs. Identical lookups share one key and are only
+    answered once per snapshot.
+
+    The snapshot is indexed by token (see token_index.TokenIndex), so text
+    criteria only verify the rows in the intersection of their tokens'
+    postings instead of scanning the whole table.
+
+    Supported criteria (text matches are case-insensitive substring matches,
+    like MySQL's LIKE '%x%'):
+        title, location      -- substring of the column
+        skills               -- tuple of substrings that must all be in tags_and_skills
+        skill_text           -- substring of tags_and_skills or job_description
+        company              -- exact company name
+        is_govt              -- True for is_govt = '1', False for '0' or NULL
+        entry_level          -- minimum_experience is 0/NULL or experience mentions 'fresher'
+        order_by             -- 'salary' or 'apply_count' (descending); default is table order
+        fields               -- job fields to return (default RELATED_JOB_FIELDS)
+    """
+
+    def __init__(self, source_table='jobs_latest', limit=RELATED_JOBS_LIMIT):
+        self.source_table = source_table
+        self.limit = limit
+        self.snapshot = None
+        self.index = None
+        self.signature = None
+        self.pending = set()
+        self.resolved = {}
+
+    def request(self, **criteria):
+        """Register a lookup and return the key to fetch its result with"""
+        key = []
+        for name, value in sorted(criteria.items()):
+            if value is None:
+                continue
+            if name in ('title', 'location', 'skill_text', 'company'):
+                value = value.lower()
+            elif name == 'skills':
+                value = tuple(skill.lower() for skill in value)
+            elif name == 'fields':
+                value = tuple(value)
+            key.append((name, value))
+        key = tuple(key)
+
+        if key not in self.resolved:
+            self.pending.add(key)
+        return key
+
+    def table_signature(self, connection):
+        """Cheap fingerprint of jobs_latest used to detect that it has changed"""
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) AS row_count, MAX(job_id) AS max_job_id FROM {self.source_table}")
+        row = cursor.fetchone()
+        return (row['row_count'], row['max_job_id']) if row else None
+
+    def load_snapshot(self, connection):
+        """Read jobs_latest into memory and index its text fields"""
+        self.signature = self.table_signature(connection)
+        query = f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM {self.source_table}"
+        self.snapshot = [_SnapshotJob(row) for row in stream_rows(connection, query)]
+        self.index = TokenIndex(INDEXED_FIELDS).build(
+            {field: getattr(job, field) for field in INDEXED_FIELDS} for job in self.snapshot)
+        self.resolved = {}
+        print(f"📋 Loaded and indexed {len(self.snapshot)} {self.source_table} rows for related jobs")
+
+    def refresh(self, connection):
+        """Reload the snapshot if jobs_latest changed since it was loaded
+
+        Returns True when the snapshot was reloaded; cached answers are dropped
+        so later lookups see the new rows.
+        """
+        if self.snapshot is not None and self.table_signature(connection) == self.signature:
+            return False
+        self.load_snapshot(connection)
+        return True
+
+    def _candidates(self, criteria):
+        """Sorted snapshot positions that can match the text criteria, or None for all rows"""
+        postings = []
+        for name, field in (('title', 'title'), ('location', 'location'), ('company', 'company')):
+            if name in criteria:
+                postings.append(self.index.candidates(field, criteria[name]))
+        for skill in criteria.get('skills', ()):
+            postings.append(self.index.candidates('skills', skill))
+        if 'skill_text' in criteria:
+            in_skills = self.index.candidates('skills', criteria['skill_text'])
+            in_description = self.index.candidates('description', criteria['skill_text'])
+            postings.append(None if in_skills is None or in_description is None
+                            else union((in_skills, in_description)))
+
+        result = None
+        for posting in postings:
+            if posting is None:
+                continue
+            result = posting if result is None else intersect(result, posting)
+        return result
+
+    def _matches(self, job, criteria):
+        if 'title' in criteria and criteria['title'] not in job.title:
+            return False
+        if 'location' in criteria and criteria['location'] not in job.location:
+            return False
+        if 'company' in criteria and criteria['company'] != job.company:
+            return False
+        if 'skills' in criteria and not all(skill in job.skills for skill in criteria['skills']):
+            return False
+        if 'skill_text' in criteria and criteria['skill_text'] not in job.skills \
+                and criteria['skill_text'] not in job.description:
+            return False
+        if 'is_govt' in criteria:
+            is_govt = job.row.get('is_govt')
+            if criteria['is_govt'] and str(is_govt) != '1':
+                return False
+            if not criteria['is_govt'] and is_govt is not None and str(is_govt) != '0':
+                return False
+        if criteria.get('entry_level'):
+            if not _is_zero(job.row.get('minimum_experience')) and \
+                    'fresher' not in _lower(job.row.get('experience')):
+                return False
+        return True
+
+    def resolve(self, connection):
+        """Answer all pending lookups from the indexed snapshot"""
+        if not self.pending:
+            return
+        if self.snapshot is None:
+            try:
+                self.load_snapshot(connection)
+            except Exception as e:
+                # Leave the lookups unresolved so get() returns "[]", as the old per-row queries did
+                print(f"Error getting related jobs: {e}")
+                self.pending.clear()
+                return
+
+        for key in self.pending:
+            self.resolved[key] = self._answer(dict(key))
+        self.pending.clear()
+
+    def _answer(self, criteria):
+        """JSON list of the jobs matching one lookup"""
+        candidates = self._candidates(criteria)
+        positions = range(len(self.snapshot)) if candidates is None else candidates
+        order_by = criteria.get('order_by')
+
+        # Unordered lookups stop at the first `limit` matches; ordered ones keep a top-k heap
+        found = []
+        for position in positions:
+            job = self.snapshot[position]
+            if not self._matches(job, criteria):
+                continue
+            if order_by is None:
+                found.append(job)
+                if len(found) >= self.limit:
+                    break
+            else:
+                value = job.salary_order if order_by == 'salary' else job.apply_count_order
+                entry = (value, -position, job)
+                if len(found) < self.limit:
+                    heapq.heappush(found, entry)
+                elif entry[:2] > found[0][:2]:
+                    heapq.heapreplace(found, entry)
+
+        if order_by is not None:
+            found = [job for value, position, job in sorted(found, key=lambda entry: entry[:2], reverse=True)]
+        fields = criteria.get('fields', RELATED_JOB_FIELDS)
+        return RelatedJobList([{field: job.row.get(field) for field in fields} for job in found],
+                              [{field: job.row.get(field) for field in CARD_FIELDS} for job in found])
+
+    def get(self, key):
+        """RelatedJobList for a resolved key (empty if it was not resolved)"""
+        return self.resolved.get(key, RelatedJobList())
+
+def store_related(connection, table, related_lists):
+    """Upsert the job cards and link rows of an analysis table's related jobs lists
+
+    related_lists maps related_key to RelatedJobList. Links are keyed by their
+    job IDs, so lists already stored are left as they are.
+    """
+    cards = {}
+    links = []
+    for key, jobs in related_lists.items():
+        for rank, card in enumerate(jobs.cards):
+            cards[str(card['job_id'])] = card
+            links.append((table, key, rank, str(card['job_id'])))
+
+    cursor = connection.cursor()
+    card_rows = [(job_id, card.get('title'), card.get('company'), card.get('location'), card.get('salary'),
+                  _card_count(card.get('apply_count')), _card_count(card.get('openings')))
+                 for job_id, card in cards.items()]
+    updates = ', '.join(f"{field} = VALUES({field})" for field in CARD_FIELDS[1:])
+    for start in range(0, len(card_rows), LINK_BATCH_SIZE):
+        cursor.executemany(f"""
+        INSERT INTO analysis_job_cards ({', '.join(CARD_FIELDS)}) VALUES ({', '.join(['%s'] * len(CARD_FIELDS))})
+        ON DUPLICATE KEY UPDATE {updates}
+        """, card_rows[start:start + LINK_BATCH_SIZE])
+    for start in range(0, len(links), LINK_BATCH_SIZE):
+        cursor.executemany("""
+        INSERT IGNORE INTO analysis_related_jobs (analysis_table, related_key, job_rank, job_id)
+        VALUES (%s, %s, %s, %s)
+        """, links[start:start + LINK_BATCH_SIZE])
+
+def prune_related(connection, table, *result_tables):
+    """Drop an analysis table's links whose key no result table still references"""
+    query = "DELETE FROM analysis_related_jobs WHERE analysis_table = %s"
+    for result_table in result_tables:
+        query += f" AND related_key NOT IN (SELECT related_key FROM {result_table} WHERE related_key IS NOT NULL)"
+    connection.cursor().execute(query, (table,))
+
+def prune_job_cards(connection):
+    """Drop job cards no link references any more"""
+    cursor = connection.cursor()
+    cursor.execute("""
+    DELETE c FROM analysis_job_cards c LEFT JOIN analysis_related_jobs l ON l.job_id = c.job_id
+    WHERE l.job_id IS NULL
+    """)
+    return cursor.rowcount
+
+def hydrate_related_jobs(connection, table, rows):
+    """Replace each result row's related_key with its related_jobs list of job cards
+
+    Rows of tables written before the link table carry JSON in related_jobs,
+    which is parsed instead. Every row ends up with a (possibly empty) list.
+    """
+    keys = sorted({row['related_key'] for row in rows if row.get('related_key')})
+    lists = {}
+    cursor = connection.cursor()
+    for start in range(0, len(keys), LINK_BATCH_SIZE):
+        batch = keys[start:start + LINK_BATCH_SIZE]
+        cursor.execute(f"""
+        SELECT l.related_key, {', '.join(f'c.{field}' for field in CARD_FIELDS)}
+        FROM analysis_related_jobs l JOIN analysis_job_cards c ON c.job_id = l.job_id
+        WHERE l.analysis_table = %s AND l.related_key IN ({', '.join(['%s'] * len(batch))})
+        ORDER BY l.related_key, l.job_rank
+        """, [table] + batch)
+        for card in cursor.fetchall():
+            lists.setdefault(card.pop('related_key'), []).append(card)
+
+    for row in rows:
+        key = row.pop('related_key', None)
+        if key:
+            row['related_jobs'] = lists.get(key, [])
+        elif isinstance(row.get('related_jobs'), str):
+            try:
+                row['related_jobs'] = json.loads(row['related_jobs']) or []
+            except ValueError:
+                row['related_jobs'] = []
+        else:
+            row['related_jobs'] = []
+    return rows
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Result Writer
+Buffers analysis result rows and writes them to analysis_* tables in bulk
+"""
+
+import os
+import sys
+import tempfile
+from pymysql.constants import CLIENT
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.related_jobs import store_related, prune_related
+
+# Rows per executemany() call; pymysql folds each call into multi-row INSERTs
+INSERT_BATCH_SIZE = 1000
+
+# Outputs at least this large are written with LOAD DATA LOCAL INFILE when the
+# connection allows it (local_infile=True), falling back to executemany()
+LOAD_DATA_MIN_ROWS = 5000
+
+# Publish modes: 'delete' empties the live table and refills it; 'shadow' fills
+# <table>__new and swaps it in with one RENAME TABLE, keeping <table>__prev
+PUBLISH_MODES = ('delete', 'shadow')
+
+def local_infile_enabled(connection):
+    """True if the connection was opened with local_infile=True"""
+    return bool(getattr(connection, 'client_flag', 0) & CLIENT.LOCAL_FILES)
+
+def _tsv_value(value):
+    """Encode a value for LOAD DATA's default escaping"""
+    if value is None:
+        return '\\N'
+    text = str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def shadow_table(table):
+    return f"{table}__new"
+
+def previous_table(table):
+    return f"{table}__prev"
+
+def publish_shadow(connection, table):
+    """Swap <table>__new in as <table>, keeping the old version as <table>__prev
+
+    RENAME TABLE swaps both names atomically, so readers never see an empty or
+    half-filled table.
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {previous_table(table)}")
+    cursor.execute(f"RENAME TABLE {table} TO {previous_table(table)}, {shadow_table(table)} TO {table}")
+
+def restore_previous(connection, table):
+    """Swap <table>__prev back in; running it again undoes the rollback"""
+    cursor = connection.cursor()
+    cursor.execute("SHOW TABLES LIKE %s", (previous_table(table),))
+    if not cursor.fetchone():
+        print(f"❌ No previous version of {table} to restore")
+        return False
+
+    cursor.execute(f"DROP TABLE IF EXISTS {shadow_table(table)}")
+    cursor.execute(f"RENAME TABLE {table} TO {shadow_table(table)}, {previous_table(table)} TO {table}, "
+                   f"{shadow_table(table)} TO {previous_table(table)}")
+    print(f"✅ Restored previous version of {table}")
+    return True
+
+class ResultWriter:
+    """Collects rows for one analysis table and writes them in bulk on close()
+
+    In 'delete' mode prepare() empties the table and rows are written into it
+    inside the analysis transaction. In 'shadow' mode rows go to a fresh
+    <table>__new that close() swaps in with publish_shadow().
+
+    A related_jobs column is stored as related_key: its RelatedJobList values
+    are written once to analysis_job_cards and analysis_related_jobs on
+    close(), and links no longer referenced by the table are dropped.
+    """
+
+    def __init__(self, connection, table, columns, publish='delete', batch_size=INSERT_BATCH_SIZE,
+                 load_data_min_rows=LOAD_DATA_MIN_ROWS):
+        if publish not in PUBLISH_MODES:
+            raise ValueError(f"Unknown publish mode: {publish}")
+        self.connection = connection
+        self.table = table
+        self.related_index = columns.index('related_jobs') if 'related_jobs' in columns else None
+        self.columns = tuple('related_key' if column == 'related_jobs' else column for column in columns)
+        self.related_lists = {}
+        self.publish = publish
+        self.batch_size = batch_size
+        self.load_data_min_rows = load_data_min_rows
+        self.rows = []
+        self.rows_written = 0
+
+    @property
+    def target_table(self):
+        """Table the rows are written to"""
+        return shadow_table(self.table) if self.publish == 'shadow' else self.table
+
+    def prepare(self):
+        """Clear the live table, or create an empty shadow copy of it"""
+        cursor = self.connection.cursor()
+        if self.publish == 'shadow':
+            cursor.execute(f"DROP TABLE IF EXISTS {self.target_table}")
+            cursor.execute(f"CREATE TABLE {self.target_table} LIKE {self.table}")
+        else:
+            cursor.execute(f"DELETE FROM {self.table}")
+        return self
+
+    def add(self, row):
+        """Buffer one row (a tuple in column order)"""
+        if self.related_index is not None:
+            related_jobs = row[self.related_index]
+            key = getattr(related_jobs, 'key', None)
+            if key is not None:
+                self.related_lists[key] = related_jobs
+            row = row[:self.related_index] + (key,) + row[self.related_index + 1:]
+        self.rows.append(row)
+
+    def insert_query(self):
+        placeholders = ', '.join(['%s'] * len(self.columns))
+        return f"INSERT INTO {self.target_table} ({', '.join(self.columns)}) VALUES ({placeholders})"
+
+    def _executemany(self, rows):
+        cursor = self.connection.cursor()
+        query = self.insert_query()
+        for start in range(0, len(rows), self.batch_size):
+            cursor.executemany(query, rows[start:start + self.batch_size])
+
+    def _load_data(self, rows):
+        """Write rows to a temporary TSV file and bulk load it"""
+        handle, path = tempfile.mkstemp(prefix=f"{self.target_table}_", suffix='.tsv')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8', newline='') as tsv_file:
+                for row in rows:
+                    tsv_file.write('\t'.join(_tsv_value(value) for value in row) + '\n')
+
+            cursor = self.connection.cursor()
+            cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {self.target_table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(self.columns)})
+            """, (path,))
+        finally:
+            os.remove(path)
+
+    def flush(self):
+        """Write all buffered rows"""
+        rows, self.rows = self.rows, []
+        if not rows:
+            return
+
+        if len(rows) >= self.load_data_min_rows and local_infile_enabled(self.connection):
+            try:
+                self._load_data(rows)
+                self.rows_written += len(rows)
+                return
+            except Exception as e:
+                print(f"⚠️  LOAD DATA into {self.target_table} failed ({e}), using batched INSERTs")
+
+        self._executemany(rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        """Flush remaining rows, publish a shadow table and return the number of rows written"""
+        self.flush()
+        if self.related_index is not None:
+            store_related(self.connection, self.table, self.related_lists)
+        if self.publish == 'shadow':
+            # Commit the rows first; RENAME TABLE would implicitly commit them anyway
+            self.connection.commit()
+            publish_shadow(self.connection, self.table)
+            if self.related_index is not None:
+                # Keep the links of <table>__prev so a rollback still finds its related jobs
+                prune_related(self.connection, self.table, self.table, previous_table(self.table))
+                self.connection.commit()
+        elif self.related_index is not None:
+            prune_related(self.connection, self.table, self.table)
+        return self.rows_written
@@ -5,22 +5,14 @@ Analyzes salary progression with experience levels
 """
 
 import pymysql
-import json
-import re
+import sys
+import os
 from collections import defaultdict
-from statistics import mean, median
-
-def extract_salary_value(salary_text):
-    if not salary_text:
-        return None
-    salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
-    if not numbers:
-        return None
-    salary_value = float(numbers[0])
-    if 'lpa' in salary_str:
-        return salary_value * 100000
-    return salary_value * 100000 if salary_value < 1000 else salary_value
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.data_utils import SalarySketch
 
 def categorize_experience_range(min_exp, max_exp):
     try:
@@ -43,72 +35,82 @@ def categorize_experience_range(min_exp, max_exp):
     except:
         return 'Unknown'
 
-def get_related_jobs(connection, exp_range, limit=5):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, company, location, salary, job_id FROM jobs_latest LIMIT %s"""
-        cursor.execute(query, (limit,))
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id']} for job in jobs]
-        return json.dumps(related_jobs)
-    except:
-        return "[]"
+class SalaryByExperienceVisitor(ScanVisitor):
+    """Sketches salaries per experience range from the shared scan"""
 
-def run_analysis(connection):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT minimum_experience, maximum_experience, salary FROM jobs_complete WHERE salary IS NOT NULL AND salary != ''"""
-        cursor.execute(query)
-        jobs = cursor.fetchall()
+    name = 'salary_by_experience_trends'
+    columns = ('salary', 'min_experience', 'max_experience', 'salary_value')
+    state_fields = ('exp_salary_data', 'jobs_seen')
 
-        if not jobs:
-            return False
+    def __init__(self):
+        self.exp_salary_data = defaultdict(SalarySketch)
+        self.jobs_seen = 0
 
-        exp_salary_data = defaultdict(list)
+    def accepts(self, job):
+        return bool(job.get('salary'))
 
-        for job in jobs:
-            exp_range = categorize_experience_range(job.get('minimum_experience'), job.get('maximum_experience'))
-            if exp_range != 'Unknown':
-                salary_value = extract_salary_value(job['salary'])
-                if salary_value and salary_value > 0:
-                    exp_salary_data[exp_range].append(salary_value)
+    def visit(self, job):
+        self.jobs_seen += 1
+        exp_range = categorize_experience_range(job['min_experience'], job['max_experience'])
+        if exp_range != 'Unknown':
+            salary_value = job['salary_value']
+            if salary_value and salary_value > 0:
+                self.exp_salary_data[exp_range].add(salary_value)
 
-        cursor.execute("DELETE FROM analysis_salary_experience_trends")
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                return False
 
-        # Calculate growth rates
-        sorted_ranges = ['0-1 years', '2-3 years', '4-5 years', '6-8 years', '9-12 years', '12+ years']
-        prev_avg = None
-        results_stored = 0
+            exp_salary_data = self.exp_salary_data
 
-        for exp_range in sorted_ranges:
-            if exp_range in exp_salary_data and len(exp_salary_data[exp_range]) >= 3:
-                salaries = exp_salary_data[exp_range]
-                avg_salary = mean(salaries)
-                median_salary = median(salaries)
+            writer = self.result_writer(connection, 'analysis_salary_experience_trends',
+                                        ('experience_range', 'avg_salary', 'median_salary', 'salary_growth_rate', 'job_count',
+                                         'p10_salary', 'p25_salary', 'p75_salary', 'p90_salary', 'related_jobs'))
 
-                growth_rate = 0
-                if prev_avg:
-                    growth_rate = ((avg_salary - prev_avg) / prev_avg) * 100
+            # Calculate growth rates
+            sorted_ranges = ['0-1 years', '2-3 years', '4-5 years', '6-8 years', '9-12 years', '12+ years']
+            prev_avg = None
+            results_stored = 0
 
-                related_jobs = get_related_jobs(connection, exp_range)
+            # Every row links to the same open jobs, so one lookup serves them all
+            related_key = self.related_jobs.request()
+            self.related_jobs.resolve(connection)
 
-                insert_query = """
-                INSERT INTO analysis_salary_experience_trends 
-                (experience_range, avg_salary, median_salary, salary_growth_rate, job_count, related_jobs)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
+            for exp_range in sorted_ranges:
+                if exp_range in exp_salary_data and len(exp_salary_data[exp_range]) >= 3:
+                    sketch = exp_salary_data[exp_range]
+                    avg_salary = sketch.mean()
+                    percentiles = sketch.percentiles()
 
-                cursor.execute(insert_query, (
-                    exp_range, round(avg_salary, 2), round(median_salary, 2),
-                    round(growth_rate, 2), len(salaries), related_jobs
-                ))
+                    growth_rate = 0
+                    if prev_avg:
+                        growth_rate = ((avg_salary - prev_avg) / prev_avg) * 100
 
-                prev_avg = avg_salary
-                results_stored += 1
+                    related_jobs = self.related_jobs.get(related_key)
 
-        print(f"✅ Analysis completed! Stored {results_stored} experience-salary records")
-        return True
+                    writer.add((
+                        exp_range, round(avg_salary, 2), round(percentiles['median'], 2),
+                        round(growth_rate, 2), len(sketch),
+                        round(percentiles['p10'], 2), round(percentiles['p25'], 2),
+                        round(percentiles['p75'], 2), round(percentiles['p90'], 2), related_jobs
+                    ))
 
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        return False
+                    prev_avg = avg_salary
+                    results_stored += 1
+
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} experience-salary records")
+            return True
+
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            return False
+
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return SalaryByExperienceVisitor()
+
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Shared Scan Engine
+Reads jobs_complete once and streams every row to all registered analyses
+"""
+
+import sys
+import os
+import traceback
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.streaming import stream_rows, keyset_rows, prefetch, STREAM_CHUNK_SIZE, PREFETCH_CHUNKS
+from analysis.parsed_jobs import PARSED_COLUMNS, source_columns, parse_job, decode_parsed_row
+from analysis.location_normalizer import get_location_engine
+from analysis.skill_vocabulary import get_skill_vocabulary
+from analysis.incremental import plain_state, merge_into
+from analysis.related_jobs import RelatedJobsResolver
+from analysis.result_writer import ResultWriter
+
+def is_positive(value):
+    """Python equivalent of the SQL filter `value IS NOT NULL AND value > 0`"""
+    try:
+        return value is not None and float(value) > 0
+    except (ValueError, TypeError):
+        return False
+
+class ScanVisitor:
+    """Base class for analyses that consume rows from a shared scan of jobs_complete
+
+    Subclasses declare the columns they need, filter rows in accepts() (the
+    Python equivalent of their old WHERE clause), fold each accepted row into
+    their own state in visit() and write their results in finish().
+
+    Columns may include parsed fields from parsed_jobs.PARSED_COLUMNS (e.g.
+    salary_value, skills); the engine fills them in once per row, either from
+    the jobs_parsed table or by parsing the raw columns.
+    """
+
+    name = None
+    columns = ()
+
+    # Attributes holding mergeable aggregate state (counts, sums, sets). Visitors
+    # that list them can be run incrementally: their state is checkpointed and
+    # later runs only fold in rows added since the last one.
+    state_fields = ()
+
+    # Highest jobs_complete.id already folded into this visitor's state
+    watermark = None
+
+    # RelatedJobsResolver shared by the run, set when the visitor is registered
+    related_jobs = None
+
+    # How results are published ('delete' or 'shadow'), set by the engine
+    publish = 'delete'
+
+    # Visitor classes that must run in the same scan, before this one (e.g. the
+    # job cube builder for analyses that roll it up); each is registered once
+    requires = ()
+
+    def prepare(self, connection):
+        """Set up before the scan starts (e.g. load a watermark to skip rows already counted)"""
+        pass
+
+    def accepts(self, job):
+        """Return True if this analysis wants the row"""
+        return True
+
+    def visit(self, job):
+        """Fold a single accepted row into the analysis state"""
+        raise NotImplementedError
+
+    def finish(self, connection):
+        """Compute and store results, returning True on success"""
+        raise NotImplementedError
+
+    def result_writer(self, connection, table, columns):
+        """ResultWriter for this analysis's output table, ready for rows"""
+        return ResultWriter(connection, table, columns, publish=self.publish).prepare()
+
+    @property
+    def incremental(self):
+        return bool(self.state_fields)
+
+    def get_state(self):
+        """Return the aggregate state as a JSON-serializable dict"""
+        return plain_state({field: getattr(self, field) for field in self.state_fields})
+
+    def merge_state(self, state):
+        """Fold a state produced by get_state() into this visitor"""
+        merge_into(self.__dict__, {field: state[field] for field in self.state_fields})
+
+class ScanEngine:
+    """Feeds one scan of a source table to many ScanVisitor instances"""
+
+    def __init__(self, source_table='jobs_complete', mode='stream',
+                 chunk_size=STREAM_CHUNK_SIZE, prefetch_chunks=PREFETCH_CHUNKS, parsed_table=None,
+                 related_jobs=None, publish='delete'):
+        self.source_table = source_table
+        self.parsed_table = parsed_table  # e.g. 'jobs_parsed'; None parses rows during the scan
+        self.mode = mode  # 'stream' (SSDictCursor) or 'keyset' (primary key pagination)
+        self.chunk_size = chunk_size
+        self.prefetch_chunks = prefetch_chunks
+        self.visitors = []
+        self.last_id = None  # highest jobs_complete.id seen by the last scan
+        self.related_jobs = related_jobs or RelatedJobsResolver()
+        self.publish = publish  # see result_writer.PUBLISH_MODES
+
+    def register(self, visitor):
+        """Register an analysis visitor for the next scan (after the visitors it requires)"""
+        for required in visitor.requires:
+            if not any(isinstance(registered, required) for registered in self.visitors):
+                self.register(required())
+        visitor.related_jobs = self.related_jobs
+        visitor.publish = self.publish
+        self.visitors.append(visitor)
+
+    def columns(self):
+        """Union of the columns declared by all registered visitors"""
+        columns = []
+        for visitor in self.visitors:
+            for column in visitor.columns:
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def parsed_fields(self):
+        """Parsed fields requested by the registered visitors"""
+        return [column for column in self.columns() if column in PARSED_COLUMNS]
+
+    def raw_columns(self):
+        """Source table columns to select"""
+        # id is always read so incremental runs can track their watermark
+        columns = ['id'] + [column for column in self.columns() if column not in PARSED_COLUMNS and column != 'id']
+        if not self.parsed_table:
+            for column in source_columns(self.parsed_fields()):
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def select_columns(self):
+        """Qualified select list, joining the parsed table when it is used"""
+        if self.parsed_table and self.parsed_fields():
+            return [f"c.{column}" for column in self.raw_columns()] + \
+                   [f"p.{column}" for column in self.parsed_fields()]
+        return self.raw_columns()
+
+    def from_clause(self):
+        if self.parsed_table and self.parsed_fields():
+            return f"{self.source_table} c JOIN {self.parsed_table} p ON p.jobs_complete_id = c.id"
+        return self.source_table
+
+    def key_column(self):
+        return 'c.id' if self.from_clause() != self.source_table else 'id'
+
+    def start_after(self):
+        """Lowest watermark across visitors, or None if any visitor needs a full scan"""
+        # Visitors without columns (cube roll-ups, pushed-down aggregations) read no rows
+        watermarks = [visitor.watermark for visitor in self.visitors if visitor.columns]
+        if not watermarks or any(watermark is None for watermark in watermarks):
+            return None
+        return min(watermarks)
+
+    def build_query(self):
+        """Build the single SELECT used for the shared scan"""
+        column_list = ', '.join(self.select_columns())
+        query = f"SELECT {column_list} FROM {self.from_clause()}"
+        if self.start_after() is not None:
+            query += f" WHERE {self.key_column()} > %s"
+        return query
+
+    def prepare_row(self, job, parsed_fields):
+        """Attach parsed fields to a row once, before it reaches any visitor"""
+        if parsed_fields:
+            if self.parsed_table:
+                decode_parsed_row(job)
+            else:
+                job.update(parse_job(job, parsed_fields))
+        return job
+
+    def iter_rows(self, connection):
+        """Generator over the source rows in the configured streaming mode"""
+        if self.mode == 'keyset':
+            rows = keyset_rows(connection, self.from_clause(), self.select_columns(), key=self.key_column(),
+                               chunk_size=self.chunk_size, start_after=self.start_after())
+        elif self.mode == 'stream':
+            start_after = self.start_after()
+            params = (start_after,) if start_after is not None else None
+            rows = stream_rows(connection, self.build_query(), params, chunk_size=self.chunk_size)
+        else:
+            raise ValueError(f"Unknown scan mode: {self.mode}")
+
+        if self.prefetch_chunks:
+            rows = prefetch(rows, chunk_size=self.chunk_size, depth=self.prefetch_chunks)
+        return rows
+
+    def scan(self, connection):
+        """Read the source table once, dispatching rows to every visitor
+
+        Returns a dict mapping visitor name to False for visitors that raised
+        while consuming rows; those visitors are skipped for the rest of the scan.
+        """
+        failed = {}
+        active = list(self.visitors)
+        if not any(visitor.columns for visitor in active):
+            return failed
+
+        start_after = self.start_after()
+        if start_after is not None:
+            print(f"🔍 Scanning {self.source_table} rows after id {start_after} for {len(active)} analyses ({self.mode} mode)...")
+        else:
+            print(f"🔍 Scanning {self.source_table} once for {len(active)} analyses ({self.mode} mode)...")
+
+        parsed_fields = self.parsed_fields()
+        if 'normalized_location' in parsed_fields and not self.parsed_table and start_after is None:
+            get_location_engine().warm(connection, self.source_table)
+
+        rows_scanned = 0
+        for job in self.iter_rows(connection):
+            rows_scanned += 1
+            self.prepare_row(job, parsed_fields)
+            if self.last_id is None or job['id'] > self.last_id:
+                self.last_id = job['id']
+            for visitor in list(active):
+                try:
+                    if visitor.watermark is not None and job['id'] <= visitor.watermark:
+                        continue
+                    if visitor.accepts(job):
+                        visitor.visit(job)
+                except Exception as e:
+                    print(f"❌ Analysis {visitor.name} failed while scanning: {e}")
+                    traceback.print_exc()
+                    failed[visitor.name] = False
+                    active.remove(visitor)
+
+        print(f"📊 Scanned {rows_scanned} rows from {self.source_table}")
+        return failed
+
+    def run(self, connection):
+        """Scan once, then let every visitor store its results
+
+        Each visitor's finish() runs in its own transaction, so an analysis that
+        fails halfway keeps its previous results. Returns a dict mapping
+        visitor name to its success flag.
+        """
+        # Skill IDs must be stable before any visitor interns a skill
+        uses_skills = {'skills', 'description_skills'} & set(self.parsed_fields())
+        vocabulary = get_skill_vocabulary()
+        if uses_skills and not vocabulary.loaded:
+            vocabulary.load(connection)
+
+        for visitor in self.visitors:
+            visitor.prepare(connection)
+
+        results = self.scan(connection)
+        if uses_skills:
+            vocabulary.save(connection)
+
+        for visitor in self.visitors:
+            if visitor.name in results:
+                continue
+            print(f"\n📈 Finishing analysis: {visitor.name}")
+            # DB_CONFIG uses autocommit, so open an explicit transaction per analysis
+            connection.begin()
+            try:
+                results[visitor.name] = bool(visitor.finish(connection))
+            except Exception as e:
+                print(f"❌ Analysis {visitor.name} failed: {e}")
+                traceback.print_exc()
+                results[visitor.name] = False
+
+            if results[visitor.name]:
+                connection.commit()
+            else:
+                connection.rollback()
+
+        return results
+
+def run_visitor(connection, visitor, source_table='jobs_complete'):
+    """Run a single visitor over its own scan (used by standalone run_analysis)"""
+    engine = ScanEngine(source_table)
+    engine.register(visitor)
+    return engine.run(connection)[visitor.name]
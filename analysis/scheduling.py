@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Analysis Scheduling
+Records how long each analysis takes so parallel runs can start the longest ones first
+"""
+
+DURATIONS_SCHEMA = """CREATE TABLE IF NOT EXISTS analysis_durations (
+    analysis_name VARCHAR(100) PRIMARY KEY,
+    duration_seconds DECIMAL(10,3),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+def create_durations_table(connection):
+    """Create the analysis_durations table if needed"""
+    cursor = connection.cursor()
+    cursor.execute(DURATIONS_SCHEMA)
+
+def load_durations(connection):
+    """Return {analysis_name: seconds} from the last recorded runs"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT analysis_name, duration_seconds FROM analysis_durations")
+    return {row['analysis_name']: float(row['duration_seconds']) for row in cursor.fetchall()
+            if row['duration_seconds'] is not None}
+
+def save_durations(connection, durations):
+    """Record the duration of each analysis that ran"""
+    if not durations:
+        return
+    cursor = connection.cursor()
+    cursor.executemany("""
+    REPLACE INTO analysis_durations (analysis_name, duration_seconds)
+    VALUES (%s, %s)
+    """, [(name, round(seconds, 3)) for name, seconds in durations.items()])
+
+def longest_first(analysis_names, durations):
+    """Order analyses by recorded duration, longest first
+
+    Analyses with no history go first, since they may be the slowest. Starting
+    the long ones early keeps a worker from picking one up at the very end
+    (longest-processing-time-first scheduling).
+    """
+    return sorted(analysis_names, key=lambda name: durations.get(name, float('inf')), reverse=True)
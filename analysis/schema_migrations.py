@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Schema Migrations
+Versioned, idempotent migrations adding generated columns and indexes to the source tables,
+with EXPLAIN plans of the queries they serve before and after
+"""
+
+import sys
+import os
+from collections import namedtuple
+
+MIGRATIONS_SCHEMA = """CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(100),
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# A step adds one column or index, and is skipped when it already exists; a
+# 'modify' step redefines an existing column
+Step = namedtuple('Step', ('kind', 'table', 'name', 'definition'))
+
+# A query whose plan is shown before and after a migration (after_query is the
+# form that uses the new column, when the migration adds one)
+Probe = namedtuple('Probe', ('label', 'query', 'after_query'))
+
+Migration = namedtuple('Migration', ('version', 'name', 'steps', 'probes'))
+
+def column(table, name, definition):
+    return Step('column', table, name, definition)
+
+def index(table, name, columns):
+    return Step('index', table, name, columns)
+
+def modify(table, name, definition):
+    return Step('modify', table, name, definition)
+
+def probe(label, query, after_query=None):
+    return Probe(label, query, after_query or query)
+
+# Stored form of the old ORDER BY CAST(REGEXP_REPLACE(COALESCE(salary, '0'), '[^0-9.]', '') AS DECIMAL)
+# (see related_jobs._salary_sort_value); NULL and unparseable salaries sort as 0. The number
+# is matched before it is cast, so no salary text makes the cast warn, which would fail
+# inserts into jobs_latest in strict mode.
+SALARY_ORDER_SQL = ("COALESCE(CAST(REGEXP_SUBSTR(LEFT(REGEXP_REPLACE(salary, '[^0-9.]', ''), 24), "
+                    "'^([0-9]+[.]?[0-9]*|[.][0-9]+)') AS DECIMAL(30,4)), 0)")
+
+# Applied in version order; never edit a released migration, add a new one
+MIGRATIONS = [
+    Migration(1, 'jobs_latest salary order and job_id', [
+        column('jobs_latest', 'salary_order', f"DECIMAL(30,4) AS (IF(salary IS NULL, -1, {SALARY_ORDER_SQL})) STORED"),
+        index('jobs_latest', 'idx_salary_order', 'salary_order'),
+        index('jobs_latest', 'idx_job_id', 'job_id'),
+    ], [
+        probe('Best paid related jobs',
+              "SELECT title, company, location, salary, job_id FROM jobs_latest "
+              "ORDER BY CAST(REGEXP_REPLACE(salary, '[^0-9.]', '') AS DECIMAL) DESC LIMIT 5",
+              "SELECT title, company, location, salary, job_id FROM jobs_latest ORDER BY salary_order DESC LIMIT 5"),
+        probe('Snapshot signature', "SELECT COUNT(*) AS row_count, MAX(job_id) AS max_job_id FROM jobs_latest"),
+    ]),
+    Migration(2, 'jobs_complete filter indexes', [
+        index('jobs_complete', 'idx_apply_openings', 'apply_count, openings'),
+        index('jobs_complete', 'idx_created_at', 'created_at'),
+        index('jobs_complete', 'idx_govt_created', 'is_govt, created_at'),
+        index('jobs_complete', 'idx_company', 'company(100)'),
+        index('jobs_complete', 'idx_location', 'location(100)'),
+    ], [
+        probe('Jobs with applications and openings',
+              "SELECT COUNT(*) FROM jobs_complete WHERE apply_count > 0 AND openings > 0"),
+        probe('Jobs posted in the last 4 weeks',
+              "SELECT COUNT(*) FROM jobs_complete WHERE created_at >= NOW() - INTERVAL 4 WEEK"),
+        probe('Recent government jobs',
+              "SELECT COUNT(*) FROM jobs_complete WHERE is_govt = '1' AND created_at >= NOW() - INTERVAL 1 YEAR"),
+        probe('Jobs of one company', "SELECT id FROM jobs_complete WHERE company = 'Infosys'"),
+        probe('Jobs in one location', "SELECT id FROM jobs_complete WHERE location = 'Bengaluru'"),
+    ]),
+    Migration(3, 'jobs_latest salary order ranks missing salaries as 0', [
+        modify('jobs_latest', 'salary_order', f"DECIMAL(30,4) AS ({SALARY_ORDER_SQL}) STORED"),
+    ], [
+        probe('Best paid related jobs',
+              "SELECT title, company, location, salary, job_id FROM jobs_latest ORDER BY salary_order DESC LIMIT 5"),
+    ]),
+]
+
+def table_exists(connection, table):
+    cursor = connection.cursor()
+    cursor.execute("""SELECT COUNT(*) AS table_count FROM information_schema.TABLES
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s""", (table,))
+    row = cursor.fetchone()
+    return bool(row and row['table_count'])
+
+def column_exists(connection, table, name):
+    cursor = connection.cursor()
+    cursor.execute("""SELECT COUNT(*) AS column_count FROM information_schema.COLUMNS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s""", (table, name))
+    row = cursor.fetchone()
+    return bool(row and row['column_count'])
+
+def index_exists(connection, table, name):
+    cursor = connection.cursor()
+    cursor.execute("""SELECT COUNT(*) AS index_count FROM information_schema.STATISTICS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s""", (table, name))
+    row = cursor.fetchone()
+    return bool(row and row['index_count'])
+
+def add_column(connection, table, name, definition, after=None):
+    """Add a column unless the table already has it; returns True if it was added"""
+    if column_exists(connection, table, name):
+        return False
+    query = f"ALTER TABLE {table} ADD COLUMN {name} {definition}"
+    if after:
+        query += f" AFTER {after}"
+    connection.cursor().execute(query)
+    return True
+
+def modify_column(connection, table, name, definition):
+    """Redefine an existing column (e.g. a generated column's expression)"""
+    connection.cursor().execute(f"ALTER TABLE {table} MODIFY COLUMN {name} {definition}")
+    return True
+
+def add_index(connection, table, name, columns):
+    """Add a secondary index unless the table already has one of that name; returns True if it was added"""
+    if index_exists(connection, table, name):
+        return False
+    connection.cursor().execute(f"ALTER TABLE {table} ADD INDEX {name} ({columns})")
+    return True
+
+def applied_versions(connection):
+    """Versions recorded in schema_migrations"""
+    cursor = connection.cursor()
+    cursor.execute(MIGRATIONS_SCHEMA)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row['version'] for row in cursor.fetchall()}
+
+def pending_migrations(connection):
+    """Migrations not yet recorded, in version order"""
+    applied = applied_versions(connection)
+    return [migration for migration in sorted(MIGRATIONS) if migration.version not in applied]
+
+def explain(connection, query):
+    """One-line summary of a query's plan (access type, index and estimated rows per table)"""
+    cursor = connection.cursor()
+    cursor.execute(f"EXPLAIN {query}")
+    parts = []
+    for row in cursor.fetchall():
+        part = f"{row.get('table')}: {row.get('type')}, key={row.get('key')}, rows={row.get('rows')}"
+        if row.get('Extra'):
+            part += f" ({row['Extra']})"
+        parts.append(part)
+    return '; '.join(parts)
+
+def _plans(connection, migration, after):
+    plans = {}
+    for migration_probe in migration.probes:
+        try:
+            plans[migration_probe.label] = explain(
+                connection, migration_probe.after_query if after else migration_probe.query)
+        except Exception as e:
+            plans[migration_probe.label] = f"not available ({e})"
+    return plans
+
+def apply_migration(connection, migration):
+    """Run a migration's missing steps and record its version"""
+    for step in migration.steps:
+        if step.kind == 'column':
+            added = add_column(connection, step.table, step.name, step.definition)
+        elif step.kind == 'modify':
+            modify_column(connection, step.table, step.name, step.definition)
+            print(f"   ✓ Modified column {step.table}.{step.name}")
+            continue
+        else:
+            added = add_index(connection, step.table, step.name, step.definition)
+        if added:
+            print(f"   ✓ Added {step.kind} {step.table}.{step.name}")
+        else:
+            print(f"   ✓ {step.kind.capitalize()} {step.table}.{step.name} already present")
+
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                   (migration.version, migration.name))
+
+def migrate(connection, show_plans=True):
+    """Apply pending migrations in order, stopping at the first that fails
+
+    With show_plans, the EXPLAIN of each migration's probe queries is printed
+    before and after it runs. Returns True when no migration is left pending.
+    """
+    try:
+        migrations = pending_migrations(connection)
+    except Exception as e:
+        print(f"❌ Could not read schema_migrations: {e}")
+        return False
+
+    if not migrations:
+        print("✓ Schema is up to date")
+        return True
+
+    for migration in migrations:
+        print(f"\n🔧 Migration {migration.version}: {migration.name}")
+        missing = [table for table in {step.table for step in migration.steps} if not table_exists(connection, table)]
+        if missing:
+            print(f"❌ Missing table(s): {', '.join(sorted(missing))}")
+            return False
+
+        before = _plans(connection, migration, after=False) if show_plans else {}
+        try:
+            apply_migration(connection, migration)
+        except Exception as e:
+            print(f"❌ Migration {migration.version} failed: {e}")
+            return False
+
+        if show_plans:
+            after = _plans(connection, migration, after=True)
+            for label in before:
+                print(f"   📋 {label}")
+                print(f"      before: {before[label]}")
+                print(f"      after:  {after[label]}")
+        print(f"✅ Migration {migration.version} applied")
+
+    return True
+
+def print_status(connection):
+    """List applied and pending migrations"""
+    applied = applied_versions(connection)
+    for migration in sorted(MIGRATIONS):
+        marker = '✓' if migration.version in applied else '…'
+        print(f"  {marker} {migration.version}: {migration.name}{'' if migration.version in applied else ' (pending)'}")
+
+if __name__ == "__main__":
+    # python schema_migrations.py          apply pending migrations, with EXPLAIN before/after
+    # python schema_migrations.py status   list applied and pending migrations
+    import pymysql
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from analysis_runner import DB_CONFIG
+
+    connection = pymysql.connect(**DB_CONFIG)
+    if 'status' in sys.argv[1:]:
+        print_status(connection)
+        success = True
+    else:
+        success = migrate(connection)
+    connection.close()
+
+    if not success:
+        sys.exit(1)
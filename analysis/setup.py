@@ -72,6 +72,29 @@ def test_database_connection():
         print("   • Network connectivity")
         return False
 
+def check_schema_migrations():
+    """Report source table migrations (generated columns, indexes) not yet applied"""
+    print("🔧 Checking schema migrations...")
+    try:
+        from schema_migrations import pending_migrations
+
+        connection = pymysql.connect(**DB_CONFIG)
+        pending = pending_migrations(connection)
+        connection.close()
+
+        if pending:
+            print(f"⚠️  {len(pending)} schema migration(s) pending:")
+            for migration in pending:
+                print(f"   • {migration.version}: {migration.name}")
+            print("   Apply them with: python schema_migrations.py")
+        else:
+            print("✓ Schema is up to date")
+        return True
+
+    except Exception as e:
+        print(f"❌ Schema migration check failed: {e}")
+        return False
+
 def create_directory_structure():
     """Create necessary directories"""
     directories = ['analysis', 'dashboard_outputs']
@@ -159,6 +182,7 @@ def main():
         ("Directory Structure", create_directory_structure),
         ("Dependencies", install_dependencies),
         ("Database Connection", test_database_connection),
+        ("Schema Migrations", check_schema_migrations),
         ("Analysis Modules", verify_analysis_modules),
     ]
 
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Skill Trend Store
+Persistent skill x week job counts, appended as new postings arrive, for comparing any two time windows
+"""
+
+import sys
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.incremental import load_checkpoint, save_checkpoint
+from analysis.schema_migrations import column_exists
+
+SKILL_WEEKLY_SCHEMA = """CREATE TABLE IF NOT EXISTS skill_weekly_counts (
+    week_start DATE NOT NULL,
+    skill VARCHAR(100) NOT NULL,
+    job_count INT NOT NULL,
+    PRIMARY KEY (week_start, skill),
+    KEY idx_skill_week (skill, week_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+JOB_WEEKLY_SCHEMA = """CREATE TABLE IF NOT EXISTS job_weekly_counts (
+    week_start DATE PRIMARY KEY,
+    job_count INT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# analysis_checkpoints entry holding the highest jobs_complete.id already counted
+STORE_CHECKPOINT = 'skill_weekly_counts'
+
+# Rows per executemany() call when appending counts
+APPEND_BATCH_SIZE = 1000
+
+# Window lengths in weeks for common comparisons (each window vs the one before it)
+TREND_WINDOWS = {
+    '4 weeks': 4,
+    'quarter': 13,
+    'half year': 26,
+    'year': 52
+}
+
+def week_start(value):
+    """Monday of the week containing a date or datetime"""
+    day = value.date() if isinstance(value, datetime) else value
+    return day - timedelta(days=day.weekday())
+
+class SkillWeeklyStore:
+    """Job counts per skill and ISO week, kept in skill_weekly_counts
+
+    add() buffers the skills of new postings by the week they were created
+    in; append() adds the buffer onto the stored counts and moves the
+    store's jobs_complete.id watermark, in the caller's transaction. Growth
+    over any pair of windows is then a sum over stored weeks, with no scan
+    of jobs_complete. The store is rebuilt from scratch when its checkpoint
+    is missing, which full (non-incremental) runs ensure.
+
+    Counts are keyed by skill name, not skill_vocabulary ID: parallel workers
+    intern new skills into their own vocabularies, so an ID is only known to
+    mean the same skill within one process. Names are compared like the
+    table's key (case-insensitive, first 100 characters).
+    """
+
+    def __init__(self):
+        self.skill_counts = Counter()  # (week_start, skill) -> jobs
+        self.spellings = {}  # lowered skill -> first spelling counted
+        self.job_counts = Counter()  # week_start -> jobs
+        self.last_id = None
+
+    def prepare(self, connection):
+        """Create the tables and return the watermark to scan after (None = rebuild from scratch)"""
+        cursor = connection.cursor()
+        # Stores written before counts were keyed by name hold skill IDs; start them over
+        legacy = column_exists(connection, 'skill_weekly_counts', 'skill_id')
+        if legacy:
+            cursor.execute("DROP TABLE skill_weekly_counts")
+        cursor.execute(SKILL_WEEKLY_SCHEMA)
+        cursor.execute(JOB_WEEKLY_SCHEMA)
+        last_id, state = load_checkpoint(connection, STORE_CHECKPOINT)
+        if state is None or legacy:
+            print("🗓️  Rebuilding skill_weekly_counts from all postings")
+            cursor.execute("DELETE FROM skill_weekly_counts")
+            cursor.execute("DELETE FROM job_weekly_counts")
+            return None
+        return last_id
+
+    def add(self, created_at, skills):
+        """Count one posting's distinct skills in the week it was created"""
+        week = week_start(created_at)
+        self.job_counts[week] += 1
+        counted = set()
+        for skill in skills:
+            key = skill[:100].lower()
+            if key not in counted:
+                counted.add(key)
+                self.skill_counts[(week, self.spellings.setdefault(key, skill[:100]))] += 1
+
+    def seen(self, job_id):
+        """Advance the watermark past a scanned row, counted or not"""
+        if self.last_id is None or job_id > self.last_id:
+            self.last_id = job_id
+
+    def append(self, connection):
+        """Add the buffered counts to the stored ones and checkpoint the watermark"""
+        cursor = connection.cursor()
+        skill_rows = [(week, skill, count) for (week, skill), count in self.skill_counts.items()]
+        for start in range(0, len(skill_rows), APPEND_BATCH_SIZE):
+            cursor.executemany("""
+            INSERT INTO skill_weekly_counts (week_start, skill, job_count) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE job_count = job_count + VALUES(job_count)
+            """, skill_rows[start:start + APPEND_BATCH_SIZE])
+        cursor.executemany("""
+        INSERT INTO job_weekly_counts (week_start, job_count) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE job_count = job_count + VALUES(job_count)
+        """, list(self.job_counts.items()))
+
+        if self.last_id is not None:
+            save_checkpoint(connection, STORE_CHECKPOINT, self.last_id, {'weeks_added': len(self.job_counts)})
+        print(f"🗓️  Appended {len(skill_rows)} skill-week counts over {len(self.job_counts)} weeks")
+        self.skill_counts.clear()
+        self.job_counts.clear()
+
+    def window_counts(self, connection, first_week, last_week):
+        """({skill: jobs}, total jobs) for postings created in weeks first_week..last_week"""
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT skill, SUM(job_count) AS job_count FROM skill_weekly_counts
+        WHERE week_start BETWEEN %s AND %s GROUP BY skill
+        """, (first_week, last_week))
+        skill_counts = {row['skill']: int(row['job_count']) for row in cursor.fetchall()}
+
+        cursor.execute("SELECT SUM(job_count) AS job_count FROM job_weekly_counts WHERE week_start BETWEEN %s AND %s",
+                       (first_week, last_week))
+        row = cursor.fetchone()
+        return skill_counts, int(row['job_count'] or 0) if row else 0
+
+    def compare(self, connection, weeks, now=None):
+        """Counts for the last `weeks` weeks (current week included) and the `weeks` weeks before
+
+        Returns ((recent skills, recent jobs), (previous skills, previous jobs)).
+        """
+        current_week = week_start(now or datetime.now())
+        recent_start = current_week - timedelta(weeks=weeks - 1)
+        previous_start = recent_start - timedelta(weeks=weeks)
+        recent = self.window_counts(connection, recent_start, current_week)
+        previous = self.window_counts(connection, previous_start, recent_start - timedelta(days=1))
+        return recent, previous
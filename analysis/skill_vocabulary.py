@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Skill Vocabulary
+Interns skill names to persistent integer IDs and counts skills in NumPy arrays
+"""
+
+from collections.abc import MutableMapping
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.space_saving import SpaceSaving, TOP_K_CAPACITY
+
+VOCABULARY_SCHEMA = """CREATE TABLE IF NOT EXISTS skill_vocabulary (
+    skill_id INT PRIMARY KEY,
+    skill VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY idx_skill (skill)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"""
+
+# Skills inserted (and read back) per query by SkillVocabulary.save()
+SAVE_BATCH_SIZE = 1000
+
+# Skill IDs buffered by a SkillCounter before they are folded in with one bincount
+COUNTER_FLUSH_SIZE = 65536
+
+class SkillVocabulary:
+    """Bidirectional skill name <-> integer ID mapping
+
+    IDs are dense (0..n-1) so they can index NumPy arrays directly. The
+    mapping is persisted in skill_vocabulary, so a skill keeps its ID across
+    runs; skills first seen in this run get the next free IDs and are
+    written by save().
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.skills = []
+        self.saved = 0  # skills[:saved] are already in skill_vocabulary
+        self.loaded = False
+
+    def __len__(self):
+        return len(self.skills)
+
+    def intern(self, skill):
+        """ID of a skill, assigning a new one if needed"""
+        skill_id = self.ids.get(skill)
+        if skill_id is None:
+            skill_id = self.ids[skill] = len(self.skills)
+            self.skills.append(skill)
+        return skill_id
+
+    def encode(self, skills):
+        """int32 array of IDs for a list of skills"""
+        intern = self.intern
+        return np.fromiter((intern(skill) for skill in skills), dtype=np.int32, count=len(skills))
+
+    def skill(self, skill_id):
+        return self.skills[skill_id]
+
+    def decode(self, skill_ids):
+        """Skill names of an array of IDs"""
+        return [self.skills[skill_id] for skill_id in skill_ids]
+
+    def load(self, connection):
+        """Read the persisted vocabulary; skills interned before loading are renumbered after it
+
+        A pending skill the table already holds under another spelling (the
+        unique key ignores case, and stored names are cut to 100 characters)
+        takes that row's ID instead of a new one, which save() could never store.
+        """
+        try:
+            cursor = connection.cursor()
+            cursor.execute(VOCABULARY_SCHEMA)
+            cursor.execute("SELECT skill_id, skill FROM skill_vocabulary ORDER BY skill_id")
+            rows = cursor.fetchall()
+        except Exception as e:
+            print(f"⚠️  Could not load skill_vocabulary, using a fresh vocabulary: {e}")
+            return False
+
+        pending = self.skills
+        self.ids = {}
+        self.skills = []
+        stored_keys = {}
+        for row in rows:
+            # IDs are dense when written by save(); keep them so even if rows were removed
+            while len(self.skills) < row['skill_id']:
+                self.skills.append(None)
+            self.ids[row['skill']] = row['skill_id']
+            self.skills.append(row['skill'])
+            stored_keys.setdefault(_stored_key(row['skill']), row['skill_id'])
+        self.saved = len(self.skills)
+        for skill in pending:
+            if skill is None or skill in self.ids:
+                continue
+            skill_id = stored_keys.get(_stored_key(skill))
+            if skill_id is None:
+                self.intern(skill)
+            else:
+                self.ids[skill] = skill_id
+        self.loaded = True
+        print(f"🔤 Loaded {self.saved} skills from skill_vocabulary")
+        return True
+
+    def save(self, connection):
+        """Persist skills interned since the last load/save
+
+        Another process may store the same IDs (or the same skills under other
+        IDs) first. Its rows win: the written IDs are read back, saved only
+        moves past rows stored as given, and on a conflict the vocabulary is
+        marked for reload, so the next scan renumbers the rest before anything
+        uses them. Returns False when some skills were not stored.
+        """
+        new_skills = [(skill_id, skill[:100]) for skill_id, skill in enumerate(self.skills[self.saved:], self.saved)
+                      if skill is not None]
+        if not new_skills:
+            return True
+        try:
+            cursor = connection.cursor()
+            stored = {}
+            for start in range(0, len(new_skills), SAVE_BATCH_SIZE):
+                batch = new_skills[start:start + SAVE_BATCH_SIZE]
+                cursor.executemany("INSERT IGNORE INTO skill_vocabulary (skill_id, skill) VALUES (%s, %s)", batch)
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f"SELECT skill_id, skill FROM skill_vocabulary WHERE skill_id IN ({placeholders})",
+                               [skill_id for skill_id, _ in batch])
+                stored.update((row['skill_id'], row['skill']) for row in cursor.fetchall())
+        except Exception as e:
+            print(f"⚠️  Could not save skill_vocabulary: {e}")
+            return False
+
+        conflicts = [skill_id for skill_id, skill in new_skills if stored.get(skill_id) != skill]
+        if conflicts:
+            self.saved = conflicts[0]
+            self.loaded = False
+            print(f"⚠️  {len(conflicts)} of {len(new_skills)} new skills were stored differently by another run; "
+                  f"skill_vocabulary will be reloaded")
+        else:
+            self.saved = len(self.skills)
+        print(f"🔤 Added {len(new_skills) - len(conflicts)} new skills to skill_vocabulary")
+        return not conflicts
+
+def _stored_key(skill):
+    """Form under which skill_vocabulary's unique key compares a skill"""
+    return skill[:100].lower()
+
+class SkillCounter(MutableMapping):
+    """Counter of skills backed by a NumPy array indexed by skill ID
+
+    update() takes int32 ID arrays and folds them in with np.bincount in
+    batches. Reads and writes by skill name work like a Counter, so
+    checkpoints (plain_state/merge_into) store skill names, not IDs.
+    most_common() breaks ties by first occurrence, as Counter does.
+    """
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = vocabulary or get_skill_vocabulary()
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.first_seen = np.zeros(0, dtype=np.int64)  # order in which each ID was first counted
+        self.seen = 0
+        self.pending = []
+        self.pending_size = 0
+
+    def update(self, skill_ids):
+        """Count every ID of an int array (or every skill of a list of names)"""
+        if not isinstance(skill_ids, np.ndarray):
+            skill_ids = self.vocabulary.encode(skill_ids)
+        self.pending.append(skill_ids)
+        self.pending_size += len(skill_ids)
+        if self.pending_size >= COUNTER_FLUSH_SIZE:
+            self.flush()
+
+    def _grow(self, size):
+        if size > len(self.counts):
+            padding = size - len(self.counts)
+            self.counts = np.concatenate([self.counts, np.zeros(padding, dtype=np.int64)])
+            self.first_seen = np.concatenate([self.first_seen, np.zeros(padding, dtype=np.int64)])
+
+    def _mark_seen(self, skill_ids):
+        """Record first occurrences of IDs that had no count yet (in the given order)"""
+        new_ids = skill_ids[self.counts[skill_ids] == 0]
+        self.first_seen[new_ids] = np.arange(self.seen, self.seen + len(new_ids))
+        self.seen += len(new_ids)
+
+    def flush(self):
+        """Fold buffered IDs into the counts"""
+        if not self.pending:
+            return
+        skill_ids = np.concatenate(self.pending)
+        added = np.bincount(skill_ids, minlength=len(self.counts))
+        self.pending = []
+        self.pending_size = 0
+        self._grow(len(added))
+
+        # Distinct IDs in order of first occurrence within the batch
+        unique_ids, first_index = np.unique(skill_ids, return_index=True)
+        self._mark_seen(unique_ids[np.argsort(first_index)])
+        self.counts += added
+
+    def array(self, size=None):
+        """Counts by skill ID, padded to `size`"""
+        self.flush()
+        self._grow(size or 0)
+        return self.counts
+
+    def most_common(self, n=None):
+        """(skill, count) pairs, highest count first"""
+        counts = self.array()
+        present = np.flatnonzero(counts)
+        order = present[np.lexsort((self.first_seen[present], -counts[present]))][:n]
+        return [(self.vocabulary.skill(skill_id), int(counts[skill_id])) for skill_id in order]
+
+    def __getitem__(self, skill):
+        skill_id = self.vocabulary.ids.get(skill)
+        counts = self.array()
+        if skill_id is None or skill_id >= len(counts) or not counts[skill_id]:
+            raise KeyError(skill)
+        return int(counts[skill_id])
+
+    def __setitem__(self, skill, count):
+        skill_id = self.vocabulary.intern(skill)
+        counts = self.array(skill_id + 1)
+        self._mark_seen(np.array([skill_id]))
+        counts[skill_id] = count
+
+    def __delitem__(self, skill):
+        self[skill]
+        self.counts[self.vocabulary.ids[skill]] = 0
+
+    def __iter__(self):
+        return iter(self.vocabulary.decode(np.flatnonzero(self.array())))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.array()))
+
+class SkillTopK(SpaceSaving):
+    """Space-Saving summary of skills, counted by skill ID
+
+    update() takes int32 ID arrays (or lists of skill names); most_common()
+    and checkpoints use skill names.
+    """
+
+    def __init__(self, capacity=TOP_K_CAPACITY, vocabulary=None):
+        super().__init__(capacity)
+        self.vocabulary = vocabulary or get_skill_vocabulary()
+
+    def update(self, skill_ids, value=None):
+        if not isinstance(skill_ids, np.ndarray):
+            skill_ids = self.vocabulary.encode(skill_ids)
+        super().update(skill_ids, value)
+
+    def _export(self, skill_id):
+        return self.vocabulary.skill(skill_id)
+
+    def _import(self, skill):
+        return self.vocabulary.intern(skill)
+
+_vocabulary = SkillVocabulary()
+
+def get_skill_vocabulary():
+    """Process-wide skill vocabulary"""
+    return _vocabulary
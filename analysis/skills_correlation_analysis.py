@@ -6,164 +6,156 @@ Analyzes which skills commonly appear together in job requirements
 
 import pymysql
 import json
-import re
-from collections import defaultdict, Counter
-from itertools import combinations
-from statistics import mean
-
-def extract_skills_from_text(text):
-    if not text:
-        return []
-    skills = []
-    parts = re.split(r'[,;|]', str(text))
-    for part in parts:
-        skill = part.strip()
-        if skill and len(skill) > 1:
-            skills.append(skill.title())
-    return skills
-
-def extract_salary_value(salary_text):
-    if not salary_text:
-        return None
-    salary_str = str(salary_text).lower().replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+(?:\.\d+)?', salary_str)
-    if not numbers:
-        return None
-    salary_value = float(numbers[0])
-    if 'lpa' in salary_str:
-        return salary_value * 100000
-    return salary_value * 100000 if salary_value < 1000 else salary_value
-
-def normalize_job_type(title):
-    if not title:
-        return "Other"
-    title_lower = title.lower()
-
-    if 'engineer' in title_lower or 'developer' in title_lower:
-        return 'Engineering'
-    elif 'analyst' in title_lower:
-        return 'Analytics'
-    elif 'scientist' in title_lower:
-        return 'Data Science'
-    elif 'manager' in title_lower:
-        return 'Management'
-    else:
-        return 'Other'
-
-def get_related_jobs(connection, skill_combo, limit=5):
-    try:
-        cursor = connection.cursor()
-        skills = skill_combo.split(' + ')
-        if len(skills) >= 2:
-            query = """SELECT title, company, location, salary, job_id FROM jobs_latest 
-                       WHERE tags_and_skills LIKE %s AND tags_and_skills LIKE %s LIMIT %s"""
-            pattern1 = f"%{skills[0]}%"
-            pattern2 = f"%{skills[1]}%"
-            cursor.execute(query, (pattern1, pattern2, limit))
-        else:
-            query = """SELECT title, company, location, salary, job_id FROM jobs_latest LIMIT %s"""
-            cursor.execute(query, (limit,))
-
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id']} for job in jobs]
-        return json.dumps(related_jobs)
-    except:
-        return "[]"
-
-def run_analysis(connection):
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, tags_and_skills, job_description, salary FROM jobs_complete 
-                   WHERE tags_and_skills IS NOT NULL AND tags_and_skills != ''"""
-        cursor.execute(query)
-        jobs = cursor.fetchall()
-
-        if not jobs:
-            return False
-
-        # Extract skills from each job
-        job_skills_data = []
-        skill_counts = Counter()
-
-        for job in jobs:
-            skills = extract_skills_from_text(job['tags_and_skills'])
-            if job.get('job_description'):
-                skills.extend(extract_skills_from_text(job['job_description']))
-
-            # Filter out duplicates and very short skills
-            skills = list(set([skill for skill in skills if len(skill) > 2]))
-
-            if len(skills) >= 2:  # Only consider jobs with multiple skills
-                salary_value = extract_salary_value(job.get('salary'))
-                job_type = normalize_job_type(job.get('title'))
-
-                job_skills_data.append({
-                    'skills': skills,
-                    'salary': salary_value,
-                    'job_type': job_type
-                })
-
-                for skill in skills:
-                    skill_counts[skill] += 1
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.title_classifier import classify_title
+from analysis.skill_vocabulary import SkillCounter, get_skill_vocabulary
+from analysis.cooccurrence import SkillCooccurrence, association_metrics
+
+# Skills must appear in this many jobs to be paired
+MIN_SKILL_JOBS = 10
+
+# Pairs must appear in this many jobs, and in this share of all jobs, to be stored
+MIN_PAIR_JOBS = 5
+MIN_PAIR_SUPPORT = 0.0005
+
+# Pairs stored per skill (a pair is kept if it is in the top list of either skill)
+PAIRS_PER_SKILL = 20
+
+# Metric a skill's pairs are ranked by (see cooccurrence.association_metrics);
+# lift favours specific pairings over skills that are simply common everywhere
+PAIR_RANKING = 'lift'
+
+class SkillsCorrelationVisitor(ScanVisitor):
+    """Collects per-job skill sets from the shared scan for pair counting"""
+
+    name = 'skills_correlation_analysis'
+    columns = ('title', 'tags_and_skills', 'skills', 'description_skills', 'salary_value')
+
+    def __init__(self):
+        # Skill IDs of each job, as (int32 array, salary, job type)
+        self.vocabulary = get_skill_vocabulary()
+        self.job_skills_data = []
+        self.skill_counts = SkillCounter(self.vocabulary)
+        self.jobs_seen = 0
+
+    def accepts(self, job):
+        return bool(job.get('tags_and_skills'))
+
+    def visit(self, job):
+        self.jobs_seen += 1
+        # Skills are already de-duplicated by parsed_jobs; drop very short ones
+        skills = [skill for skill in job['skills'] + job['description_skills'] if len(skill) > 2]
+
+        if len(skills) >= 2:  # Only consider jobs with multiple skills
+            salary_value = job['salary_value']
+            job_type = classify_title(job.get('title'), 'family_science')
+            skill_ids = self.vocabulary.encode(skills)
+
+            self.job_skills_data.append((skill_ids, salary_value, job_type))
+            self.skill_counts.update(skill_ids)
+
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                return False
+
+            job_skills_data = self.job_skills_data
+            skill_names = self.vocabulary.skills
+
+            # Filter skills that appear in at least 10 jobs (mask indexed by skill ID)
+            is_common = self.skill_counts.array(len(self.vocabulary)) >= MIN_SKILL_JOBS
+
+            if np.count_nonzero(is_common) < 2:
+                print("Not enough common skills found for correlation analysis")
+                return False
+
+            # Job x skill matrix with columns in skill name order, so every pair (i < j)
+            # reads "<first> + <second>" alphabetically
+            common_ids = sorted(np.flatnonzero(is_common).tolist(), key=skill_names.__getitem__)
+            matrix = SkillCooccurrence((skill_ids for skill_ids, salary, job_type in job_skills_data),
+                                       common_ids, len(self.vocabulary))
+
+            # Pair counts from X.T @ X, pruned to the minimum support
+            total_jobs = matrix.job_count
+            min_count = max(MIN_PAIR_JOBS, int(np.ceil(MIN_PAIR_SUPPORT * total_jobs)))
+            rows, columns, counts = matrix.pairs(min_count=min_count)
+
+            # Association metrics of every remaining pair from the joint and marginal counts
+            marginals = matrix.marginals()
+            metrics = association_metrics(counts, marginals[rows], marginals[columns], total_jobs)
+
+            # Keep each skill's strongest pairs, strongest first
+            ranking = metrics[PAIR_RANKING]
+            keep = matrix.top_k_per_skill(rows, columns, ranking, PAIRS_PER_SKILL)
+            order = keep[np.lexsort((columns[keep], rows[keep], -counts[keep], -ranking[keep]))]
+            rows, columns, counts = rows[order], columns[order], counts[order]
+            metrics = {name: values[order] for name, values in metrics.items()}
+            print(f"🔗 {len(common_ids)} common skills, {len(rows)} skill pairs kept (min support {min_count} jobs)")
+
+            # Salary sums and salaried-job counts per pair from weighted products
+            salaries = np.array([salary or 0.0 for skill_ids, salary, job_type in job_skills_data], dtype=np.float64)
+            salary_sums = matrix.values(matrix.weighted(salaries), rows, columns)
+            salary_counts = matrix.values(matrix.weighted(salaries != 0), rows, columns)
+
+            # Jobs per pair and job type, one weighted product per job type
+            job_types = [job_type for skill_ids, salary, job_type in job_skills_data]
+            type_names = list(dict.fromkeys(job_types))
+            type_codes = np.array([type_names.index(job_type) for job_type in job_types])
+            type_counts = np.column_stack([matrix.values(matrix.weighted(type_codes == code), rows, columns)
+                                           for code in range(len(type_names))])
+            top_types = np.argsort(-type_counts, axis=1, kind='stable')[:, :3]
+
+            writer = self.result_writer(connection, 'analysis_skills_correlation',
+                                        ('skill_combination', 'correlation_strength', 'job_count', 'avg_salary', 'job_types',
+                                         'lift', 'pmi', 'jaccard', 'confidence_first', 'confidence_second',
+                                         'related_jobs'))
+            results_stored = 0
+
+            # Store each pair with its metrics; correlation_strength is the pair's support
+            pair_skills = [(skill_names[common_ids[row]], skill_names[common_ids[column]])
+                           for row, column in zip(rows.tolist(), columns.tolist())]
+
+            # Resolve related jobs for all stored pairs in one pass over jobs_latest
+            related_keys = [self.related_jobs.request(skills=skills) for skills in pair_skills]
+            self.related_jobs.resolve(connection)
+
+            for position, (first_skill, second_skill) in enumerate(pair_skills):
+                count = int(counts[position])
+                avg_salary = salary_sums[position] / salary_counts[position] if salary_counts[position] else 0
+                common_job_types = [type_names[code] for code in top_types[position]
+                                    if type_counts[position, code] > 0]
+
+                related_jobs = self.related_jobs.get(related_keys[position])
+
+                writer.add((
+                    f"{first_skill} + {second_skill}", round(float(metrics['support'][position]), 3), count,
+                    round(float(avg_salary), 2), json.dumps(common_job_types),
+                    round(float(metrics['lift'][position]), 4), round(float(metrics['pmi'][position]), 4),
+                    round(float(metrics['jaccard'][position]), 4),
+                    round(float(metrics['confidence_first'][position]), 4),
+                    round(float(metrics['confidence_second'][position]), 4),
+                    related_jobs
+                ))
+                results_stored += 1
 
-        # Filter skills that appear in at least 10 jobs
-        common_skills = [skill for skill, count in skill_counts.items() if count >= 10]
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} skill correlation records")
+            return True
 
-        if len(common_skills) < 2:
-            print("Not enough common skills found for correlation analysis")
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
             return False
 
-        # Calculate skill combinations and their correlations
-        skill_combinations = {}
-        combination_salaries = defaultdict(list)
-        combination_job_types = defaultdict(list)
-
-        for job_data in job_skills_data:
-            job_skills = [skill for skill in job_data['skills'] if skill in common_skills]
-
-            if len(job_skills) >= 2:
-                # Generate all pairs of skills in this job
-                for skill_pair in combinations(sorted(job_skills), 2):
-                    combo_key = f"{skill_pair[0]} + {skill_pair[1]}"
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return SkillsCorrelationVisitor()
 
-                    if combo_key not in skill_combinations:
-                        skill_combinations[combo_key] = 0
-                    skill_combinations[combo_key] += 1
-
-                    if job_data['salary']:
-                        combination_salaries[combo_key].append(job_data['salary'])
-
-                    combination_job_types[combo_key].append(job_data['job_type'])
-
-        cursor.execute("DELETE FROM analysis_skills_correlation")
-        results_stored = 0
-
-        # Calculate correlation strength and store results
-        total_jobs = len(job_skills_data)
-
-        for combo, count in skill_combinations.items():
-            if count >= 5:  # Only combinations that appear in at least 5 jobs
-                correlation_strength = count / total_jobs
-                avg_salary = mean(combination_salaries[combo]) if combination_salaries[combo] else 0
-                common_job_types = [jt for jt, cnt in Counter(combination_job_types[combo]).most_common(3)]
-
-                related_jobs = get_related_jobs(connection, combo)
-
-                insert_query = """
-                INSERT INTO analysis_skills_correlation 
-                (skill_combination, correlation_strength, job_count, avg_salary, job_types, related_jobs)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-
-                cursor.execute(insert_query, (
-                    combo, round(correlation_strength, 3), count,
-                    round(avg_salary, 2), json.dumps(common_job_types), related_jobs
-                ))
-                results_stored += 1
-
-        print(f"✅ Analysis completed! Stored {results_stored} skill correlation records")
-        return True
-
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        return False
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
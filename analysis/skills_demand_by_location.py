@@ -5,138 +5,126 @@ Analyzes which skills are in demand in different locations
 """
 
 import pymysql
-import json
 import sys
 import os
 
 # Add parent directory to path to import data_utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from analysis.data_utils import extract_skills, parse_salary, normalize_location
-
-from collections import defaultdict, Counter
-from statistics import mean
-
-def get_related_jobs(connection, location, skill, limit=5):
-    """Get related available jobs for this location and skill"""
-    try:
-        cursor = connection.cursor()
-        query = """SELECT title, company, location, salary, job_id FROM jobs_latest 
-                   WHERE location LIKE %s AND (tags_and_skills LIKE %s OR job_description LIKE %s) LIMIT %s"""
-        location_pattern = f"%{location}%"
-        skill_pattern = f"%{skill}%"
-        cursor.execute(query, (location_pattern, skill_pattern, skill_pattern, limit))
-        jobs = cursor.fetchall()
-        related_jobs = [{'title': job['title'], 'company': job['company'], 'location': job['location'], 'salary': job['salary'], 'job_id': job['job_id']} for job in jobs]
-        return json.dumps(related_jobs)
-    except Exception as e:
-        print(f"Error getting related jobs: {e}")
-        return "[]"
+from analysis.scan_engine import ScanVisitor, run_visitor
+from analysis.space_saving import SpaceSaving
 
-def run_analysis(connection):
-    """Main analysis function"""
-    try:
-        cursor = connection.cursor()
+from collections import defaultdict
 
-        print("🔍 Fetching job data for location-skills analysis...")
+# Skills tracked per location by its Space-Saving summary (the top 25 are stored)
+SKILLS_PER_LOCATION = 200
 
-        query = """SELECT location, tags_and_skills, job_description, salary, salary_detail FROM jobs_complete 
-                   WHERE location IS NOT NULL AND location != '' 
-                   AND (tags_and_skills IS NOT NULL OR job_description IS NOT NULL)"""
-        cursor.execute(query)
-        jobs = cursor.fetchall()
+class SkillsDemandByLocationVisitor(ScanVisitor):
+    """Accumulates skill demand per normalized location from the shared scan"""
 
-        if not jobs:
-            print("No jobs found with location and skills data")
-            return False
+    name = 'skills_demand_by_location'
+    columns = ('location', 'tags_and_skills', 'normalized_location', 'skills', 'description_skills', 'salary_value')
+    state_fields = ('location_skill_data', 'processed_jobs', 'jobs_seen')
+
+    def __init__(self):
+        # Skill counts per location in bounded top-k summaries, with salaries attached
+        self.location_skill_data = defaultdict(lambda: SpaceSaving(SKILLS_PER_LOCATION))
+        self.processed_jobs = 0
+        self.jobs_seen = 0
 
-        print(f"📊 Processing {len(jobs)} jobs with location and skills data...")
+    def accepts(self, job):
+        return bool(job.get('location')) and (
+            job.get('tags_and_skills') is not None or bool(job['description_skills']))
 
-        location_skill_data = defaultdict(lambda: defaultdict(lambda: {'frequency': 0, 'job_count': 0, 'salaries': []}))
+    def visit(self, job):
+        self.jobs_seen += 1
+        location = job['normalized_location']
+        if location != "Unknown" and len(location) > 2:
+            # Skills from both fields (de-duplicated by parsed_jobs), limited to reasonable skill names
+            unique_skills = [skill for skill in job['skills'] + job['description_skills']
+                             if len(skill) > 2 and len(skill.split()) <= 4]
 
-        processed_jobs = 0
+            salary_value = job['salary_value']
+            if not (salary_value and salary_value > 0):
+                salary_value = None
 
-        for job in jobs:
-            location = normalize_location(job['location'])
-            if location != "Unknown" and len(location) > 2:
-                # Extract skills from both fields
-                skills = extract_skills(job.get('tags_and_skills'))
-                if job.get('job_description'):
-                    skills.extend(extract_skills(job['job_description']))
+            self.location_skill_data[location].update(unique_skills, salary_value)
 
-                # Remove duplicates and limit skill length
-                unique_skills = []
-                seen = set()
-                for skill in skills:
-                    if (skill.lower() not in seen and 
-                        len(skill) > 2 and len(skill) <= 100 and 
-                        len(skill.split()) <= 4):  # Limit to reasonable skill names
-                        unique_skills.append(skill)
-                        seen.add(skill.lower())
+            self.processed_jobs += 1
 
-                salary_value = parse_salary(job.get('salary'), job.get('salary_detail'))
+    def finish(self, connection):
+        try:
+            if not self.jobs_seen:
+                print("No jobs found with location and skills data")
+                return False
 
-                for skill in unique_skills:
-                    location_skill_data[location][skill]['frequency'] += 1
-                    location_skill_data[location][skill]['job_count'] += 1
+            location_skill_data = self.location_skill_data
 
-                    if salary_value and salary_value > 0:
-                        location_skill_data[location][skill]['salaries'].append(salary_value)
+            print(f"✅ Successfully processed {self.processed_jobs} jobs")
+            print("💾 Staging new analysis results...")
 
-                processed_jobs += 1
+            writer = self.result_writer(connection, 'analysis_skills_by_location',
+                                        ('location', 'skill', 'frequency', 'job_count', 'avg_salary', 'related_jobs'))
+            results_stored = 0
+            location_skills = []
 
-        print(f"✅ Successfully processed {processed_jobs} jobs")
-        print("💾 Clearing previous analysis results...")
+            print("📈 Analyzing skills demand by location...")
 
-        cursor.execute("DELETE FROM analysis_skills_by_location")
-        results_stored = 0
+            for location, skills_data in location_skill_data.items():
+                # Only consider locations with meaningful data (at least 10 different skills)
+                if len(skills_data) >= 10:
+                    # Get top skills for this location
+                    top_skills = skills_data.most_common(25)
 
-        print("📈 Analyzing skills demand by location...")
+                    for skill, frequency in top_skills:
+                        if frequency >= 3:  # Only skills mentioned at least 3 times
+                            avg_salary = skills_data.value_mean(skill)
 
-        for location, skills_data in location_skill_data.items():
-            # Only consider locations with meaningful data (at least 10 different skills)
-            if len(skills_data) >= 10:
-                # Get top skills for this location
-                top_skills = sorted(skills_data.items(), key=lambda x: x[1]['frequency'], reverse=True)[:25]
+                            # Ensure skill length is within database limits
+                            if len(skill) > 100:
+                                skill = skill[:97] + "..."
 
-                for skill, data in top_skills:
-                    if data['frequency'] >= 3:  # Only skills mentioned at least 3 times
-                        # Ensure skill length is within database limits
-                        if len(skill) > 100:
-                            skill = skill[:97] + "..."
+                            related_key = self.related_jobs.request(location=location, skill_text=skill)
+                            location_skills.append((location, skill, frequency, avg_salary, related_key))
 
-                        avg_salary = mean(data['salaries']) if data['salaries'] else 0
-                        related_jobs = get_related_jobs(connection, location, skill)
+            # Resolve related jobs for all location/skill pairs in one pass over jobs_latest
+            self.related_jobs.resolve(connection)
 
-                        insert_query = """
-                        INSERT INTO analysis_skills_by_location 
-                        (location, skill, frequency, job_count, avg_salary, related_jobs)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        """
+            for location, skill, frequency, avg_salary, related_key in location_skills:
+                # Each job lists a skill once, so its frequency is also its job count
+                writer.add((
+                    location, skill, frequency, frequency,
+                    round(avg_salary, 2), self.related_jobs.get(related_key)
+                ))
+                results_stored += 1
 
-                        cursor.execute(insert_query, (
-                            location, skill, data['frequency'], data['job_count'],
-                            round(avg_salary, 2), related_jobs
-                        ))
-                        results_stored += 1
+            writer.close()
+            print(f"✅ Analysis completed! Stored {results_stored} location-skill records")
 
-        print(f"✅ Analysis completed! Stored {results_stored} location-skill records")
+            # Print summary
+            print("\n🌍 Top Locations for Skills Analysis:")
+            location_counts = {loc: len(skills) for loc, skills in location_skill_data.items() if len(skills) >= 10}
+            sorted_locations = sorted(location_counts.items(), key=lambda x: x[1], reverse=True)[:10]
 
-        # Print summary
-        print("\n🌍 Top Locations for Skills Analysis:")
-        location_counts = {loc: len(skills) for loc, skills in location_skill_data.items() if len(skills) >= 10}
-        sorted_locations = sorted(location_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            for location, skill_count in sorted_locations:
+                skills_data = location_skill_data[location]
+                more = "+" if skills_data.error_bound() else ""
+                print(f"  • {location}: {skill_count}{more} unique skills, {skills_data.total} job opportunities")
 
-        for location, skill_count in sorted_locations:
-            total_jobs = sum(skill_data['job_count'] for skill_data in location_skill_data[location].values())
-            print(f"  • {location}: {skill_count} unique skills, {total_jobs} job opportunities")
+            return True
 
-        return True
+        except Exception as e:
+            print(f"❌ Analysis failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+def create_visitor():
+    """Create the shared-scan visitor for this analysis"""
+    return SkillsDemandByLocationVisitor()
 
-    except Exception as e:
-        print(f"❌ Analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+def run_analysis(connection):
+    """Main analysis function"""
+    return run_visitor(connection, create_visitor())
 
 if __name__ == "__main__":
     import sys
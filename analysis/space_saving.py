@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Heavy Hitters
+Space-Saving summaries that keep the top items of a stream in bounded memory
+"""
+
+import numpy as np
+
+# Items counted per summary; the top 15-25 of a group are reported, so a few
+# hundred slots leave plenty of margin for their counts to be exact
+TOP_K_CAPACITY = 200
+
+# Items buffered before they are folded into the summary in one batch
+TOP_K_BATCH_SIZE = 65536
+
+class SpaceSaving:
+    """Space-Saving top-k summary with at most `capacity` counted items
+
+    Each kept item has a count that over-estimates its true count by at most
+    its error, and every item that was dropped occurred at most floor times,
+    where floor <= total / capacity. Items are buffered and folded in by
+    batch; summaries merge (Parallel Space Saving), so partial results of
+    chunks, workers or incremental runs combine with the same guarantees.
+
+    An optional numeric value per update (e.g. a salary) is summed for kept
+    items; values seen while an item was not kept are lost, so value_mean()
+    is exact for items that were never dropped.
+
+    most_common() breaks ties by first occurrence, like Counter.
+    """
+
+    def __init__(self, capacity=TOP_K_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}  # item -> count (upper bound of its true count)
+        self.errors = {}  # item -> maximum over-count
+        self.first_seen = {}  # item -> arrival order, for tie breaking
+        self.value_sums = {}
+        self.value_counts = {}
+        self.floor = 0  # upper bound on the count of any item not kept
+        self.total = 0
+        self.seen = 0
+        self.pending = []
+        self.pending_size = 0
+
+    def update(self, items, value=None):
+        """Count every item of a list or array, attaching value to each if given"""
+        if len(items):
+            self.pending.append((items, value))
+            self.pending_size += len(items)
+            if self.pending_size >= TOP_K_BATCH_SIZE:
+                self.flush()
+
+    def flush(self):
+        """Fold buffered items into the summary"""
+        if not self.pending:
+            return
+        items = np.concatenate([np.asarray(part, dtype=object if not isinstance(part, np.ndarray) else None)
+                                for part, value in self.pending])
+        values = np.concatenate([np.full(len(part), np.nan if value is None else float(value))
+                                 for part, value in self.pending])
+        self.pending = []
+        self.pending_size = 0
+
+        unique, first_index, inverse, counts = np.unique(items, return_index=True, return_inverse=True,
+                                                         return_counts=True)
+        valued = ~np.isnan(values)
+        value_sums = np.bincount(inverse[valued], weights=values[valued], minlength=len(unique))
+        value_counts = np.bincount(inverse[valued], minlength=len(unique))
+
+        # Batch items in order of first occurrence, counted exactly
+        order = np.argsort(first_index, kind='stable')
+        batch = unique[order].tolist()
+        self._combine(dict(zip(batch, counts[order].tolist())), {}, 0, int(counts.sum()),
+                      dict(zip(batch, value_sums[order].tolist())), dict(zip(batch, value_counts[order].tolist())))
+
+    def _combine(self, counts, errors, floor, total, value_sums, value_counts):
+        """Merge another summary's items in (items missing on one side count that side's floor)"""
+        for item, count in self.counts.items():
+            if item not in counts:
+                self.counts[item] = count + floor
+                self.errors[item] += floor
+        for item, count in counts.items():
+            if item in self.counts:
+                self.counts[item] += count
+                self.errors[item] += errors.get(item, 0)
+            else:
+                self.counts[item] = self.floor + count
+                self.errors[item] = self.floor + errors.get(item, 0)
+                self.first_seen[item] = self.seen
+                self.seen += 1
+            if value_counts.get(item):
+                self.value_sums[item] = self.value_sums.get(item, 0.0) + value_sums[item]
+                self.value_counts[item] = self.value_counts.get(item, 0) + value_counts[item]
+        self.floor += floor
+        self.total += total
+
+        if len(self.counts) > self.capacity:
+            ranked = sorted(self.counts, key=lambda item: (-self.counts[item], self.first_seen[item]))
+            for item in ranked[self.capacity:]:
+                self.floor = max(self.floor, self.counts.pop(item))
+                del self.errors[item]
+                del self.first_seen[item]
+                self.value_sums.pop(item, None)
+                self.value_counts.pop(item, None)
+
+    def merge(self, other):
+        """Fold another summary into this one"""
+        other.flush()
+        self.flush()
+        ordered = sorted(other.counts, key=other.first_seen.get)
+        self._combine({item: other.counts[item] for item in ordered}, other.errors, other.floor, other.total,
+                      other.value_sums, other.value_counts)
+        return self
+
+    def most_common(self, n=None):
+        """(item, count) pairs, highest count first"""
+        self.flush()
+        ranked = sorted(self.counts, key=lambda item: (-self.counts[item], self.first_seen[item]))[:n]
+        return [(self._export(item), self.counts[item]) for item in ranked]
+
+    def guaranteed(self, item):
+        """Lower bound on the true count of a kept item"""
+        self.flush()
+        return self.counts[item] - self.errors[item]
+
+    def value_mean(self, item):
+        """Mean of the values attached to a kept item (0 if none)"""
+        self.flush()
+        count = self.value_counts.get(item)
+        return self.value_sums[item] / count if count else 0
+
+    def error_bound(self):
+        """Maximum over-count of any item (the count of the largest dropped item)"""
+        self.flush()
+        return self.floor
+
+    def __len__(self):
+        """Number of items currently kept"""
+        self.flush()
+        return len(self.counts)
+
+    def _export(self, item):
+        """Item as reported and stored in checkpoints"""
+        return item
+
+    def _import(self, key):
+        """Item from its checkpoint key"""
+        return key
+
+    def to_state(self):
+        """JSON-serializable state"""
+        self.flush()
+        ordered = sorted(self.counts, key=self.first_seen.get)
+        return {
+            'floor': self.floor,
+            'total': self.total,
+            'items': [[self._export(item), self.counts[item], self.errors[item],
+                       self.value_sums.get(item, 0.0), self.value_counts.get(item, 0)] for item in ordered],
+        }
+
+    def merge_state(self, state):
+        """Fold a state produced by to_state() into this summary
+
+        Plain {item: count} mappings (checkpoints of exact counters) are
+        merged as exact counts.
+        """
+        self.flush()
+        if 'items' not in state or not isinstance(state.get('items'), list):
+            counts = {self._import(key): count for key, count in state.items()}
+            self._combine(counts, {}, 0, sum(counts.values()), {}, {})
+            return self
+        items = [(self._import(key), count, error, value_sum, value_count)
+                 for key, count, error, value_sum, value_count in state['items']]
+        self._combine({item: count for item, count, error, value_sum, value_count in items},
+                      {item: error for item, count, error, value_sum, value_count in items},
+                      state['floor'], state['total'],
+                      {item: value_sum for item, count, error, value_sum, value_count in items},
+                      {item: value_count for item, count, error, value_sum, value_count in items})
+        return self
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Row Streaming Helpers
+Generators that read large tables in bounded chunks instead of fetchall()
+"""
+
+import queue
+import threading
+import pymysql
+
+# Rows fetched per round trip when streaming the source table
+STREAM_CHUNK_SIZE = 5000
+
+# Chunks read ahead on a background thread while the current chunk is processed
+PREFETCH_CHUNKS = 2
+
+def stream_rows(connection, query, params=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield rows from an unbuffered server-side cursor (SSDictCursor)
+
+    Rows are pulled from the server chunk_size at a time, so memory stays flat
+    regardless of table size. The connection cannot run other queries until
+    the generator is exhausted or closed.
+    """
+    cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+def keyset_rows(connection, table, columns, key='id', chunk_size=STREAM_CHUNK_SIZE, start_after=None):
+    """Yield rows in primary-key order using keyset pagination
+
+    Each page is a short `WHERE key > last ORDER BY key LIMIT n` query, so the
+    connection is free between pages and no server-side cursor is held open.
+    `table` may be a join expression with a qualified key such as `c.id`.
+    """
+    select_columns = list(columns) if key in columns else [key] + list(columns)
+    column_list = ', '.join(select_columns)
+    row_key = key.split('.')[-1]
+    last_key = start_after
+
+    while True:
+        cursor = connection.cursor()
+        if last_key is None:
+            cursor.execute(f"SELECT {column_list} FROM {table} ORDER BY {key} LIMIT %s", (chunk_size,))
+        else:
+            cursor.execute(f"SELECT {column_list} FROM {table} WHERE {key} > %s ORDER BY {key} LIMIT %s",
+                           (last_key, chunk_size))
+        rows = cursor.fetchall()
+        cursor.close()
+
+        if not rows:
+            return
+        yield from rows
+
+        if len(rows) < chunk_size:
+            return
+        last_key = rows[-1][row_key]
+
+def prefetch(rows, chunk_size=STREAM_CHUNK_SIZE, depth=PREFETCH_CHUNKS):
+    """Read rows on a background thread so network transfer overlaps processing
+
+    At most `depth` chunks are buffered, keeping memory bounded. Errors raised
+    while reading are re-raised in the consuming thread.
+    """
+    chunks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    if not put(chunk):
+                        return
+                    chunk = []
+            if chunk:
+                put(chunk)
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=producer, name='scan-prefetch', daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests: Skill Co-occurrence Matrix
+Sparse pair counts and weighted sums agree with counting every job's pairs directly,
+and association metrics follow their definitions
+"""
+
+import sys
+import os
+import random
+from collections import Counter
+from itertools import combinations
+import math
+import numpy as np
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.cooccurrence import SkillCooccurrence, association_metrics
+
+VOCABULARY_SIZE = 30
+
+def make_jobs(count, seed=11):
+    generator = random.Random(seed)
+    return [np.array(generator.sample(range(VOCABULARY_SIZE), generator.randint(0, 6)), dtype=np.int32)
+            for _ in range(count)]
+
+def brute_force_pairs(jobs, skill_ids, weights=None):
+    """{(i, j): summed weight} over columns i < j of skill_ids, counting each job's pairs"""
+    column_of = {skill_id: column for column, skill_id in enumerate(skill_ids)}
+    totals = Counter()
+    for row, job in enumerate(jobs):
+        columns = sorted(column_of[skill_id] for skill_id in job if skill_id in column_of)
+        for pair in combinations(columns, 2):
+            totals[pair] += 1 if weights is None else weights[row]
+    return totals
+
+def test_pair_counts_match_brute_force():
+    jobs = make_jobs(500)
+    skill_ids = [7, 3, 12, 0, 25, 18, 4, 9, 29, 15]
+    matrix = SkillCooccurrence(jobs, skill_ids, VOCABULARY_SIZE)
+    rows, columns, counts = matrix.pairs()
+    assert dict(zip(zip(rows.tolist(), columns.tolist()), counts.tolist())) == brute_force_pairs(jobs, skill_ids)
+    assert matrix.job_count == 500
+
+def test_marginals_count_jobs_per_skill():
+    jobs = make_jobs(300)
+    skill_ids = list(range(VOCABULARY_SIZE))
+    marginals = SkillCooccurrence(jobs, skill_ids, VOCABULARY_SIZE).marginals()
+    expected = Counter(int(skill_id) for job in jobs for skill_id in job)
+    assert marginals.tolist() == [expected[skill_id] for skill_id in skill_ids]
+
+def test_min_count_drops_rare_pairs():
+    jobs = make_jobs(400)
+    skill_ids = list(range(VOCABULARY_SIZE))
+    rows, columns, counts = SkillCooccurrence(jobs, skill_ids, VOCABULARY_SIZE).pairs(min_count=5)
+    expected = {pair: count for pair, count in brute_force_pairs(jobs, skill_ids).items() if count >= 5}
+    assert dict(zip(zip(rows.tolist(), columns.tolist()), counts.tolist())) == expected
+
+def test_weighted_sums_match_brute_force():
+    jobs = make_jobs(200)
+    weights = [random.Random(row).uniform(0, 10) for row in range(len(jobs))]
+    skill_ids = [2, 5, 8, 11, 14]
+    matrix = SkillCooccurrence(jobs, skill_ids, VOCABULARY_SIZE)
+    rows, columns, _ = matrix.pairs()
+    sums = SkillCooccurrence.values(matrix.weighted(weights), rows, columns)
+    expected = brute_force_pairs(jobs, skill_ids, weights)
+    for row, column, total in zip(rows, columns, sums):
+        assert abs(total - expected[(row, column)]) < 1e-9
+
+def test_no_jobs_gives_no_pairs():
+    rows, columns, counts = SkillCooccurrence([], [1, 2], VOCABULARY_SIZE).pairs()
+    assert len(rows) == len(columns) == len(counts) == 0
+
+def test_top_k_per_skill_keeps_pairs_ranked_k_or_better_for_either_skill():
+    generator = random.Random(3)
+    pairs = [(i, j) for i, j in combinations(range(8), 2) if generator.random() < 0.7]
+    rows = np.array([i for i, _ in pairs])
+    columns = np.array([j for _, j in pairs])
+    scores = np.array([generator.randint(0, 5) for _ in pairs], dtype=np.float64)
+
+    kept = set(SkillCooccurrence.top_k_per_skill(rows, columns, scores, 2).tolist())
+
+    expected = set()
+    for skill in range(8):
+        # Ties keep the earlier pair
+        own = [index for index, pair in enumerate(pairs) if skill in pair]
+        expected.update(sorted(own, key=lambda index: -scores[index])[:2])
+    assert kept == expected
+
+def test_association_metrics_follow_their_definitions():
+    # 100 jobs: a in 20, b in 40, both in 10
+    metrics = association_metrics([10], [20], [40], 100)
+    assert metrics['support'][0] == 0.1
+    assert metrics['confidence_first'][0] == 0.5
+    assert metrics['confidence_second'][0] == 0.25
+    assert math.isclose(metrics['lift'][0], 0.1 / (0.2 * 0.4))
+    assert math.isclose(metrics['pmi'][0], math.log2(1.25))
+    assert math.isclose(metrics['jaccard'][0], 10 / 50)
+
+def test_independent_skills_have_lift_one_and_zero_pmi():
+    metrics = association_metrics([8, 5], [40, 10], [20, 50], 100)
+    assert np.allclose(metrics['lift'], 1.0)
+    assert np.allclose(metrics['pmi'], 0.0)
+
+def test_metrics_match_sets_of_jobs():
+    jobs = make_jobs(300, seed=5)
+    matrix = SkillCooccurrence(jobs, list(range(VOCABULARY_SIZE)), VOCABULARY_SIZE)
+    rows, columns, counts = matrix.pairs()
+    marginals = matrix.marginals()
+    metrics = association_metrics(counts, marginals[rows], marginals[columns], matrix.job_count)
+
+    job_sets = {skill: {row for row, job in enumerate(jobs) if skill in job} for skill in range(VOCABULARY_SIZE)}
+    for n, (first, second) in enumerate(zip(rows, columns)):
+        both = job_sets[first] & job_sets[second]
+        assert math.isclose(metrics['jaccard'][n], len(both) / len(job_sets[first] | job_sets[second]))
+        assert math.isclose(metrics['confidence_first'][n], len(both) / len(job_sets[first]))
+
+def test_pairs_without_jobs_score_zero():
+    metrics = association_metrics([0, 0], [0, 5], [0, 7], 100)
+    for name, values in metrics.items():
+        assert values.tolist() == [0.0, 0.0], name
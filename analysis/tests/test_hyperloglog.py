@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests: Distinct Counting
+HyperLogLog counts stay within their error bound, and merged or checkpointed counters agree with a single one
+"""
+
+import sys
+import os
+import json
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.hyperloglog import DistinctCounter, DISTINCT_EXACT_LIMIT, value_hash
+
+# ~1.6% standard error at the default precision; allow three of them
+RELATIVE_TOLERANCE = 0.05
+
+def counter_of(values):
+    counter = DistinctCounter()
+    for value in values:
+        counter.add(value)
+    return counter
+
+def test_value_hash_is_stable():
+    assert value_hash('Infosys') == value_hash('Infosys')
+    assert value_hash(42) == value_hash('42')
+    assert value_hash('Infosys') != value_hash('infosys')
+
+def test_small_counters_are_exact():
+    counter = counter_of(['Pune', 'Mumbai', 'Pune', 'Delhi'] * 10)
+    assert counter.count() == len(counter) == 3
+    assert counter.registers is None
+    assert counter_of(range(DISTINCT_EXACT_LIMIT)).count() == DISTINCT_EXACT_LIMIT
+
+def test_large_counters_stay_within_the_error_bound():
+    for distinct in (DISTINCT_EXACT_LIMIT + 1, 1000, 20000, 200000):
+        counter = counter_of(f"company-{number % distinct}" for number in range(distinct * 2))
+        assert counter.registers is not None
+        assert abs(counter.count() - distinct) <= RELATIVE_TOLERANCE * distinct, distinct
+
+def test_merge_equals_counting_the_union():
+    # Overlapping parts, some small enough to still be exact
+    parts = [[f"location-{number}" for number in range(start, start + size)]
+             for start, size in ((0, 100), (50, 100), (120, 5000), (3000, 30000))]
+    merged = DistinctCounter()
+    for part in parts:
+        merged.merge(counter_of(part))
+    single = counter_of(value for part in parts for value in part)
+    assert merged.registers == single.registers
+    assert merged.count() == single.count()
+
+def test_merging_exact_counters_stays_exact_until_the_limit():
+    first = counter_of(range(100))
+    first.merge(counter_of(range(50, 150)))
+    assert first.registers is None and first.count() == 150
+    first.merge(counter_of(range(150, DISTINCT_EXACT_LIMIT + 10)))
+    assert first.registers is not None
+
+def test_merging_into_a_dense_counter():
+    dense = counter_of(range(1000))
+    dense.merge(counter_of(['extra', 1, 2]))
+    assert dense.registers == counter_of(list(range(1000)) + ['extra']).registers
+
+def test_checkpoint_state_round_trips():
+    for values in (range(10), range(5000)):
+        counter = counter_of(values)
+        state = json.loads(json.dumps(counter.to_state()))
+        restored = DistinctCounter.from_state(state)
+        assert restored.count() == counter.count()
+        assert restored.registers == counter.registers
+        assert DistinctCounter().merge_state(state).count() == counter.count()
+
+def test_legacy_list_state_is_added_value_by_value():
+    counter = counter_of(['Pune'])
+    counter.merge_state(['Pune', 'Mumbai', 'Delhi'])
+    assert counter.count() == 3
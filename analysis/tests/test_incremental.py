@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests: Incremental Analysis Checkpoints
+Checkpointed state merges back exactly and keeps its skills' stored IDs
+"""
+
+import sys
+import os
+import json
+from collections import Counter, defaultdict
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import analysis.skill_vocabulary as skill_vocabulary
+from analysis.skill_vocabulary import SkillVocabulary
+from analysis.incremental import plain_state, merge_into, restore_visitor, checkpoint_visitor
+
+class FakeCursor:
+    def __init__(self, database):
+        self.database = database
+        self.rows = []
+
+    def execute(self, query, params=()):
+        query = ' '.join(query.split())
+        database = self.database
+        if query.startswith('SELECT last_id, state FROM analysis_checkpoints'):
+            self.rows = [database.checkpoints[params[0]]] if params[0] in database.checkpoints else []
+        elif query.startswith('REPLACE INTO analysis_checkpoints'):
+            database.checkpoints[params[0]] = {'last_id': params[1], 'state': params[2]}
+        elif query.startswith('SELECT skill_id, skill FROM skill_vocabulary'):
+            self.rows = [{'skill_id': skill_id, 'skill': skill} for skill_id, skill in sorted(database.vocabulary.items())]
+        else:
+            self.rows = []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+class FakeConnection:
+    def __init__(self, vocabulary=None):
+        self.vocabulary = dict(vocabulary or {})
+        self.checkpoints = {}
+
+    def cursor(self):
+        return FakeCursor(self)
+
+def fresh_vocabulary(monkeypatch):
+    """Replace the process-wide vocabulary, as a new worker process would start with"""
+    vocabulary = SkillVocabulary()
+    monkeypatch.setattr(skill_vocabulary, '_vocabulary', vocabulary)
+    return vocabulary
+
+def top_skills_visitor():
+    from analysis.top_skills_by_job_type import TopSkillsByJobTypeVisitor
+    return TopSkillsByJobTypeVisitor()
+
+def test_plain_state_merges_back_exactly():
+    target = {'counts': Counter({'a': 1}), 'nested': defaultdict(Counter), 'seen': {'x'}, 'total': 2}
+    target['nested']['Pune']['b'] = 3
+    state = json.loads(json.dumps(plain_state(target)))
+    merge_into(target, state)
+    assert target['counts'] == Counter({'a': 2})
+    assert target['nested']['Pune'] == Counter({'b': 6})
+    assert target['seen'] == {'x'}
+    assert target['total'] == 4
+
+def test_restored_skills_keep_their_stored_ids(monkeypatch):
+    connection = FakeConnection({0: 'Sql', 1: 'Python'})
+
+    # A previous run checkpointed Python:2, Java:1
+    fresh_vocabulary(monkeypatch)
+    previous = top_skills_visitor()
+    previous.job_type_counts['Engineer/Developer'] = 2
+    previous.job_type_skills['Engineer/Developer'].update(['Python', 'Java', 'Python'])
+    previous.processed_jobs = 2
+    checkpoint_visitor(connection, previous, 10)
+
+    # A new process restores it before anything loaded the vocabulary
+    vocabulary = fresh_vocabulary(monkeypatch)
+    visitor = top_skills_visitor()
+    assert restore_visitor(connection, visitor)
+    assert vocabulary.loaded
+    assert visitor.watermark == 10
+
+    # The scan engine's load (or a reload) must not renumber the restored skills
+    vocabulary.load(connection)
+    assert vocabulary.ids['Python'] == 1
+    assert visitor.job_type_skills['Engineer/Developer'].most_common() == [('Python', 2), ('Java', 1)]
+
+def test_restore_without_checkpoint_leaves_the_vocabulary_alone(monkeypatch):
+    vocabulary = fresh_vocabulary(monkeypatch)
+    assert not restore_visitor(FakeConnection({0: 'Sql'}), top_skills_visitor())
+    assert not vocabulary.loaded
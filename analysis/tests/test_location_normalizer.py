@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests: Location Normalizer
+LocationEngine agrees with the LocationNormalizer.normalize_location it replaced
+"""
+
+import sys
+import os
+import re
+import random
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.location_normalizer import LocationEngine, CITY_MAPPINGS, load_gazetteer, GAZETTEER_PATH
+
+def old_normalize_location(location):
+    """data_utils LocationNormalizer.normalize_location, as it was"""
+    if not location:
+        return "Unknown"
+
+    location_str = str(location).strip()
+
+    # Handle hybrid/remote locations
+    if 'hybrid' in location_str.lower():
+        # Extract city from "Hybrid - Bengaluru"
+        match = re.search(r'hybrid\s*-\s*([^,()]+)', location_str, re.IGNORECASE)
+        if match:
+            location_str = match.group(1).strip()
+
+    # Handle multiple locations - take the first one
+    if ',' in location_str:
+        location_str = location_str.split(',')[0].strip()
+
+    # Handle locations with additional info in parentheses
+    location_str = re.sub(r'\([^)]*\)', '', location_str).strip()
+
+    location_lower = location_str.lower()
+    for key, value in CITY_MAPPINGS.items():
+        if key in location_lower:
+            return value
+
+    # Return title case if not found in mappings
+    return location_str.title() if len(location_str) > 2 else "Unknown"
+
+PIECES = list(CITY_MAPPINGS) + ['Bengaluru', 'NEW DELHI', 'Navi Mumbai', 'Thane', 'Remote', 'Hybrid', 'Hybrid -',
+                                'hybrid-', 'India', 'Karnataka', 'Sector 62', 'ko', 'chi', 'surat-', 'vadodara.',
+                                'Work From Home', 'Greater Noida', 'Delhi/NCR', 'Pan India', 'WFH', 'Bhopal', 'Goa']
+SEPARATORS = [' ', ', ', ' - ', '/', '(', ')', '', '  ']
+
+def make_locations(count, seed=21):
+    generator = random.Random(seed)
+    locations = [None, '', ' ', 'ab', 'Goa', '(Remote)', 'Hybrid - Pune', 'Hybrid - ', 'Mumbai (All Areas)', 42]
+    for _ in range(count):
+        parts = generator.choices(PIECES, k=generator.randint(1, 4))
+        text = parts[0]
+        for part in parts[1:]:
+            text += generator.choice(SEPARATORS) + part
+        if generator.random() < 0.3:
+            text = text.upper() if generator.random() < 0.5 else text.lower()
+        locations.append(text)
+    return locations
+
+def test_without_gazetteer_matches_the_old_function():
+    engine = LocationEngine()
+    for location in make_locations(20000):
+        assert engine.normalize(location) == old_normalize_location(location), location
+
+def test_gazetteer_aliases_match_whole_words_after_built_in_cities():
+    engine = LocationEngine(gazetteer={'thane': 'Thane', 'bombay': 'Mumbai', 'goa': 'Goa', 'navi mumbai': 'Navi Mumbai'})
+    assert engine.normalize('Thane West') == 'Thane'
+    assert engine.normalize('Bombay, Maharashtra') == 'Mumbai'
+    assert engine.normalize('Thanesar') == 'Thanesar'
+    assert engine.normalize('Goalpara') == 'Goalpara'
+    # Built-in substrings win over gazetteer aliases
+    assert engine.normalize('Navi Mumbai') == 'Mumbai'
+
+def test_gazetteer_file_loads():
+    gazetteer = load_gazetteer(GAZETTEER_PATH)
+    assert gazetteer['bombay'] == 'Mumbai'
+    assert all(alias == alias.lower() for alias in gazetteer)
+
+def test_lookup_is_reset_when_full():
+    engine = LocationEngine(cache_size=10)
+    locations = make_locations(100, seed=3)
+    first = [engine.normalize(location) for location in locations]
+    assert len(engine.lookup) <= 10
+    assert [engine.normalize(location) for location in locations] == first
+
+class FakeCursor:
+    def __init__(self, locations):
+        self.locations = locations
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+
+    def fetchall(self):
+        return [{'location': location} for location in self.locations]
+
+class FakeConnection:
+    def __init__(self, locations):
+        self.cursor_instance = FakeCursor(locations)
+
+    def cursor(self):
+        return self.cursor_instance
+
+def test_warm_fills_the_lookup():
+    engine = LocationEngine()
+    connection = FakeConnection(['Hybrid - Bengaluru', 'Pune, Mumbai', 'Goa'])
+    assert engine.warm(connection)
+    assert engine.lookup == {'Hybrid - Bengaluru': 'Bangalore', 'Pune, Mumbai': 'Pune', 'Goa': 'Goa'}
+    assert 'FROM jobs_complete' in connection.cursor_instance.queries[0]
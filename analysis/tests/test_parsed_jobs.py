@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests: Parsed Jobs Materialization
+Parsed fields, the stored row layout and the scan columns they save
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.parsed_jobs import parse_job, create_jobs_parsed_table, _store_parsed
+from analysis.scan_engine import ScanEngine
+from analysis.top_skills_by_job_type import TopSkillsByJobTypeVisitor
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.row = None
+
+    def execute(self, query, params=None):
+        self.connection.queries.append(' '.join(query.split()))
+        if 'information_schema.COLUMNS' in query:
+            self.row = {'column_count': int(self.connection.has_column)}
+
+    def executemany(self, query, rows):
+        self.connection.stored.extend(rows)
+
+    def fetchone(self):
+        return self.row
+
+class FakeConnection:
+    def __init__(self, has_column):
+        self.has_column = has_column
+        self.queries = []
+        self.stored = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+def test_parse_job_flags_descriptions_and_splits_skills():
+    parsed = parse_job({'tags_and_skills': 'Python, SQL', 'job_description': 'Needs python and Docker'},
+                       ('skills', 'description_skills', 'has_description'))
+    assert parsed['skills'] == ['Python', 'Sql']
+    assert 'python' not in [skill.lower() for skill in parsed['description_skills']]
+    assert parsed['has_description'] is True
+    assert parse_job({'job_description': ''}, ('has_description',)) == {'has_description': False}
+    assert parse_job({}, ('has_description',)) == {'has_description': False}
+
+def test_store_parsed_writes_the_description_flag():
+    connection = FakeConnection(has_column=True)
+    _store_parsed(connection.cursor(), [
+        {'id': 1, 'title': 'Data Analyst', 'tags_and_skills': 'SQL', 'job_description': 'Reports'},
+        {'id': 2, 'title': 'Data Analyst', 'tags_and_skills': 'SQL', 'job_description': None},
+    ])
+    assert [row[-1] for row in connection.stored] == [1, 0]
+
+def test_existing_table_gets_the_flag_backfilled():
+    connection = FakeConnection(has_column=False)
+    create_jobs_parsed_table(connection)
+    assert any(query.startswith('ALTER TABLE jobs_parsed ADD COLUMN has_description') for query in connection.queries)
+    assert connection.queries[-1].startswith('UPDATE jobs_parsed p JOIN jobs_complete c')
+
+    connection = FakeConnection(has_column=True)
+    create_jobs_parsed_table(connection)
+    assert not any(query.startswith(('ALTER', 'UPDATE')) for query in connection.queries)
+
+def test_top_skills_scan_does_not_read_descriptions_from_jobs_parsed():
+    engine = ScanEngine(parsed_table='jobs_parsed')
+    engine.register(TopSkillsByJobTypeVisitor())
+    assert 'c.job_description' not in engine.select_columns()
+    assert 'p.has_description' in engine.select_columns()
+
+    visitor = engine.visitors[0]
+    assert visitor.accepts({'tags_and_skills': '', 'has_description': 1})
+    assert not visitor.accepts({'tags_and_skills': None, 'has_description': 0})
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests: Aggregation Pushdown
+The SQL CASE built from TITLE_LEVELS groups titles the way classify_title does
+"""
+
+import sys
+import os
+import random
+import sqlite3
+from collections import Counter
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.title_classifier import TITLE_LEVELS, classify_title
+from analysis.pushdown import title_case_sql, grouped_totals
+
+def as_bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode('utf-8')
+
+def mysql_like_database(rows):
+    """SQLite database with a jobs_complete table and the MySQL functions the pushdown uses"""
+    database = sqlite3.connect(':memory:')
+    database.row_factory = sqlite3.Row
+    database.create_function('LOCATE', 2, lambda keyword, text: 0 if text is None else
+                             as_bytes(text).find(as_bytes(keyword)) + 1)
+    database.create_function('CHAR_LENGTH', 1, lambda text: None if text is None else len(text))
+    # MySQL lowers non-ASCII letters too; SQLite's built-in LOWER() does not
+    database.create_function('LOWER', 1, lambda text: None if text is None else str(text).lower())
+    database.execute("CREATE TABLE jobs_complete (title, company, openings)")
+    database.executemany("INSERT INTO jobs_complete VALUES (?, ?, ?)", rows)
+    return database
+
+def sqlite_query(query):
+    return query.replace('%s', '?').replace('AS BINARY', 'AS BLOB')
+
+class FakeCursor:
+    def __init__(self, database):
+        self.database = database
+        self.rows = []
+
+    def execute(self, query, params=()):
+        self.rows = [dict(row) for row in self.database.execute(sqlite_query(query), params)]
+
+    def fetchall(self):
+        return self.rows
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+
+    def cursor(self):
+        return FakeCursor(self.database)
+
+WORDS = ['senior', 'data', 'engineer', 'developer', 'analyst', 'business', 'manager', 'lead', 'head', 'scientist',
+         'intern', 'trainee', 'consultant', 'advisor', 'designer', 'ui', 'ux', 'marketing', 'sales', 'qa', 'test',
+         'ml', 'ai', 'software', 'backend', 'frontend', 'full stack', 'product', 'project', 'cto', 'vp',
+         'architect', 'principal', 'staff', 'assistant', 'retail', 'html', 'Chef', 'Nurse', 'Ärzt', 'Ünlü']
+
+def make_titles(count, seed=23):
+    generator = random.Random(seed)
+    titles = [None, '', 'Accountant', 'ACCOUNTANT', 'accountant']
+    for _ in range(count):
+        title = ' '.join(generator.choices(WORDS, k=generator.randint(1, 4)))
+        titles.append(title.upper() if generator.random() < 0.2 else title.title() if generator.random() < 0.3 else title)
+    return titles
+
+def test_case_expression_matches_classify_title_at_every_level():
+    titles = make_titles(3000)
+    database = mysql_like_database([(title, None, None) for title in titles])
+    for level_name in TITLE_LEVELS:
+        case_sql, params = title_case_sql(level_name)
+        rows = database.execute(sqlite_query(f"SELECT title, {case_sql} AS group_key FROM jobs_complete"), params)
+        for row in rows:
+            key = row['group_key'].decode('utf-8')
+            if TITLE_LEVELS[level_name].fallback is None and key == (row['title'] or '').lower():
+                # Unmatched titles come back lowered; grouped_totals classifies them again
+                key = classify_title(key, level_name)
+            assert key == classify_title(row['title'], level_name), (level_name, row['title'])
+
+def test_grouped_totals_match_classifying_every_row():
+    generator = random.Random(2)
+    rows = [(title, generator.choice(['Infosys', 'TCS', '', None]), generator.randint(1, 5))
+            for title in make_titles(2000, seed=4)]
+    connection = FakeConnection(mysql_like_database(rows))
+
+    for level_name in ('category', 'demand_title', 'pay_title'):
+        totals = grouped_totals(connection, 'jobs_complete', level_name, sums={'openings': 'openings'},
+                                distinct={'companies': 'company'})
+        expected_counts = Counter(classify_title(title, level_name) for title, _, _ in rows)
+        assert {key: group['job_count'] for key, group in totals.items()} == dict(expected_counts)
+
+        expected_openings = Counter()
+        expected_companies = {}
+        for title, company, openings in rows:
+            key = classify_title(title, level_name)
+            expected_openings[key] += openings
+            expected_companies.setdefault(key, set())
+            if company:
+                expected_companies[key].add(company)
+        for key, group in totals.items():
+            assert group['openings'] == expected_openings[key]
+            assert group['companies'] == len(expected_companies[key])
+
+def test_where_clause_and_params_line_up():
+    connection = FakeConnection(mysql_like_database([('Data Analyst', 'A', 1), ('Data Analyst', 'B', 1),
+                                                     ('Chef', 'A', 1)]))
+    totals = grouped_totals(connection, 'jobs_complete', 'category', where="company = 'A'")
+    assert totals == {'Data Analyst': {'job_count': 1}, 'Other': {'job_count': 1}}
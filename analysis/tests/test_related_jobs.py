@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests: Related Jobs Resolver
+Lookups answered from an indexed jobs_latest snapshot, in the old queries' order
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.related_jobs import RelatedJobsResolver, _salary_sort_value
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.connection.queries.append(query)
+        if 'COUNT(*) AS row_count' in query:
+            rows = self.connection.rows
+            self.rows = [{'row_count': len(rows), 'max_job_id': max((row['job_id'] for row in rows), default=None)}]
+        else:
+            self.rows = [dict(row) for row in self.connection.rows]
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    """jobs_latest rows served to the resolver"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+def job(job_id, title, salary=None, **fields):
+    return dict({'job_id': job_id, 'title': title, 'company': 'Acme', 'location': 'Pune', 'salary': salary}, **fields)
+
+def resolve(resolver, connection, **criteria):
+    key = resolver.request(**criteria)
+    resolver.resolve(connection)
+    return [row['job_id'] for row in resolver.get(key)]
+
+def test_salary_sort_value_matches_the_old_order_by():
+    assert _salary_sort_value('₹5,00,000 - 7,00,000') == 500000700000.0
+    assert _salary_sort_value('12.5 LPA') == 12.5
+    # COALESCE(salary, '0'): missing and unparseable salaries rank as 0
+    assert _salary_sort_value(None) == _salary_sort_value('Not disclosed') == _salary_sort_value('0') == 0.0
+
+def test_missing_salaries_tie_with_zero_salaries_in_table_order():
+    connection = FakeConnection([
+        job('J1', 'Data Analyst', None),
+        job('J2', 'Data Analyst', '8 LPA'),
+        job('J3', 'Data Analyst', 'Not disclosed'),
+        job('J4', 'Data Analyst', '0'),
+        job('J5', 'Data Analyst', '12 LPA'),
+    ])
+    resolver = RelatedJobsResolver()
+    assert resolve(resolver, connection, title='analyst', order_by='salary') == ['J5', 'J2', 'J1', 'J3', 'J4']
+
+def test_identical_lookups_share_one_answer():
+    connection = FakeConnection([job('J1', 'Java Developer'), job('J2', 'Python Developer')])
+    resolver = RelatedJobsResolver()
+    first = resolver.request(title='Developer', location='pune')
+    second = resolver.request(location='PUNE', title='developer')
+    assert first == second
+    resolver.resolve(connection)
+    assert [row['job_id'] for row in resolver.get(first)] == ['J1', 'J2']
+
+def test_refresh_reloads_only_when_jobs_latest_changes():
+    connection = FakeConnection([job('J1', 'Java Developer')])
+    resolver = RelatedJobsResolver()
+    assert resolver.refresh(connection)
+    assert resolve(resolver, connection, title='developer') == ['J1']
+    assert not resolver.refresh(connection)
+
+    connection.rows.append(job('J2', 'Python Developer'))
+    assert resolver.refresh(connection)
+    assert resolve(resolver, connection, title='developer') == ['J1', 'J2']
+
+def test_partial_word_lookups_use_the_index():
+    connection = FakeConnection([job('J1', 'JavaScript Engineer'), job('J2', 'Java Developer'),
+                                 job('J3', 'Python Developer')])
+    resolver = RelatedJobsResolver()
+    assert resolve(resolver, connection, title='java') == ['J1', 'J2']
+    assert resolve(resolver, connection, title='script eng') == ['J1']
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Tests: Result Writer
+Bulk writes of analysis rows through batched INSERTs and LOAD DATA files, and shadow-table publishing
+"""
+
+import sys
+import os
+import re
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from pymysql.constants import CLIENT
+from analysis.result_writer import ResultWriter, _tsv_value, restore_previous
+
+LOAD_DATA_ESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', '0': '\0', 'b': '\b', 'Z': '\x1a', '\\': '\\'}
+
+def read_load_data_file(text):
+    """Rows of a file as LOAD DATA reads it with FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'"""
+    rows, row, field, escaped = [], [], [], False
+    for char in text:
+        if escaped:
+            field.append(None if char == 'N' else LOAD_DATA_ESCAPES.get(char, char))
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char in '\t\n':
+            # \N only means NULL when it is the whole field
+            row.append(None if field == [None] else ''.join('N' if part is None else part for part in field))
+            field = []
+            if char == '\n':
+                rows.append(tuple(row))
+                row = []
+        else:
+            field.append(char)
+    return rows
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query, params=None):
+        query = ' '.join(query.split())
+        connection = self.connection
+        tables = connection.tables
+        connection.queries.append(query)
+        if query.startswith('DROP TABLE IF EXISTS'):
+            tables.pop(query.split()[-1], None)
+        elif query.startswith('CREATE TABLE'):
+            name, _, like = query.split()[2:5]
+            assert like in tables and name not in tables
+            tables[name] = []
+        elif query.startswith('RENAME TABLE'):
+            # Renames apply left to right, all in one atomic statement
+            for rename in query[len('RENAME TABLE '):].split(', '):
+                old, new = rename.split(' TO ')
+                assert old in tables and new not in tables, rename
+                tables[new] = tables.pop(old)
+        elif query.startswith('SHOW TABLES LIKE'):
+            self.rows = [{'table': params[0]}] if params[0] in tables else []
+        elif query.startswith('LOAD DATA'):
+            if connection.fail_load_data:
+                raise RuntimeError('local infile disabled on the server')
+            table = re.search(r'INTO TABLE (\w+)', query).group(1)
+            with open(params[0], encoding='utf-8') as tsv_file:
+                connection.tables.setdefault(table, []).extend(read_load_data_file(tsv_file.read()))
+        elif query.startswith('DELETE FROM'):
+            connection.tables[query.split()[2]] = []
+
+    def executemany(self, query, rows):
+        self.connection.queries.append(' '.join(query.split()))
+        table = re.search(r'INSERT INTO (\w+)', query).group(1)
+        self.connection.batches.append(len(rows))
+        self.connection.tables.setdefault(table, []).extend(tuple(row) for row in rows)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+class FakeConnection:
+    def __init__(self, local_infile=False, fail_load_data=False):
+        self.client_flag = CLIENT.LOCAL_FILES if local_infile else 0
+        self.fail_load_data = fail_load_data
+        self.tables = {}
+        self.queries = []
+        self.batches = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+TRICKY_VALUES = [None, '', 'plain', 'tab\there', 'line\nbreak\r\n', 'back\\slash', '\\N', 'N', '\\', 'C:\\new\\table',
+                 'ends with \\', '₹5,00,000 – 7,00,000', 'nul\0byte']
+
+def test_tsv_values_read_back_as_written():
+    rows = [tuple(TRICKY_VALUES[start:start + 3]) for start in range(0, len(TRICKY_VALUES), 3)]
+    rows[-1] = rows[-1] + (None,) * (3 - len(rows[-1]))
+    text = ''.join('\t'.join(_tsv_value(value) for value in row) + '\n' for row in rows)
+    assert read_load_data_file(text) == rows
+
+def test_numbers_are_written_as_text():
+    assert _tsv_value(42) == '42'
+    assert _tsv_value(3.5) == '3.5'
+
+def test_small_outputs_use_batched_inserts():
+    connection = FakeConnection(local_infile=True)
+    writer = ResultWriter(connection, 'analysis_top_paying_jobs', ('job_title', 'avg_salary'),
+                          batch_size=4, load_data_min_rows=100).prepare()
+    for number in range(10):
+        writer.add((f"Job {number}", number * 1000.0))
+    assert writer.close() == 10
+    assert connection.batches == [4, 4, 2]
+    assert connection.queries[0] == 'DELETE FROM analysis_top_paying_jobs'
+    assert not any(query.startswith('LOAD DATA') for query in connection.queries)
+
+def test_large_outputs_are_loaded_from_a_file():
+    connection = FakeConnection(local_infile=True)
+    writer = ResultWriter(connection, 'analysis_skills_by_location', ('location', 'skill'), load_data_min_rows=5).prepare()
+    rows = [(f"City {number}", TRICKY_VALUES[number % len(TRICKY_VALUES)]) for number in range(20)]
+    for row in rows:
+        writer.add(row)
+    assert writer.close() == 20
+    assert connection.batches == []
+    assert connection.tables['analysis_skills_by_location'] == rows
+
+def test_failed_load_data_falls_back_to_inserts():
+    connection = FakeConnection(local_infile=True, fail_load_data=True)
+    writer = ResultWriter(connection, 'analysis_skills_by_location', ('location', 'skill'), load_data_min_rows=5).prepare()
+    for number in range(8):
+        writer.add((f"City {number}", 'SQL'))
+    assert writer.close() == 8
+    assert len(connection.tables['analysis_skills_by_location']) == 8
+
+def test_load_data_needs_local_infile():
+    connection = FakeConnection(local_infile=False)
+    writer = ResultWriter(connection, 'analysis_skills_by_location', ('location', 'skill'), load_data_min_rows=5).prepare()
+    for number in range(8):
+        writer.add((f"City {number}", 'SQL'))
+    writer.close()
+    assert not any(query.startswith('LOAD DATA') for query in connection.queries)
+    assert connection.batches == [8]
+
+def publish(connection, rows, table='analysis_top_paying_jobs'):
+    writer = ResultWriter(connection, table, ('job_title', 'avg_salary'), publish='shadow').prepare()
+    for row in rows:
+        writer.add(row)
+    return writer.close()
+
+def test_shadow_publish_swaps_in_new_rows_and_keeps_the_previous_version():
+    connection = FakeConnection()
+    connection.tables['analysis_top_paying_jobs'] = [('Old Job', 1.0)]
+
+    publish(connection, [('First', 2.0)])
+    assert connection.tables['analysis_top_paying_jobs'] == [('First', 2.0)]
+    assert connection.tables['analysis_top_paying_jobs__prev'] == [('Old Job', 1.0)]
+    assert 'analysis_top_paying_jobs__new' not in connection.tables
+
+    publish(connection, [('Second', 3.0)])
+    assert connection.tables['analysis_top_paying_jobs'] == [('Second', 3.0)]
+    assert connection.tables['analysis_top_paying_jobs__prev'] == [('First', 2.0)]
+
+    # The live table is never emptied or written to directly
+    assert not any(query.startswith(('DELETE FROM analysis_top_paying_jobs', 'INSERT INTO analysis_top_paying_jobs '))
+                   for query in connection.queries)
+
+def test_shadow_publish_replaces_a_leftover_shadow_table():
+    connection = FakeConnection()
+    connection.tables['analysis_top_paying_jobs'] = [('Old Job', 1.0)]
+    connection.tables['analysis_top_paying_jobs__new'] = [('Half written', 0.0)]
+    publish(connection, [('First', 2.0)])
+    assert connection.tables['analysis_top_paying_jobs'] == [('First', 2.0)]
+
+def test_restore_previous_swaps_back_and_is_its_own_undo():
+    connection = FakeConnection()
+    connection.tables['analysis_top_paying_jobs'] = [('Old Job', 1.0)]
+    publish(connection, [('Bad Run', 0.0)])
+
+    assert restore_previous(connection, 'analysis_top_paying_jobs')
+    assert connection.tables['analysis_top_paying_jobs'] == [('Old Job', 1.0)]
+    assert connection.tables['analysis_top_paying_jobs__prev'] == [('Bad Run', 0.0)]
+    assert 'analysis_top_paying_jobs__new' not in connection.tables
+
+    assert restore_previous(connection, 'analysis_top_paying_jobs')
+    assert connection.tables['analysis_top_paying_jobs'] == [('Bad Run', 0.0)]
+
+def test_restore_previous_needs_a_previous_version():
+    connection = FakeConnection()
+    connection.tables['analysis_top_paying_jobs'] = [('Only', 1.0)]
+    assert not restore_previous(connection, 'analysis_top_paying_jobs')
+    assert connection.tables == {'analysis_top_paying_jobs': [('Only', 1.0)]}
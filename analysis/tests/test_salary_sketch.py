@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests: Salary Sketch
+Quantile estimates track exact percentiles, and merged or checkpointed sketches agree with a single one
+"""
+
+import sys
+import os
+import json
+import numpy as np
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.data_utils import SalarySketch, SALARY_PERCENTILES, SKETCH_COMPRESSION
+
+# Largest allowed gap between q and the share of values below an estimated q-quantile
+RANK_TOLERANCE = 0.01
+
+def make_salaries(count, seed=17):
+    """Skewed, salary-like values with many repeats"""
+    generator = np.random.default_rng(seed)
+    return np.round(generator.lognormal(mean=13.5, sigma=0.6, size=count), -4)
+
+def sketch_of(values):
+    sketch = SalarySketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+def rank_error(sorted_values, estimate, q):
+    """Distance from q to the range of ranks the estimate occupies in the data"""
+    low = np.searchsorted(sorted_values, estimate, side='left') / len(sorted_values)
+    high = np.searchsorted(sorted_values, estimate, side='right') / len(sorted_values)
+    return 0.0 if low <= q <= high else min(abs(q - low), abs(q - high))
+
+def test_small_groups_are_exact():
+    values = [300000, 450000, 1200000, 600000, 450000]
+    sketch = sketch_of(values)
+    for q in SALARY_PERCENTILES.values():
+        assert sketch.quantile(q) == np.percentile(values, q * 100)
+    assert sketch.mean() == np.mean(values)
+    assert SalarySketch().median() is None
+
+def test_large_groups_stay_within_rank_tolerance():
+    values = make_salaries(50000)
+    sketch = sketch_of(values)
+    sorted_values = np.sort(values)
+    for q in list(SALARY_PERCENTILES.values()) + [0.01, 0.99]:
+        assert rank_error(sorted_values, sketch.quantile(q), q) <= RANK_TOLERANCE, q
+    # Memory is bounded by the compression, not the number of values
+    assert len(sketch.means) <= SKETCH_COMPRESSION
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+
+def test_merged_sketches_match_one_sketch_of_all_values():
+    values = make_salaries(40000, seed=4)
+    merged = SalarySketch()
+    for part in np.array_split(values, 7):
+        merged.merge(sketch_of(part))
+
+    assert merged.count == len(values)
+    assert merged.min == values.min() and merged.max == values.max()
+    assert abs(merged.total - values.sum()) < 1e-6 * values.sum()
+    sorted_values = np.sort(values)
+    for q in SALARY_PERCENTILES.values():
+        assert rank_error(sorted_values, merged.quantile(q), q) <= RANK_TOLERANCE, q
+
+def test_merging_empty_and_buffered_sketches():
+    values = [500000, 700000, 900000]
+    merged = SalarySketch().merge(sketch_of(values[:1])).merge(SalarySketch()).merge(sketch_of(values[1:]))
+    assert merged.median() == 700000
+    assert merged.percentiles() == sketch_of(values).percentiles()
+
+def test_checkpoint_state_round_trips():
+    for values in (make_salaries(30), make_salaries(5000, seed=8)):
+        sketch = sketch_of(values)
+        state = json.loads(json.dumps(sketch.to_state()))
+        restored = SalarySketch.from_state(state)
+        assert restored.percentiles() == sketch.percentiles()
+        assert (restored.count, restored.total, restored.min, restored.max) == \
+               (sketch.count, sketch.total, sketch.min, sketch.max)
+
+        resumed = SalarySketch().merge_state(state)
+        assert resumed.percentiles() == sketch.percentiles()
+
+def test_empty_state_round_trips():
+    state = json.loads(json.dumps(SalarySketch().to_state()))
+    restored = SalarySketch.from_state(state)
+    assert restored.count == 0 and restored.median() is None
+    assert sketch_of([100.0]).merge_state(state).median() == 100.0
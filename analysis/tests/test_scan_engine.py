@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests: Shared Scan Engine
+Visitor registration order, watermarks and row dispatch of one shared scan
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.scan_engine import ScanEngine, ScanVisitor
+
+class FakeCursor:
+    """Serves jobs_complete rows after the id given as the query's parameter"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.connection.queries.append(query)
+        after = params[0] if params else None
+        self.rows = [dict(row) for row in self.connection.rows if after is None or row['id'] > after]
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self)
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+class RecordingVisitor(ScanVisitor):
+    """Keeps the ids of the rows it accepts"""
+
+    name = 'recording'
+    columns = ('title',)
+
+    def __init__(self, name=None, watermark=None, accept=lambda job: True):
+        self.name = name or self.name
+        self.watermark = watermark
+        self.accept = accept
+        self.seen = []
+
+    def accepts(self, job):
+        return self.accept(job)
+
+    def visit(self, job):
+        self.seen.append(job['id'])
+
+    def finish(self, connection):
+        return True
+
+class BaseBuilder(RecordingVisitor):
+    name = 'base'
+
+class DependentVisitor(RecordingVisitor):
+    name = 'dependent'
+    requires = (BaseBuilder,)
+
+def make_rows(count):
+    return [{'id': job_id, 'title': f"Job {job_id}"} for job_id in range(1, count + 1)]
+
+def test_register_adds_required_visitors_once_and_first():
+    engine = ScanEngine()
+    engine.register(DependentVisitor('first'))
+    engine.register(DependentVisitor('second'))
+    assert [visitor.name for visitor in engine.visitors] == ['base', 'first', 'second']
+    assert all(visitor.related_jobs is engine.related_jobs for visitor in engine.visitors)
+
+def test_start_after_is_lowest_watermark_or_full_scan():
+    engine = ScanEngine()
+    engine.register(RecordingVisitor('a', watermark=5))
+    engine.register(RecordingVisitor('b', watermark=3))
+    assert engine.start_after() == 3
+    assert 'WHERE id > %s' in engine.build_query()
+
+    engine.register(RecordingVisitor('c'))
+    assert engine.start_after() is None
+    assert 'WHERE' not in engine.build_query()
+
+def test_start_after_ignores_visitors_without_columns():
+    engine = ScanEngine()
+    rollup = RecordingVisitor('rollup')
+    rollup.columns = ()
+    engine.register(rollup)
+    engine.register(RecordingVisitor('a', watermark=4))
+    assert engine.start_after() == 4
+
+def test_scan_skips_rows_at_or_below_each_watermark():
+    connection = FakeConnection(make_rows(12))
+    engine = ScanEngine(chunk_size=5)
+    full = RecordingVisitor('full')
+    resumed = RecordingVisitor('resumed', watermark=8)
+    even = RecordingVisitor('even', accept=lambda job: job['id'] % 2 == 0)
+    for visitor in (full, resumed, even):
+        engine.register(visitor)
+
+    assert engine.scan(connection) == {}
+    assert len(connection.queries) == 1
+    assert full.seen == list(range(1, 13))
+    assert resumed.seen == [9, 10, 11, 12]
+    assert even.seen == [2, 4, 6, 8, 10, 12]
+    assert engine.last_id == 12
+
+def test_scan_drops_a_failing_visitor_and_keeps_the_others():
+    def fail_on_third(job):
+        if job['id'] == 3:
+            raise ValueError('bad row')
+        return True
+
+    connection = FakeConnection(make_rows(6))
+    engine = ScanEngine()
+    broken = RecordingVisitor('broken', accept=fail_on_third)
+    healthy = RecordingVisitor('healthy')
+    engine.register(broken)
+    engine.register(healthy)
+
+    assert engine.scan(connection) == {'broken': False}
+    assert broken.seen == [1, 2]
+    assert healthy.seen == list(range(1, 7))
+
+def test_run_commits_each_successful_finish_and_rolls_back_failures():
+    class FailingFinish(RecordingVisitor):
+        def finish(self, connection):
+            raise RuntimeError('cannot write')
+
+    connection = FakeConnection(make_rows(3))
+    engine = ScanEngine()
+    engine.register(RecordingVisitor('ok'))
+    engine.register(FailingFinish('fails'))
+
+    assert engine.run(connection) == {'ok': True, 'fails': False}
+    assert (connection.commits, connection.rollbacks) == (1, 1)
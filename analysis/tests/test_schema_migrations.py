@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests: Schema Migrations
+Pending migrations apply once, in order, skipping columns and indexes that already exist
+"""
+
+import sys
+import os
+import re
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.schema_migrations import (MIGRATIONS, SALARY_ORDER_SQL, migrate, pending_migrations,
+                                        add_column, add_index, applied_versions)
+
+class FakeCursor:
+    """Answers information_schema lookups and ALTER TABLE from an in-memory catalog"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, query, params=()):
+        query = ' '.join(query.split())
+        connection = self.connection
+        tables = connection.tables
+        connection.queries.append(query)
+        self.rows = []
+        if 'information_schema.TABLES' in query:
+            self.rows = [{'table_count': int(params[0] in tables)}]
+        elif 'information_schema.COLUMNS' in query:
+            self.rows = [{'column_count': int(params[1] in tables.get(params[0], {}).get('columns', {}))}]
+        elif 'information_schema.STATISTICS' in query:
+            self.rows = [{'index_count': int(params[1] in tables.get(params[0], {}).get('indexes', ()))}]
+        elif query.startswith('ALTER TABLE'):
+            if connection.fail_alter:
+                raise RuntimeError('Lock wait timeout exceeded')
+            table, action, kind, name, definition = re.match(r'ALTER TABLE (\w+) (ADD|MODIFY) (COLUMN|INDEX) (\w+) (.*)',
+                                                             query).groups()
+            if kind == 'COLUMN':
+                columns = tables[table]['columns']
+                assert (name in columns) == (action == 'MODIFY'), query
+                columns[name] = definition
+            else:
+                assert name not in tables[table]['indexes'], query
+                tables[table]['indexes'].add(name)
+        elif query.startswith('SELECT version FROM schema_migrations'):
+            self.rows = [{'version': version} for version in connection.versions]
+        elif query.startswith('INSERT INTO schema_migrations'):
+            assert params[0] not in connection.versions
+            connection.versions[params[0]] = params[1]
+        elif query.startswith('EXPLAIN'):
+            self.rows = [{'table': 'jobs_latest', 'type': 'index', 'key': 'idx_salary_order', 'rows': 5, 'Extra': None}]
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+class FakeConnection:
+    def __init__(self, tables=('jobs_latest', 'jobs_complete'), fail_alter=False):
+        self.tables = {table: {'columns': {'id': 'INT', 'salary': 'TEXT'}, 'indexes': {'PRIMARY'}} for table in tables}
+        self.versions = {}
+        self.queries = []
+        self.fail_alter = fail_alter
+
+    def cursor(self):
+        return FakeCursor(self)
+
+def alters(connection):
+    return [query for query in connection.queries if query.startswith('ALTER TABLE')]
+
+def test_migrations_have_unique_increasing_versions():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+def test_released_migrations_keep_their_definitions():
+    # Migration 1 still ranks NULL salaries as -1; migration 3 redefines the column
+    first_step = MIGRATIONS[0].steps[0]
+    assert first_step.definition == f"DECIMAL(30,4) AS (IF(salary IS NULL, -1, {SALARY_ORDER_SQL})) STORED"
+    assert SALARY_ORDER_SQL.startswith('COALESCE(')
+
+def test_migrate_applies_every_migration_once():
+    connection = FakeConnection()
+    assert migrate(connection, show_plans=True)
+    assert set(connection.versions) == {migration.version for migration in MIGRATIONS}
+    assert pending_migrations(connection) == []
+    assert connection.tables['jobs_latest']['columns']['salary_order'] == \
+        f"DECIMAL(30,4) AS ({SALARY_ORDER_SQL}) STORED"
+    assert {'idx_salary_order', 'idx_job_id'} <= connection.tables['jobs_latest']['indexes']
+
+    applied = len(alters(connection))
+    assert migrate(connection)
+    assert len(alters(connection)) == applied
+
+def test_existing_columns_and_indexes_are_skipped():
+    connection = FakeConnection()
+    connection.tables['jobs_complete']['indexes'].add('idx_company')
+    assert not add_index(connection, 'jobs_complete', 'idx_company', 'company(100)')
+    assert add_index(connection, 'jobs_complete', 'idx_location', 'location(100)')
+    assert not add_column(connection, 'jobs_latest', 'salary', 'TEXT')
+    assert add_column(connection, 'jobs_latest', 'job_id', 'VARCHAR(50)', after='id')
+    assert alters(connection)[-1] == 'ALTER TABLE jobs_latest ADD COLUMN job_id VARCHAR(50) AFTER id'
+
+    assert migrate(connection, show_plans=False)
+    assert not any('idx_company' in query or 'idx_location' in query for query in alters(connection)[2:])
+
+def test_missing_table_stops_before_later_migrations():
+    connection = FakeConnection(tables=('jobs_complete',))
+    assert not migrate(connection, show_plans=False)
+    # Migration 1 needs jobs_latest, so nothing is applied or recorded
+    assert connection.versions == {}
+    assert alters(connection) == []
+
+def test_failed_step_leaves_the_migration_pending():
+    connection = FakeConnection(fail_alter=True)
+    assert not migrate(connection, show_plans=False)
+    assert applied_versions(connection) == set()
+    assert [migration.version for migration in pending_migrations(connection)] == \
+        [migration.version for migration in MIGRATIONS]
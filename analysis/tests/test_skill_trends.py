@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests: Skill Trend Store
+Two workers with their own vocabularies append to the same store, which starts over once its checkpoint is cleared
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.skill_trends import SkillWeeklyStore, week_start, STORE_CHECKPOINT
+from analysis.incremental import clear_checkpoint
+from analysis.skill_vocabulary import SkillVocabulary
+
+class FakeCursor:
+    """Answers the queries SkillVocabulary and SkillWeeklyStore send, with MySQL's key semantics"""
+
+    def __init__(self, database):
+        self.database = database
+        self.rows = []
+
+    def execute(self, query, params=()):
+        query = ' '.join(query.split())
+        database = self.database
+        if query.startswith('SELECT COUNT(*) AS column_count'):
+            self.rows = [{'column_count': 0}]
+        elif query.startswith('SELECT last_id, state FROM analysis_checkpoints'):
+            self.rows = [database.checkpoints[params[0]]] if params[0] in database.checkpoints else []
+        elif query.startswith('REPLACE INTO analysis_checkpoints'):
+            database.checkpoints[params[0]] = {'last_id': params[1], 'state': params[2]}
+        elif query.startswith('DELETE FROM analysis_checkpoints WHERE'):
+            database.checkpoints.pop(params[0], None)
+        elif query == 'DELETE FROM skill_weekly_counts':
+            database.skill_weeks.clear()
+        elif query == 'DELETE FROM job_weekly_counts':
+            database.job_weeks.clear()
+        elif query.startswith('SELECT skill_id, skill FROM skill_vocabulary WHERE skill_id IN'):
+            self.rows = [{'skill_id': skill_id, 'skill': database.vocabulary[skill_id]}
+                         for skill_id in params if skill_id in database.vocabulary]
+        elif query.startswith('SELECT skill_id, skill FROM skill_vocabulary'):
+            self.rows = [{'skill_id': skill_id, 'skill': skill} for skill_id, skill in sorted(database.vocabulary.items())]
+        elif query.startswith('SELECT skill, SUM(job_count)'):
+            totals = {}
+            for (week, key), (skill, count) in database.skill_weeks.items():
+                if params[0] <= week <= params[1]:
+                    first_skill, total = totals.get(key, (skill, 0))
+                    totals[key] = (first_skill, total + count)
+            self.rows = [{'skill': skill, 'job_count': count} for skill, count in totals.values()]
+        elif query.startswith('SELECT SUM(job_count)'):
+            total = sum(count for week, count in database.job_weeks.items() if params[0] <= week <= params[1])
+            self.rows = [{'job_count': total or None}]
+        else:
+            self.rows = []
+
+    def executemany(self, query, rows):
+        database = self.database
+        for row in rows:
+            if 'INTO skill_vocabulary' in query:
+                # Primary key on skill_id, case-insensitive unique key on skill
+                skill_id, skill = row
+                taken = {stored.lower() for stored in database.vocabulary.values()}
+                if skill_id not in database.vocabulary and skill.lower() not in taken:
+                    database.vocabulary[skill_id] = skill
+            elif 'INTO skill_weekly_counts' in query:
+                week, skill, count = row
+                stored_skill, stored_count = database.skill_weeks.get((week, skill.lower()), (skill, 0))
+                database.skill_weeks[(week, skill.lower())] = (stored_skill, stored_count + count)
+            elif 'INTO job_weekly_counts' in query:
+                week, count = row
+                database.job_weeks[week] = database.job_weeks.get(week, 0) + count
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+class FakeConnection:
+    def __init__(self):
+        self.vocabulary = {}
+        self.checkpoints = {}
+        self.skill_weeks = {}  # (week_start, lowered skill) -> (skill, jobs)
+        self.job_weeks = {}
+
+    def cursor(self):
+        return FakeCursor(self)
+
+def start_worker(connection):
+    """Vocabulary and store of one --jobs worker, read before any worker writes"""
+    vocabulary = SkillVocabulary()
+    vocabulary.load(connection)
+    store = SkillWeeklyStore()
+    store.prepare(connection)
+    return vocabulary, store
+
+def finish_worker(connection, vocabulary, store, jobs, first_id):
+    """Intern and count jobs, then save the vocabulary and append the counts"""
+    for job_id, (created_at, skills) in enumerate(jobs, first_id):
+        vocabulary.encode(skills)
+        store.seen(job_id)
+        store.add(created_at, skills)
+    saved = vocabulary.save(connection)
+    store.append(connection)
+    return saved
+
+def test_workers_interning_different_skills_in_the_same_order():
+    connection = FakeConnection()
+    posted = datetime(2024, 3, 6)
+    first, first_store = start_worker(connection)
+    second, second_store = start_worker(connection)
+    first_saved = finish_worker(connection, first, first_store, [(posted, ['Python', 'SQL']), (posted, ['Python'])], 1)
+    second_saved = finish_worker(connection, second, second_store, [(posted, ['Go', 'SQL', 'sql'])], 3)
+
+    # Both vocabularies gave ID 0 to a different skill, and only the first was stored
+    assert first.ids['Python'] == second.ids['Go'] == 0
+    assert first_saved and not second_saved
+    assert not second.loaded
+
+    week = week_start(posted)
+    skill_counts, job_count = SkillWeeklyStore().window_counts(connection, week, week)
+    assert skill_counts == {'Python': 2, 'SQL': 2, 'Go': 1}
+    assert job_count == 3
+
+def test_reload_renumbers_skills_another_worker_stored_first():
+    connection = FakeConnection()
+    vocabulary, store = start_worker(connection)
+    finish_worker(connection, vocabulary, store, [(datetime(2024, 3, 6), ['Python', 'SQL'])], 1)
+
+    vocabulary = SkillVocabulary()
+    vocabulary.encode(['Go', 'sql'])
+    assert not vocabulary.save(connection)
+    assert vocabulary.saved == 0
+
+    vocabulary.load(connection)
+    assert vocabulary.ids['sql'] == vocabulary.ids['SQL'] == 1
+    assert vocabulary.ids['Go'] == 2
+    assert vocabulary.save(connection)
+    assert connection.vocabulary == {0: 'Python', 1: 'SQL', 2: 'Go'}
+
+def test_clearing_the_checkpoint_rebuilds_the_store():
+    connection = FakeConnection()
+    vocabulary, store = start_worker(connection)
+    finish_worker(connection, vocabulary, store, [(datetime(2024, 3, 6), ['Python'])], 1)
+
+    # Incremental runs resume after the watermark and keep the stored weeks
+    assert SkillWeeklyStore().prepare(connection) == 1
+    assert connection.skill_weeks
+
+    # Full runs clear the checkpoint, so the next prepare() starts over
+    clear_checkpoint(connection, STORE_CHECKPOINT)
+    assert SkillWeeklyStore().prepare(connection) is None
+    assert connection.skill_weeks == {}
+    assert connection.job_weeks == {}
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests: Heavy Hitters
+Space-Saving summaries keep their error guarantees when fed in batches, merged or checkpointed
+"""
+
+import sys
+import os
+import json
+from collections import Counter
+import numpy as np
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.space_saving import SpaceSaving
+
+def make_stream(count, distinct=2000, seed=9):
+    """Skewed (Zipf-like) stream of skill-like names"""
+    generator = np.random.default_rng(seed)
+    ranks = np.minimum(generator.zipf(1.3, size=count), distinct)
+    return [f"skill-{rank}" for rank in ranks]
+
+def summary_of(stream, capacity, batch=500):
+    summary = SpaceSaving(capacity)
+    for start in range(0, len(stream), batch):
+        summary.update(stream[start:start + batch])
+    return summary
+
+def check_guarantees(summary, stream):
+    """Space-Saving's bounds hold for every item of the stream"""
+    true_counts = Counter(stream)
+    floor = summary.error_bound()
+    assert summary.total == len(stream)
+    assert floor <= len(stream) / summary.capacity
+    for item, true_count in true_counts.items():
+        if item in summary.counts:
+            assert summary.guaranteed(item) <= true_count <= summary.counts[item]
+            assert summary.counts[item] - true_count <= floor
+        else:
+            # Only items that occurred at most floor times can be missing
+            assert true_count <= floor, item
+
+def test_below_capacity_counts_are_exact():
+    stream = ['Python', 'SQL', 'Java', 'SQL', 'Go', 'Python', 'SQL', 'Java']
+    summary = summary_of(stream, capacity=10, batch=3)
+    assert summary.most_common() == Counter(stream).most_common()
+    assert summary.error_bound() == 0
+
+def test_ties_break_by_first_occurrence():
+    summary = summary_of(['b', 'a', 'c', 'a', 'b', 'c'], capacity=10, batch=2)
+    assert summary.most_common() == [('b', 2), ('a', 2), ('c', 2)]
+
+def test_guarantees_hold_past_capacity():
+    stream = make_stream(50000)
+    summary = summary_of(stream, capacity=100)
+    check_guarantees(summary, stream)
+    # The clear heavy hitters come out in the right order with exact counts
+    assert [item for item, _ in summary.most_common(5)] == [item for item, _ in Counter(stream).most_common(5)]
+
+def test_merged_summaries_keep_the_guarantees():
+    stream = make_stream(60000, seed=2)
+    parts = [stream[start:start + 7000] for start in range(0, len(stream), 7000)]
+    merged = SpaceSaving(100)
+    for part in parts:
+        merged.merge(summary_of(part, capacity=100))
+    check_guarantees(merged, stream)
+
+def test_values_are_averaged_for_items_never_dropped():
+    summary = SpaceSaving(10)
+    summary.update(['Python', 'SQL'], 1000000)
+    summary.update(['Python'], 500000)
+    summary.update(['Go'])
+    assert summary.value_mean('Python') == 750000
+    assert summary.value_mean('SQL') == 1000000
+    assert summary.value_mean('Go') == 0
+
+def test_int_arrays_are_counted_like_lists():
+    summary = SpaceSaving(10)
+    summary.update(np.array([3, 1, 3], dtype=np.int32))
+    summary.update(np.array([1, 3], dtype=np.int32))
+    assert summary.most_common() == [(3, 3), (1, 2)]
+
+def test_checkpoint_state_round_trips():
+    stream = make_stream(20000, seed=6)
+    summary = summary_of(stream, capacity=50)
+    state = json.loads(json.dumps(summary.to_state()))
+    restored = SpaceSaving(50).merge_state(state)
+    assert restored.most_common() == summary.most_common()
+    assert restored.error_bound() == summary.error_bound()
+    assert restored.total == summary.total
+    check_guarantees(restored, stream)
+
+def test_exact_counter_state_merges_as_exact_counts():
+    summary = summary_of(['Python', 'SQL'], capacity=10)
+    summary.merge_state({'Python': 3, 'Java': 1})
+    assert summary.most_common() == [('Python', 4), ('SQL', 1), ('Java', 1)]
+    assert summary.error_bound() == 0
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests: Row Streaming Helpers
+Chunked server-side cursors, keyset pagination and background prefetch
+"""
+
+import sys
+import os
+import pytest
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.streaming import stream_rows, keyset_rows, prefetch
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+        self.closed = False
+
+    def execute(self, query, params=None):
+        self.connection.queries.append((query, params))
+        rows = self.connection.rows
+        if 'WHERE' in query:
+            rows = [row for row in rows if row['id'] > params[0]]
+        if 'LIMIT' in query:
+            rows = rows[:params[-1]]
+        self.rows = list(rows)
+
+    def fetchmany(self, size):
+        self.connection.fetches += 1
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, count):
+        self.rows = [{'id': job_id, 'title': f"Job {job_id}"} for job_id in range(1, count + 1)]
+        self.queries = []
+        self.fetches = 0
+        self.cursors = []
+
+    def cursor(self, cursor_class=None):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+def test_stream_rows_fetches_in_chunks_and_closes_the_cursor():
+    connection = FakeConnection(11)
+    rows = list(stream_rows(connection, "SELECT id, title FROM jobs_complete", chunk_size=4))
+    assert [row['id'] for row in rows] == list(range(1, 12))
+    # Three full or partial chunks, then the empty fetch that ends the stream
+    assert connection.fetches == 4
+    assert connection.cursors[0].closed
+
+def test_stream_rows_closes_the_cursor_when_abandoned():
+    connection = FakeConnection(10)
+    rows = stream_rows(connection, "SELECT id FROM jobs_complete", chunk_size=3)
+    next(rows)
+    rows.close()
+    assert connection.cursors[0].closed
+
+def test_keyset_rows_pages_by_qualified_key():
+    connection = FakeConnection(10)
+    rows = list(keyset_rows(connection, 'jobs_complete c', ['c.title'], key='c.id', chunk_size=4, start_after=2))
+    assert [row['id'] for row in rows] == list(range(3, 11))
+    # Pages resume after the last id of the previous page
+    assert [params[0] for _, params in connection.queries] == [2, 6, 10]
+    assert connection.queries[0][0].startswith('SELECT c.id, c.title FROM jobs_complete c WHERE c.id > %s')
+
+def test_keyset_rows_stops_after_a_short_page():
+    connection = FakeConnection(8)
+    rows = list(keyset_rows(connection, 'jobs_complete', ['id', 'title'], chunk_size=5))
+    assert len(rows) == 8
+    assert len(connection.queries) == 2
+    assert 'WHERE' not in connection.queries[0][0]
+
+def test_prefetch_keeps_order():
+    assert list(prefetch(iter(range(23)), chunk_size=5, depth=2)) == list(range(23))
+
+def test_prefetch_reraises_reader_errors():
+    def broken_rows():
+        yield 1
+        yield 2
+        raise ValueError('connection lost')
+
+    rows = prefetch(broken_rows(), chunk_size=1, depth=1)
+    with pytest.raises(ValueError, match='connection lost'):
+        list(rows)
+
+def test_prefetch_stops_the_reader_when_abandoned():
+    def endless_rows():
+        job_id = 0
+        while True:
+            job_id += 1
+            yield job_id
+
+    rows = prefetch(endless_rows(), chunk_size=10, depth=1)
+    assert next(rows) == 1
+    rows.close()
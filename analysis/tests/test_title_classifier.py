@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Tests: Title Classifier
+Each TITLE_LEVELS level agrees with the per-module if-chain it replaced
+"""
+
+import sys
+import os
+import random
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.title_classifier import TITLE_LEVELS, TitleClassifier, KeywordAutomaton, classify_title
+
+def has(title_lower, *keywords):
+    return any(keyword in title_lower for keyword in keywords)
+
+# The functions TITLE_LEVELS replaced, as they were in each module
+
+def old_family(title):
+    """company_hiring_trends / job_duration_analysis normalize_job_title"""
+    if not title:
+        return "Other"
+    title_lower = title.lower()
+    if 'engineer' in title_lower or 'developer' in title_lower:
+        return 'Engineering'
+    elif 'analyst' in title_lower:
+        return 'Analytics'
+    elif 'manager' in title_lower:
+        return 'Management'
+    else:
+        return 'Other'
+
+def old_family_consulting(title):
+    """govt_vs_private_analysis normalize_job_title"""
+    if not title:
+        return "Other"
+    title_lower = title.lower()
+    if 'engineer' in title_lower or 'developer' in title_lower:
+        return 'Engineering'
+    elif 'analyst' in title_lower:
+        return 'Analytics'
+    elif 'manager' in title_lower:
+        return 'Management'
+    elif 'consultant' in title_lower:
+        return 'Consulting'
+    else:
+        return 'Other'
+
+def old_family_science(title):
+    """skills_correlation_analysis normalize_job_type"""
+    if not title:
+        return "Other"
+    title_lower = title.lower()
+    if 'engineer' in title_lower or 'developer' in title_lower:
+        return 'Engineering'
+    elif 'analyst' in title_lower:
+        return 'Analytics'
+    elif 'scientist' in title_lower:
+        return 'Data Science'
+    elif 'manager' in title_lower:
+        return 'Management'
+    else:
+        return 'Other'
+
+def old_job_type(title):
+    """best_locations_by_job_type normalize_job_type"""
+    if not title:
+        return "Unknown"
+    title_lower = title.lower()
+    if has(title_lower, 'software engineer', 'developer', 'programmer', 'backend', 'frontend'):
+        return 'Software Development'
+    elif has(title_lower, 'data engineer', 'data scientist', 'data analyst'):
+        return 'Data Science & Analytics'
+    elif has(title_lower, 'ai engineer', 'ml engineer', 'machine learning'):
+        return 'AI/Machine Learning'
+    elif has(title_lower, 'qa engineer', 'test engineer', 'quality'):
+        return 'Quality Assurance'
+    elif has(title_lower, 'manager', 'lead', 'head', 'director'):
+        return 'Management & Leadership'
+    elif has(title_lower, 'consultant', 'advisor'):
+        return 'Consulting'
+    elif has(title_lower, 'designer', 'ui', 'ux'):
+        return 'Design & UX'
+    elif has(title_lower, 'marketing', 'sales'):
+        return 'Marketing & Sales'
+    elif has(title_lower, 'intern', 'trainee'):
+        return 'Internships'
+    else:
+        return 'Other'
+
+def old_experience_category(title):
+    """experience_requirements_trends normalize_job_category"""
+    if not title:
+        return "Other"
+    title_lower = title.lower()
+    if has(title_lower, 'software engineer', 'developer', 'programmer'):
+        return 'Software Development'
+    elif has(title_lower, 'data engineer', 'data scientist', 'data analyst'):
+        return 'Data Science'
+    elif has(title_lower, 'ai', 'ml', 'machine learning'):
+        return 'AI/Machine Learning'
+    elif has(title_lower, 'product manager', 'project manager'):
+        return 'Product Management'
+    elif has(title_lower, 'qa', 'test', 'quality'):
+        return 'Quality Assurance'
+    elif has(title_lower, 'designer', 'ui', 'ux'):
+        return 'Design'
+    elif has(title_lower, 'marketing', 'sales'):
+        return 'Marketing/Sales'
+    elif has(title_lower, 'consultant', 'analyst'):
+        return 'Consulting/Analysis'
+    else:
+        return 'Other'
+
+def old_category(title):
+    """data_utils JobTitleCategorizer.categorize"""
+    if not title:
+        return "Unknown"
+    title_lower = title.lower()
+    if has(title_lower, 'engineer', 'developer', 'programmer'):
+        if 'data' in title_lower:
+            return 'Data Engineer/Developer'
+        elif has(title_lower, 'software', 'backend', 'frontend', 'full stack'):
+            return 'Software Engineer/Developer'
+        elif 'ai' in title_lower or 'ml' in title_lower or 'machine learning' in title_lower:
+            return 'AI/ML Engineer'
+        elif 'qa' in title_lower or 'test' in title_lower:
+            return 'QA/Test Engineer'
+        else:
+            return 'Engineer/Developer'
+    elif 'analyst' in title_lower:
+        if 'data' in title_lower:
+            return 'Data Analyst'
+        elif 'business' in title_lower:
+            return 'Business Analyst'
+        else:
+            return 'Analyst'
+    elif has(title_lower, 'manager', 'lead', 'head'):
+        return 'Management/Leadership'
+    elif 'scientist' in title_lower:
+        return 'Data Scientist'
+    elif has(title_lower, 'intern', 'trainee'):
+        return 'Internship/Trainee'
+    elif has(title_lower, 'consultant', 'advisor'):
+        return 'Consultant/Advisor'
+    elif has(title_lower, 'designer', 'ui', 'ux'):
+        return 'Design/UX'
+    elif has(title_lower, 'marketing', 'sales'):
+        return 'Marketing/Sales'
+    else:
+        return 'Other'
+
+def old_competitive_title(title):
+    """most_competitive_jobs normalize_job_title"""
+    if not title:
+        return "Unknown"
+    title_lower = title.lower()
+    if has(title_lower, 'engineer', 'developer'):
+        if 'data' in title_lower:
+            return 'Data Engineer/Developer'
+        elif 'software' in title_lower:
+            return 'Software Engineer/Developer'
+        elif 'ai' in title_lower or 'ml' in title_lower:
+            return 'AI/ML Engineer'
+        else:
+            return 'Engineer/Developer'
+    elif 'analyst' in title_lower:
+        return 'Data Analyst' if 'data' in title_lower else 'Business Analyst'
+    elif 'manager' in title_lower:
+        return 'Management'
+    elif 'scientist' in title_lower:
+        return 'Data Scientist'
+    else:
+        return title.title()
+
+def old_demand_title(title):
+    """most_demanded_jobs normalize_job_title"""
+    if not title:
+        return "Unknown"
+    title_lower = title.lower()
+    if has(title_lower, 'engineer', 'developer', 'programmer'):
+        if 'data' in title_lower:
+            return 'Data Engineer/Developer'
+        elif has(title_lower, 'software', 'backend', 'frontend'):
+            return 'Software Engineer/Developer'
+        elif 'ai' in title_lower or 'ml' in title_lower:
+            return 'AI/ML Engineer'
+        elif 'qa' in title_lower or 'test' in title_lower:
+            return 'QA/Test Engineer'
+        else:
+            return 'Engineer/Developer'
+    elif 'analyst' in title_lower:
+        return 'Data Analyst' if 'data' in title_lower else 'Business Analyst'
+    elif has(title_lower, 'manager', 'lead'):
+        return 'Management/Leadership'
+    elif 'scientist' in title_lower:
+        return 'Data Scientist'
+    elif has(title_lower, 'intern', 'trainee'):
+        return 'Internship/Trainee'
+    else:
+        return title.title()
+
+def old_pay_title(title):
+    """top_paying_jobs normalize_job_title"""
+    if not title:
+        return "Unknown"
+    title_lower = title.lower()
+    if has(title_lower, 'cto', 'ceo', 'director', 'vp', 'vice president'):
+        return 'C-Level/Executive'
+    elif has(title_lower, 'senior manager', 'senior lead', 'principal manager'):
+        return 'Senior Management'
+    elif has(title_lower, 'manager', 'lead', 'head') and 'assistant' not in title_lower:
+        return 'Management/Lead'
+    elif has(title_lower, 'senior engineer', 'senior developer', 'sr engineer', 'senior software'):
+        return 'Senior Engineer/Developer'
+    elif has(title_lower, 'architect', 'principal engineer', 'staff engineer'):
+        return 'Architect/Principal Engineer'
+    elif 'data scientist' in title_lower:
+        return 'Data Scientist'
+    elif has(title_lower, 'ml engineer', 'ai engineer', 'machine learning engineer'):
+        return 'AI/ML Engineer'
+    elif has(title_lower, 'software engineer', 'developer', 'programmer') and 'senior' not in title_lower:
+        return 'Software Engineer/Developer'
+    elif 'consultant' in title_lower:
+        return 'Consultant'
+    elif 'analyst' in title_lower:
+        if 'data' in title_lower:
+            return 'Data Analyst'
+        elif 'business' in title_lower:
+            return 'Business Analyst'
+        else:
+            return 'Analyst'
+    elif has(title_lower, 'intern', 'trainee'):
+        return 'Internship/Trainee'
+    else:
+        return title.title()[:100]
+
+OLD_FUNCTIONS = {
+    'family': old_family,
+    'family_consulting': old_family_consulting,
+    'family_science': old_family_science,
+    'job_type': old_job_type,
+    'experience_category': old_experience_category,
+    'category': old_category,
+    'competitive_title': old_competitive_title,
+    'demand_title': old_demand_title,
+    'pay_title': old_pay_title,
+}
+
+# Title fragments built from every rule keyword plus words that straddle them
+FILLER = ['senior', 'sr', 'junior', 'assistant', 'associate', 'remote', 'java', 'sap', 'mail', 'html', 'guide',
+          'contest', 'leader', 'headquarters', 'paid', 'retail', 'sales-force', 'Ui/Ux', 'DATA', 'Software',
+          '(Ml)', '-', '/', 'principal', 'staff', 'vice', 'president', 'chief', 'product', 'project']
+
+def title_words():
+    words = set(FILLER)
+    for title_level in TITLE_LEVELS.values():
+        for title_rule in title_level.rules:
+            for group in title_rule.all_of:
+                words.update(group)
+            words.update(title_rule.none_of)
+    return sorted(words)
+
+def make_titles(count, seed=13):
+    generator = random.Random(seed)
+    words = title_words()
+    titles = [None, '', ' ', 'X' * 150]
+    for _ in range(count):
+        parts = generator.choices(words, k=generator.randint(1, 5))
+        if generator.random() < 0.3:
+            parts = [part.upper() if generator.random() < 0.5 else part.title() for part in parts]
+        titles.append((' ' if generator.random() < 0.8 else '').join(parts))
+    return titles
+
+def test_every_level_has_a_reference_function():
+    assert set(OLD_FUNCTIONS) == set(TITLE_LEVELS)
+
+def test_levels_agree_with_the_replaced_functions():
+    classifier = TitleClassifier()
+    for title in make_titles(20000):
+        for level_name, old_function in OLD_FUNCTIONS.items():
+            assert classifier.classify(title, level_name) == old_function(title), (level_name, title)
+
+def test_cached_results_match_fresh_ones():
+    classifier = TitleClassifier(cache_size=50)
+    titles = make_titles(500, seed=5)
+    first = [classifier.classify(title, 'demand_title') for title in titles]
+    assert [classifier.classify(title, 'demand_title') for title in titles] == first
+    assert len(classifier.caches['demand_title']) <= 50
+
+def test_classify_title_defaults_to_the_job_category():
+    assert classify_title('Senior Data Engineer') == 'Data Engineer/Developer'
+    assert classify_title(None) == 'Unknown'
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(['he', 'she', 'his', 'hers', 'ai', 'ml'])
+    assert automaton.find('ushers') == {'he', 'she', 'hers'}
+    assert automaton.find('html email') == {'ml', 'ai'}
+    assert automaton.find('') == set()
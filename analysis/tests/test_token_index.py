@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests: Token Index
+Substring lookups through the n-gram index agree with a scan of every token
+"""
+
+import sys
+import os
+import random
+from array import array
+
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from analysis.token_index import TokenIndex, tokenize, intersect, union
+
+WORDS = ['java', 'javascript', 'python', 'sql', 'nosql', 'react', 'reactjs', 'data', 'analyst', 'scientist',
+         'c', 'c2c', 'go', 'golang', 'aws', 'pune', 'mumbai', 'navi', 'senior', 'sr', 'manager', 'ml', 'html5']
+
+def make_documents(count, seed=7):
+    generator = random.Random(seed)
+    return [{'title': ' '.join(generator.choices(WORDS, k=generator.randint(0, 4)))} for _ in range(count)]
+
+def scan_containing(documents, fragment):
+    """Positions whose title has a token containing the fragment, by brute force"""
+    return array('i', [position for position, document in enumerate(documents)
+                       if any(fragment in token for token in tokenize(document['title']))])
+
+def test_tokenize_lowers_and_splits_on_non_alphanumerics():
+    assert tokenize('Sr. Java/J2EE Developer') == ['sr', 'java', 'j2ee', 'developer']
+    assert tokenize(None) == []
+
+def test_intersect_and_union_of_sorted_postings():
+    assert list(intersect(array('i', [1, 3, 5, 7, 9]), array('i', [3, 4, 9]))) == [3, 9]
+    assert list(intersect(array('i'), array('i', [1]))) == []
+    assert list(union([array('i', [1, 5]), array('i', [2, 5, 8])])) == [1, 2, 5, 8]
+
+def test_containing_matches_a_scan_of_all_tokens():
+    documents = make_documents(400)
+    index = TokenIndex(('title',)).build(documents)
+    fragments = {'j', 'va', 'ava', 'java', 'script', 'sql', 'q', 'act', 'reactjs', 'c2', 'html5', 'xyz', 'tml5x'}
+    fragments.update(word[start:start + length] for word in WORDS
+                     for length in range(1, len(word) + 1) for start in range(len(word) - length + 1))
+    for fragment in sorted(fragments):
+        assert index.containing('title', fragment) == scan_containing(documents, fragment), fragment
+
+def test_candidates_cover_every_substring_match():
+    documents = make_documents(300, seed=11)
+    index = TokenIndex(('title',)).build(documents)
+    for text in ('java', 'data analyst', 'ript', 'senior manager', 'sql ana', 'nothing here'):
+        candidates = set(index.candidates('title', text))
+        matches = {position for position, document in enumerate(documents) if text in document['title']}
+        assert matches <= candidates
+    assert index.candidates('title', '++') is None
+
+def test_rebuild_forgets_cached_lookups():
+    index = TokenIndex(('title',)).build([{'title': 'java'}])
+    assert list(index.containing('title', 'av')) == [0]
+    index.build([{'title': 'python'}, {'title': 'java'}])
+    assert list(index.containing('title', 'av')) == [1]
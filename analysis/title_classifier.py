@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Job Title Classifier
+Rule tables mapping job titles to categories, matched with one Aho-Corasick automaton
+"""
+
+from collections import deque, namedtuple
+
+# A rule matches when every group in all_of has at least one keyword in the
+# title and no keyword of none_of is in it; the first matching rule wins
+TitleRule = namedtuple('TitleRule', ('category', 'all_of', 'none_of'))
+
+# fallback=None keeps the title itself (title-cased, cut to max_length)
+TitleLevel = namedtuple('TitleLevel', ('rules', 'fallback', 'empty', 'max_length'))
+
+# Distinct titles remembered per level before the cache is reset
+TITLE_CACHE_SIZE = 100000
+
+def rule(category, *all_of, exclude=()):
+    return TitleRule(category, tuple(tuple(group) for group in all_of), tuple(exclude))
+
+def level(rules, fallback='Other', empty='Other', max_length=None):
+    return TitleLevel(tuple(rules), fallback, empty, max_length)
+
+ENGINEERING = ('engineer', 'developer', 'programmer')
+
+# Granularity levels, from the coarse families used for breakdowns to the
+# finer titles used for grouping jobs
+TITLE_LEVELS = {
+    # Engineering / Analytics / Management (company hiring, job duration)
+    'family': level([
+        rule('Engineering', ('engineer', 'developer')),
+        rule('Analytics', ('analyst',)),
+        rule('Management', ('manager',)),
+    ]),
+    # family plus consulting roles (government vs private)
+    'family_consulting': level([
+        rule('Engineering', ('engineer', 'developer')),
+        rule('Analytics', ('analyst',)),
+        rule('Management', ('manager',)),
+        rule('Consulting', ('consultant',)),
+    ]),
+    # family plus data science roles (skills correlation)
+    'family_science': level([
+        rule('Engineering', ('engineer', 'developer')),
+        rule('Analytics', ('analyst',)),
+        rule('Data Science', ('scientist',)),
+        rule('Management', ('manager',)),
+    ]),
+    # Broad job types (best locations)
+    'job_type': level([
+        rule('Software Development', ('software engineer', 'developer', 'programmer', 'backend', 'frontend')),
+        rule('Data Science & Analytics', ('data engineer', 'data scientist', 'data analyst')),
+        rule('AI/Machine Learning', ('ai engineer', 'ml engineer', 'machine learning')),
+        rule('Quality Assurance', ('qa engineer', 'test engineer', 'quality')),
+        rule('Management & Leadership', ('manager', 'lead', 'head', 'director')),
+        rule('Consulting', ('consultant', 'advisor')),
+        rule('Design & UX', ('designer', 'ui', 'ux')),
+        rule('Marketing & Sales', ('marketing', 'sales')),
+        rule('Internships', ('intern', 'trainee')),
+    ], empty='Unknown'),
+    # Job categories for experience requirement trends
+    'experience_category': level([
+        rule('Software Development', ('software engineer', 'developer', 'programmer')),
+        rule('Data Science', ('data engineer', 'data scientist', 'data analyst')),
+        rule('AI/Machine Learning', ('ai', 'ml', 'machine learning')),
+        rule('Product Management', ('product manager', 'project manager')),
+        rule('Quality Assurance', ('qa', 'test', 'quality')),
+        rule('Design', ('designer', 'ui', 'ux')),
+        rule('Marketing/Sales', ('marketing', 'sales')),
+        rule('Consulting/Analysis', ('consultant', 'analyst')),
+    ]),
+    # jobs_parsed.job_category (data_utils.categorize_job_title)
+    'category': level([
+        rule('Data Engineer/Developer', ENGINEERING, ('data',)),
+        rule('Software Engineer/Developer', ENGINEERING, ('software', 'backend', 'frontend', 'full stack')),
+        rule('AI/ML Engineer', ENGINEERING, ('ai', 'ml', 'machine learning')),
+        rule('QA/Test Engineer', ENGINEERING, ('qa', 'test')),
+        rule('Engineer/Developer', ENGINEERING),
+        rule('Data Analyst', ('analyst',), ('data',)),
+        rule('Business Analyst', ('analyst',), ('business',)),
+        rule('Analyst', ('analyst',)),
+        rule('Management/Leadership', ('manager', 'lead', 'head')),
+        rule('Data Scientist', ('scientist',)),
+        rule('Internship/Trainee', ('intern', 'trainee')),
+        rule('Consultant/Advisor', ('consultant', 'advisor')),
+        rule('Design/UX', ('designer', 'ui', 'ux')),
+        rule('Marketing/Sales', ('marketing', 'sales')),
+    ], empty='Unknown'),
+    # Job titles for competition levels; other titles are kept as they are
+    'competitive_title': level([
+        rule('Data Engineer/Developer', ('engineer', 'developer'), ('data',)),
+        rule('Software Engineer/Developer', ('engineer', 'developer'), ('software',)),
+        rule('AI/ML Engineer', ('engineer', 'developer'), ('ai', 'ml')),
+        rule('Engineer/Developer', ('engineer', 'developer')),
+        rule('Data Analyst', ('analyst',), ('data',)),
+        rule('Business Analyst', ('analyst',)),
+        rule('Management', ('manager',)),
+        rule('Data Scientist', ('scientist',)),
+    ], fallback=None, empty='Unknown'),
+    # Job titles for demand counts; other titles are kept as they are
+    'demand_title': level([
+        rule('Data Engineer/Developer', ENGINEERING, ('data',)),
+        rule('Software Engineer/Developer', ENGINEERING, ('software', 'backend', 'frontend')),
+        rule('AI/ML Engineer', ENGINEERING, ('ai', 'ml')),
+        rule('QA/Test Engineer', ENGINEERING, ('qa', 'test')),
+        rule('Engineer/Developer', ENGINEERING),
+        rule('Data Analyst', ('analyst',), ('data',)),
+        rule('Business Analyst', ('analyst',)),
+        rule('Management/Leadership', ('manager', 'lead')),
+        rule('Data Scientist', ('scientist',)),
+        rule('Internship/Trainee', ('intern', 'trainee')),
+    ], fallback=None, empty='Unknown'),
+    # Seniority-aware job titles for salary comparisons
+    'pay_title': level([
+        rule('C-Level/Executive', ('cto', 'ceo', 'director', 'vp', 'vice president')),
+        rule('Senior Management', ('senior manager', 'senior lead', 'principal manager')),
+        rule('Management/Lead', ('manager', 'lead', 'head'), exclude=('assistant',)),
+        rule('Senior Engineer/Developer', ('senior engineer', 'senior developer', 'sr engineer', 'senior software')),
+        rule('Architect/Principal Engineer', ('architect', 'principal engineer', 'staff engineer')),
+        rule('Data Scientist', ('data scientist',)),
+        rule('AI/ML Engineer', ('ml engineer', 'ai engineer', 'machine learning engineer')),
+        rule('Software Engineer/Developer', ('software engineer', 'developer', 'programmer'), exclude=('senior',)),
+        rule('Consultant', ('consultant',)),
+        rule('Data Analyst', ('analyst',), ('data',)),
+        rule('Business Analyst', ('analyst',), ('business',)),
+        rule('Analyst', ('analyst',)),
+        rule('Internship/Trainee', ('intern', 'trainee')),
+    ], fallback=None, empty='Unknown', max_length=100),
+}
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword that occurs in a text
+
+    Matches are plain substring matches (like `keyword in text`), found in a
+    single pass over the text however many keywords there are. Keyword i is
+    reported as bit i of the mask returned by scan().
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(keywords))
+        self.bits = {keyword: 1 << position for position, keyword in enumerate(self.keywords)}
+
+        # Trie of the keywords
+        children = [{}]
+        outputs = [0]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                if char not in children[state]:
+                    children.append({})
+                    outputs.append(0)
+                    children[state][char] = len(children) - 1
+                state = children[state][char]
+            outputs[state] |= self.bits[keyword]
+
+        # Failure links, folded into complete transitions so scanning never backtracks.
+        # States are visited breadth first, so a state's failure target is complete
+        # before the state itself is.
+        fail = [0] * len(children)
+        transitions = [None] * len(children)
+        transitions[0] = dict(children[0])
+        queue = deque(children[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            transitions[state] = dict(transitions[fail[state]])
+            transitions[state].update(children[state])
+            for char, target in children[state].items():
+                fail[target] = transitions[fail[state]].get(char, 0)
+                queue.append(target)
+
+        self.transitions = transitions
+        self.outputs = outputs
+
+    def mask(self, keywords):
+        """Bit mask of a group of keywords"""
+        result = 0
+        for keyword in keywords:
+            result |= self.bits[keyword]
+        return result
+
+    def scan(self, text):
+        """Bit mask of the keywords that occur in text"""
+        transitions = self.transitions
+        outputs = self.outputs
+        state = 0
+        found = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            found |= outputs[state]
+        return found
+
+    def find(self, text):
+        """Set of keywords that occur in text"""
+        found = self.scan(text)
+        return {keyword for keyword, bit in self.bits.items() if found & bit}
+
+class TitleClassifier:
+    """Classifies job titles at the granularity levels of TITLE_LEVELS
+
+    Every keyword of every level is compiled into one KeywordAutomaton, so a
+    title is scanned once into a keyword mask. Each level decides a mask once
+    (titles share few distinct masks) and caches results by exact title.
+    """
+
+    def __init__(self, levels=TITLE_LEVELS, cache_size=TITLE_CACHE_SIZE):
+        self.levels = levels
+        self.cache_size = cache_size
+        keywords = set()
+        for title_level in levels.values():
+            for title_rule in title_level.rules:
+                for group in title_rule.all_of:
+                    keywords.update(group)
+                keywords.update(title_rule.none_of)
+        self.automaton = KeywordAutomaton(keywords)
+
+        # Rules as (category, group masks, excluded mask)
+        self.compiled = {name: [(title_rule.category,
+                                 [self.automaton.mask(group) for group in title_rule.all_of],
+                                 self.automaton.mask(title_rule.none_of))
+                                for title_rule in title_level.rules]
+                         for name, title_level in levels.items()}
+        self.decisions = {name: {} for name in levels}
+        self.caches = {name: {} for name in levels}
+
+    def classify(self, title, level_name='category'):
+        """Category of a title at the given level"""
+        cache = self.caches[level_name]
+        category = cache.get(title)
+        if category is None:
+            if len(cache) >= self.cache_size:
+                cache.clear()
+            category = cache[title] = self._classify(title, level_name)
+        return category
+
+    def _classify(self, title, level_name):
+        title_level = self.levels[level_name]
+        if not title:
+            return title_level.empty
+
+        found = self.automaton.scan(title.lower())
+        decisions = self.decisions[level_name]
+        if found not in decisions:
+            decisions[found] = self._decide(found, level_name)
+        category = decisions[found]
+
+        if category is None:
+            return title.title()[:title_level.max_length]
+        return category
+
+    def _decide(self, found, level_name):
+        """Category of the first rule matching a keyword mask (None keeps the title)"""
+        for category, group_masks, excluded in self.compiled[level_name]:
+            if not found & excluded and all(found & group for group in group_masks):
+                return category
+        return self.levels[level_name].fallback
+
+_classifier = None
+
+def classify_title(title, level_name='category'):
+    """Classify a title with the shared TitleClassifier"""
+    global _classifier
+    if _classifier is None:
+        _classifier = TitleClassifier()
+    return _classifier.classify(title, level_name)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Token Index
+Inverted index from normalized tokens to sorted row-number postings
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Token substrings up to this length are indexed for containing(); longer
+# fragments intersect the token lists of their substrings of this length
+NGRAM_SIZE = 3
+
+def tokenize(text):
+    """Lower-case alphanumeric tokens of a text value"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+def ngrams(text, sizes=range(1, NGRAM_SIZE + 1)):
+    """Distinct substrings of text with the given lengths"""
+    return {text[start:start + size] for size in sizes for start in range(len(text) - size + 1)}
+
+def intersect(left, right):
+    """Intersection of two sorted int arrays
+
+    Walks the shorter list and gallops through the longer one with bisect, so
+    a rare token intersected with a common one costs O(short * log long).
+    """
+    if len(left) > len(right):
+        left, right = right, left
+    result = array('i')
+    position = 0
+    for value in left:
+        position = bisect_left(right, value, position)
+        if position == len(right):
+            break
+        if right[position] == value:
+            result.append(value)
+            position += 1
+    return result
+
+def union(postings):
+    """Union of several sorted int arrays as one sorted int array"""
+    merged = set()
+    for posting in postings:
+        merged.update(posting)
+    return array('i', sorted(merged))
+
+class TokenIndex:
+    """Per-field inverted index over a list of documents
+
+    Documents are identified by their position in the list the index was built
+    from; each field maps token -> sorted array('i') of positions. Substring
+    lookups go through a second index per field, from every token substring
+    of up to NGRAM_SIZE characters to the tokens containing it, built the
+    first time the field is searched.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.postings = {field: {} for field in self.fields}
+        self.size = 0
+        self._fragment_cache = {}
+        self._ngram_indexes = {}
+
+    def build(self, documents):
+        """Index an iterable of dicts mapping field name to text"""
+        lists = {field: {} for field in self.fields}
+        size = 0
+        for position, document in enumerate(documents):
+            size = position + 1
+            for field in self.fields:
+                field_lists = lists[field]
+                for token in set(tokenize(document.get(field))):
+                    field_lists.setdefault(token, []).append(position)
+
+        # Positions are appended in order, so every postings list is already sorted
+        self.postings = {field: {token: array('i', positions) for token, positions in field_lists.items()}
+                         for field, field_lists in lists.items()}
+        self.size = size
+        self._fragment_cache = {}
+        self._ngram_indexes = {}
+        return self
+
+    def lookup(self, field, token):
+        """Postings of an exact token"""
+        return self.postings[field].get(token, array('i'))
+
+    def containing(self, field, fragment):
+        """Postings of every token that contains `fragment`
+
+        A LIKE '%text%' match can start or end inside a token (e.g. 'java' in
+        'javascript'), so candidates come from all tokens containing each
+        query token, not only exact ones.
+        """
+        key = (field, fragment)
+        if key not in self._fragment_cache:
+            tokens, grams = self._ngram_index(field)
+            if len(fragment) <= NGRAM_SIZE:
+                token_ids = grams.get(fragment, ())
+            else:
+                # Tokens holding every n-gram of the fragment, rarest n-gram first,
+                # then checked for the whole fragment
+                token_ids = None
+                for gram in sorted(ngrams(fragment, (NGRAM_SIZE,)), key=lambda gram: len(grams.get(gram, ()))):
+                    gram_ids = grams.get(gram, array('i'))
+                    token_ids = gram_ids if token_ids is None else intersect(token_ids, gram_ids)
+                    if not token_ids:
+                        break
+                token_ids = [token_id for token_id in token_ids if fragment in tokens[token_id]]
+            field_postings = self.postings[field]
+            self._fragment_cache[key] = union(field_postings[tokens[token_id]] for token_id in token_ids)
+        return self._fragment_cache[key]
+
+    def _ngram_index(self, field):
+        """(tokens, {n-gram: sorted array('i') of token numbers}) for a field"""
+        index = self._ngram_indexes.get(field)
+        if index is None:
+            tokens = list(self.postings[field])
+            lists = {}
+            for token_id, token in enumerate(tokens):
+                for gram in ngrams(token):
+                    lists.setdefault(gram, []).append(token_id)
+            index = self._ngram_indexes[field] = (tokens, {gram: array('i', ids) for gram, ids in lists.items()})
+        return index
+
+    def candidates(self, field, text):
+        """Sorted positions that may contain `text` as a substring of `field`
+
+        Returns None when the text has no tokens to look up (every document is
+        a candidate). Callers still verify the substring match on candidates.
+        """
+        tokens = sorted(set(tokenize(text)), key=len, reverse=True)
+        if not tokens:
+            return None
+        result = None
+        for token in tokens:
+            posting = self.containing(field, token)
+            result = posting if result is None else intersect(result, posting)
+            if not result:
+                break
+        return result
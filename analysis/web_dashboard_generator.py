@@ -4,23 +4,16 @@ Web-based Job Analysis Dashboard
 Creates a beautiful, interactive web dashboard displaying all analysis results
 """
 
-import pymysql
+import sys
 import json
 import pandas as pd
 from datetime import datetime
 import os
 
-# Database configuration
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'hrmoihtt_hrtoolusers',
-    'password': 'FsPyjP6hPc6yReV11111111',
-    'database': 'hrmoihtt_hrtoolusers',
-    'cursorclass': pymysql.cursors.DictCursor,
-    'charset': 'utf8mb4',
-    'autocommit': True,
-    'port': 3306
-}
+# Add parent directory to path to import shared utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analysis.db_pool import get_pool
+from analysis.related_jobs import hydrate_related_jobs
 
 class JobAnalysisDashboard:
     def __init__(self):
@@ -30,7 +23,7 @@ class JobAnalysisDashboard:
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = pymysql.connect(**DB_CONFIG)
+            self.connection = get_pool().acquire()
             print("✓ Database connection established")
             return True
         except Exception as e:
@@ -40,7 +33,8 @@ class JobAnalysisDashboard:
     def close_database(self):
         """Close database connection"""
         if self.connection:
-            self.connection.close()
+            get_pool().release(self.connection)
+            self.connection = None
             print("✓ Database connection closed")
 
     def extract_all_analysis_data(self):
@@ -70,7 +64,7 @@ class JobAnalysisDashboard:
 
                 cursor = self.connection.cursor()
                 cursor.execute(query)
-                results = cursor.fetchall()
+                results = hydrate_related_jobs(self.connection, table_name, [dict(row) for row in cursor.fetchall()])
 
                 if results:
                     self.dashboard_data[table_key] = {
@@ -364,7 +358,7 @@ class JobAnalysisDashboard:
                 related_jobs_html = ''
                 try:
                     if record.get('related_jobs'):
-                        related_jobs = json.loads(record['related_jobs'])
+                        related_jobs = record['related_jobs']
                         if related_jobs:
                             related_jobs_html = f'''
                                 <button class="btn btn-sm btn-outline-primary" type="button" 